@@ -1,7 +1,7 @@
 import os
 import boto3
 
-from model import run_experiments
+from model import run_experiments, Checkpointer, S3Storage
 import pickle
 import sys
 from datetime import datetime
@@ -9,7 +9,18 @@ from datetime import datetime
 print(datetime.now())
 
 experiments = sys.argv[1:]
-df, simulation_kpis = run_experiments(experiments)
+# Checkpoint to S3 so a spot interruption resumes instead of restarting
+checkpoint_bucket = os.environ.get("CHECKPOINT_BUCKET")
+if checkpoint_bucket:
+    checkpointer = Checkpointer(
+        S3Storage(checkpoint_bucket, "checkpoints/"),
+        every=int(os.environ.get("CHECKPOINT_EVERY", 30)),
+    )
+    df, simulation_kpis = run_experiments(
+        experiments, engine="lean", checkpointer=checkpointer
+    )
+else:
+    df, simulation_kpis = run_experiments(experiments)
 
 for key in df["Experiment Name"].unique():
     file_name = open("data/{}.pkl".format(key), "ab")
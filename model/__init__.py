@@ -1,4 +1,12 @@
-from .classes import Application, DAO, Gateway, Service, Servicer, Validator
+from .classes import (
+    Application,
+    DAO,
+    Gateway,
+    Service,
+    Servicer,
+    Validator,
+    SessionPool,
+)
 from .types import (
     PublicKeyType,
     uPOKTType,
@@ -32,12 +40,15 @@ from .run import (
     load_config,
     add_config,
     run,
+    run_parallel,
     compute_KPIs,
     postprocessing,
     run_experiments,
     auto_run_sets,
     write_to_csv,
 )
+from .checkpoint import Checkpointer, LocalStorage, S3Storage
+from .sink import ParquetSink, read_results
 from .action_chains import (
     application_join_ac,
     service_linking_ac,
@@ -15,6 +15,8 @@ from .service import (
 from .servicer import (
     servicer_join_ac,
     relay_requests_ac,
+    relay_requests_batch_ac,
+    relay_requests_aggregate_ac,
     servicer_leave_ac,
     servicers_stake_ac,
     jailing_slashing_ac,
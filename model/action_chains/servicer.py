@@ -1,7 +1,10 @@
+import numpy as np
 from ..boundary_actions import (
     servicer_join_ba,
     relay_requests_ba,
     submit_relay_requests_ba,
+    submit_relay_requests_batch_ba,
+    submit_relay_requests_aggregate_ba,
     servicer_leave_ba,
     servicer_stake_ba,
     jailing_ba,
@@ -10,7 +13,12 @@ from ..boundary_actions import (
 from ..policy import (
     servicer_join_policy,
     submit_relay_requests_policy,
+    submit_relay_requests_batch_policy,
+    submit_relay_requests_aggregate_policy,
+    cap_session_relays,
     servicer_relay_policy,
+    servicer_relay_batch_policy,
+    servicer_relay_aggregate_policy,
     servicer_leave_policy,
     servicer_stake_policy,
     jail_node_policy,
@@ -51,12 +59,13 @@ def relay_requests_ac(state, params, relay_log, servicer_relay_log):
     # Submit request
     spaces = submit_relay_requests_ba(state, params)
     spaces = submit_relay_requests_policy(state, params, spaces)
-    out["total_relays"] = spaces[0]["session"]["number_of_relays"]
+    out["total_relays"] = spaces[0]["number_of_relays"]
 
-    if spaces[0]["session"]["number_of_relays"] == 0:
+    if spaces[0]["number_of_relays"] == 0:
         out["processed_relays"] = 0
         return out
     create_new_session(state, params, spaces[:1])
+    out["processed_relays"] = spaces[0]["number_of_relays"]
 
     # spaces = burn_per_session_policy(state, params, spaces)
     # burn_pokt_mechanism(state, params, spaces[:1])
@@ -65,7 +74,6 @@ def relay_requests_ac(state, params, relay_log, servicer_relay_log):
     # Relay the request
     spaces = relay_requests_ba(state, params)
     spaces = servicer_relay_policy(state, params, spaces, relay_log, servicer_relay_log)
-    out["processed_relays"] = spaces[-1]["session"]["number_of_relays"]
     if type(spaces[0]["public_key"]) == Gateway:
         # Track the fees paid
         spaces[0]["public_key"].fees_paid += -spaces[0]["amount"]
@@ -81,6 +89,90 @@ def relay_requests_ac(state, params, relay_log, servicer_relay_log):
     return out
 
 
+def relay_requests_batch_ac(state, params, n_sessions, relay_log, servicer_relay_log):
+    """
+    Counterpart of relay_requests_ac for a whole batch of sessions. All of the
+    random draws of the batch are taken up front, then the sessions are
+    played out in order to cap and charge their relays.
+    """
+    spaces = submit_relay_requests_batch_ba(state, params, n_sessions)
+    spaces = submit_relay_requests_batch_policy(state, params, spaces)
+    return relay_session_batch_ac(state, params, spaces, relay_log, servicer_relay_log)
+
+
+def relay_requests_aggregate_ac(
+    state, params, n_sessions, relay_log, servicer_relay_log
+):
+    """
+    Counterpart of relay_requests_ac accounting for the relays of each
+    (application, service) in one go, only the sessions of applications
+    whose caps might bind are played out one by one.
+    """
+    spaces = submit_relay_requests_aggregate_ba(state, params, n_sessions)
+    spaces = submit_relay_requests_aggregate_policy(state, params, spaces)
+    space = spaces[0]
+
+    for application, n_relays in zip(
+        space["applications"].tolist(), space["number_of_relays"].tolist()
+    ):
+        if n_relays > 0:
+            relay_payment_ac(
+                state, params, state["Applications"][application], n_relays
+            )
+    servicer_relay_aggregate_policy(
+        state, params, spaces[:1], relay_log, servicer_relay_log
+    )
+    whole_relays = int(space["number_of_relays"].sum())
+
+    out = relay_session_batch_ac(
+        state, params, spaces[1:], relay_log, servicer_relay_log
+    )
+    return {
+        "total_relays": whole_relays + out["total_relays"],
+        "processed_relays": whole_relays + out["processed_relays"],
+    }
+
+
+def relay_session_batch_ac(state, params, spaces, relay_log, servicer_relay_log):
+    """
+    Plays out a batch of drawn sessions in order, capping and charging the
+    relays of each one.
+    """
+    space = spaces[0]
+    processed_relays = np.zeros(len(space["applications"]), dtype=np.int64)
+    for i, (application, number_of_relays) in enumerate(
+        zip(space["applications"].tolist(), space["number_of_relays"].tolist())
+    ):
+        application = state["Applications"][application]
+        n_relays = int(cap_session_relays(params, application, number_of_relays))
+        if n_relays == 0:
+            continue
+        processed_relays[i] = n_relays
+        relay_payment_ac(state, params, application, n_relays)
+
+    space = {**space, "number_of_relays": processed_relays}
+    servicer_relay_batch_policy(state, params, (space,), relay_log, servicer_relay_log)
+    processed_relays = int(processed_relays.sum())
+    return {"total_relays": processed_relays, "processed_relays": processed_relays}
+
+
+def relay_payment_ac(state, params, application, n_relays):
+    # Payment from the requestor
+    if application.delegate:
+        relay_charge = n_relays * params["gateway_fee_per_relay"]
+        application.delegate.fees_paid += relay_charge
+        modify_gateway_stake(
+            state,
+            params,
+            ({"public_key": application.delegate, "amount": -relay_charge},),
+        )
+    else:
+        relay_charge = n_relays * params["application_fee_per_relay"]
+        modify_application_stake(
+            state, params, ({"public_key": application, "amount": -relay_charge},)
+        )
+
+
 def servicer_leave_ac(state, params):
     spaces = servicer_leave_ba(state, params)
     spaces = servicer_leave_policy(state, params, spaces)
@@ -115,8 +207,11 @@ def jailing_slashing_ac(state, params):
         # Keep track of burned stake from slashing
 
         # state["period_slashing_costs"] += -spaces_i[1]["amount"]
-        spaces_i[1]["public_key"].slashing_from_jailing_history[
-            state["height"]
-        ] = spaces_i[1]["amount"]
+        state["servicer_history"].record(
+            "slashing_from_jailing_history",
+            spaces_i[1]["public_key"],
+            state["height"],
+            spaces_i[1]["amount"],
+        )
         modify_servicer_stake(state, params, spaces_i[1:2])
         burn_pokt_mechanism(state, params, spaces_i[2:3])
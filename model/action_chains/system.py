@@ -1,8 +1,9 @@
-from ..boundary_actions import fee_reward_ba, block_reward_ba
+from ..boundary_actions import fee_reward_ba, block_reward_ba, block_reward_batch_ba
 from ..policy import (
     fee_reward_policy,
     block_reward_policy_aggregate,
     assign_servicer_salary_policy,
+    block_reward_batch_policy,
     validator_block_reward_policy,
     dao_block_reward_policy,
 )
@@ -13,6 +14,7 @@ from ..mechanisms import (
     modify_servicer_pokt_holdings,
     burn_pokt_mechanism,
     mint_pokt_mechanism,
+    pay_servicers_mechanism,
 )
 
 
@@ -24,23 +26,23 @@ def fee_reward_ac(state, params):
     modify_dao_pokt_holdings(state, params, spaces[1:2])
 
 
-def update_revenue_expectations(state, params, servicer_earnings):
-    lambda_ewm = params["lambda_ewm_revenue_expectation"]
-    for servicer in state["Servicers"]:
-        if servicer not in servicer_earnings:
-            servicer_earnings[servicer] = {}
-        last = servicer.revenue_expectations
-        new = {}
-        for service in servicer.services:
-            val = servicer_earnings[servicer].get(service, 0)
-            if service in last:
-                new[service] = lambda_ewm * last[service] + (1 - lambda_ewm) * val
-            else:
-                new[service] = val
-        servicer.revenue_expectations = new
+def update_revenue_expectations(state, params, earnings):
+    # earnings holds what each servicer earned from each service today
+    state["revenue_expectations"].ewm_update(
+        state, earnings, params["lambda_ewm_revenue_expectation"]
+    )
 
 
 def block_reward_ac(state, params):
+    if params["block_reward_function"] == "sequential":
+        block_reward_sequential_ac(state, params)
+    elif params["block_reward_function"] == "vectorized":
+        block_reward_vectorized_ac(state, params)
+    else:
+        assert False, "Invalid block_reward_function"
+
+
+def block_reward_sequential_ac(state, params):
     servicer_earnings = {}
     spaces = block_reward_ba(state, params)
     for spaces_i in spaces:
@@ -57,4 +59,17 @@ def block_reward_ac(state, params):
         modify_validator_pokt_holdings(state, params, spaces_i3)
         spaces_i4 = dao_block_reward_policy(state, params, spaces_i[3:4])
         modify_dao_pokt_holdings(state, params, spaces_i4)
-    update_revenue_expectations(state, params, servicer_earnings)
+    earnings = state["revenue_expectations"].earnings(state, servicer_earnings)
+    update_revenue_expectations(state, params, earnings)
+
+
+def block_reward_vectorized_ac(state, params):
+    spaces = block_reward_batch_ba(state, params)
+    spaces = block_reward_batch_policy(state, params, spaces)
+    pay_servicers_mechanism(state, params, spaces[:1])
+    mint_pokt_mechanism(state, params, spaces[1:2])
+    burn_pokt_mechanism(state, params, spaces[2:3])
+    modify_validator_pokt_holdings(state, params, spaces[3:4])
+    modify_dao_pokt_holdings(state, params, spaces[4:5])
+    earnings = state["revenue_expectations"].earnings_at(state, spaces[5])
+    update_revenue_expectations(state, params, earnings)
@@ -0,0 +1,154 @@
+import copy
+import timeit
+import tracemalloc
+import numpy as np
+import pandas as pd
+from .history import HISTORIES, ServicerHistory
+from .classes import (
+    Application,
+    DAO,
+    Gateway,
+    Service,
+    Servicer,
+    Validator,
+)
+
+# Arguments for building a typical entity of each class
+ENTITY_ARGS = {
+    Application: lambda: dict(
+        name="A",
+        pokt_holdings=15000 * 10e6,
+        staked_pokt=15000 * 10e6,
+        services=[],
+        geo_zone="Zone 1",
+        number_of_services=1,
+        stake_status="Staked",
+        unstaking_height=None,
+        delegate=None,
+        uses_gateway=False,
+    ),
+    DAO: lambda: dict(pokt_holdings=0),
+    Gateway: lambda: dict(
+        name="G",
+        stake_status="Staked",
+        delegators=[],
+        pokt_holdings=15000 * 10e6,
+        staked_pokt=15000 * 10e6,
+    ),
+    Service: lambda: dict(
+        name="S", gateway_api_prefix=None, service_id="S", servicers=[], join_height=0
+    ),
+    Servicer: lambda: dict(
+        name="S",
+        servicer_salary=0,
+        report_card=None,
+        test_scores=None,
+        pokt_holdings=15000 * 10e6,
+        staked_pokt=15000 * 10e6,
+        service_url=None,
+        services=[],
+        geo_zone="Zone 1",
+        operator_public_key=None,
+        pause_height=None,
+        stake_status="Staked",
+        unstaking_height=None,
+        QoS=0.9,
+    ),
+    Validator: lambda: dict(
+        name="V",
+        pokt_holdings=15000 * 10e6,
+        staked_pokt=15000 * 10e6,
+        service_url=None,
+        operator_public_key=None,
+        stake_status="Staked",
+    ),
+}
+
+# Numeric attribute read and updated in the access benchmark
+ACCESSED = {Service: "join_height"}
+
+
+def dict_twin(cls) -> type:
+    """
+    The class as it was before __slots__, the same __init__ with the
+    attributes in a __dict__.
+    """
+    return type(cls.__name__ + "Dict", (), {"__init__": cls.__init__})
+
+
+def build_entities(cls, args, n: int, history: int) -> list:
+    entities = [cls(**args()) for _ in range(n)]
+    if history and hasattr(entities[0], "history"):
+        # As in a run, the histories are events in a ServicerHistory
+        servicer_history = ServicerHistory()
+        for id_number, entity in enumerate(entities):
+            entity.id_number = id_number
+        servicers = [entity for entity in entities for _ in range(history)]
+        heights = np.tile(np.arange(history) * 86400, n)
+        for name in HISTORIES:
+            servicer_history.extend(name, servicers, heights, np.zeros(len(heights)))
+    return entities
+
+
+def bytes_per_entity(cls, args, n: int, history: int, copied: bool) -> float:
+    if copied:
+        entities = build_entities(cls, args, n, history)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    if copied:
+        entities = copy.deepcopy(entities)
+    else:
+        entities = build_entities(cls, args, n, history)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entities
+    return (after - before) / n
+
+
+def access_ns(entities: list, statement: str, repeat: int = 5) -> float:
+    # Best time per entity and access
+    timer = timeit.Timer(
+        "for x in entities: " + statement, globals={"entities": entities}
+    )
+    return min(timer.repeat(repeat, number=1)) / len(entities) * 1e9
+
+
+def entity_benchmark(n: int = 10000, history: int = 0) -> pd.DataFrame:
+    """
+    Memory and attribute access speed of the entity classes against their
+    __dict__ based twins, for n entities of each class. history fills the
+    jailing and slashing histories of the servicers with that many days.
+
+    Reports the bytes allocated per entity (tracemalloc, the entity with its
+    own containers) as built and as a deep copy, which is what the entities
+    of a run are since the state is copied when it is built, and the
+    nanoseconds per attribute read and per in place update of a numeric
+    attribute (pokt_holdings, or join_height for services).
+    """
+    rows = []
+    for cls, args in ENTITY_ARGS.items():
+        attribute = ACCESSED.get(cls, "pokt_holdings")
+        for variant, klass in (("slots", cls), ("dict", dict_twin(cls))):
+            entities = build_entities(klass, args, n, history)
+            rows.append(
+                {
+                    "entity": cls.__name__,
+                    "variant": variant,
+                    "bytes_per_entity": bytes_per_entity(
+                        klass, args, n, history, copied=False
+                    ),
+                    "copied_bytes_per_entity": bytes_per_entity(
+                        klass, args, n, history, copied=True
+                    ),
+                    "read_ns": access_ns(entities, "x." + attribute),
+                    "update_ns": access_ns(entities, "x.{} += 1".format(attribute)),
+                }
+            )
+    return pd.DataFrame(rows).set_index(["entity", "variant"])
+
+
+if __name__ == "__main__":
+    pd.set_option("display.width", 120)
+    pd.set_option("display.max_columns", None)
+    print(entity_benchmark())
+    print(entity_benchmark(history=365).loc["Servicer"])
@@ -2,6 +2,8 @@ from .application import (
     application_join_ba,
     gateway_delegation_ba,
     submit_relay_requests_ba,
+    submit_relay_requests_batch_ba,
+    submit_relay_requests_aggregate_ba,
     application_leave_ba,
     gateway_undelegation_ba,
     application_stake_ba,
@@ -18,4 +20,4 @@ from .servicer import (
     unjailing_ba,
 )
 from .service import service_join_ba, service_leave_ba
-from .system import fee_reward_ba, block_reward_ba
+from .system import fee_reward_ba, block_reward_ba, block_reward_batch_ba
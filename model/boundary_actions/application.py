@@ -1,3 +1,4 @@
+import numpy as np
 from ..types import StateType, ParamType, ApplicationEntityType
 from ..spaces import (
     application_join_space,
@@ -6,10 +7,11 @@ from ..spaces import (
     application_leave_space,
     application_undelegation_space,
     application_stake_space,
+    session_batch_space,
+    relay_aggregate_space,
 )
+from ..rng import get_rng, choice
 from typing import Union, Tuple, List
-import random
-import numpy as np
 
 
 def application_join_ba(
@@ -26,21 +28,24 @@ def application_join_ba_simple_unfiform(
 ) -> Tuple[Union[application_join_space, None]]:
     # Threshold is set by number of applicatons divided by the max applications
     threshold = len(state["Applications"]) / params["application_max_number"]
-    if random.random() > threshold:
+    rng = get_rng(state, "joins")
+    if rng.random() > threshold:
         return (
             {
                 "name": "",
                 "stake_amount": 15000
                 * 10e6,  # The amount of uPOKT in escrow (i.e. a security deposit)
-                "geo_zone": random.choice(
-                    state["Geozones"]
+                "geo_zone": choice(
+                    rng, state["Geozones"]
                 ),  # The physical geo-location identifier this application is registered in
-                "number_servicers": random.randint(
-                    params["applications_use_min_servicers"],
-                    params["applications_use_max_servicers"],
+                "number_servicers": int(
+                    rng.integers(
+                        params["applications_use_min_servicers"],
+                        params["applications_use_max_servicers"] + 1,
+                    )
                 ),  # The number of Servicers requested per session
                 "personal_holdings": max(
-                    np.random.normal(30937797160586.477, 25104455260369.2),
+                    rng.normal(30937797160586.477, 25104455260369.2),
                     30000000000000 * 0.05,
                 ),  # Unstaked POKT the application personally holds
             },
@@ -68,7 +73,7 @@ def gateway_delegation_ba_test(
         and application.id_number % 2 == 1
         and len(state["Gateways"]) > 0
     ):
-        gateway = random.choice(state["Gateways"])
+        gateway = choice(get_rng(state, "delegation"), state["Gateways"])
         return ({"application_public_key": application, "gateway_public_key": gateway},)
     else:
         return (None,)
@@ -82,7 +87,7 @@ def gateway_delegation_ba_basic(
         and not application.delegate
         and len(state["Gateways"]) > 0
     ):
-        gateway = random.choice(state["Gateways"])
+        gateway = choice(get_rng(state, "delegation"), state["Gateways"])
         return ({"application_public_key": application, "gateway_public_key": gateway},)
     else:
         return (None,)
@@ -101,7 +106,8 @@ def gateway_undelegation_ba_basic(
     state: StateType, params: ParamType, application: ApplicationEntityType
 ) -> Tuple[Union[application_undelegation_space, None]]:
     if application.delegate:
-        if random.random() < params["gateway_undelegation_probability"]:
+        rng = get_rng(state, "delegation")
+        if rng.random() < params["gateway_undelegation_probability"]:
             space: application_undelegation_space = {
                 "application_public_key": application,
                 "gateway_public_key": application.delegate,
@@ -129,7 +135,7 @@ def submit_relay_requests_ba_test(
     state: StateType,
     params: ParamType,
 ) -> Tuple[submit_relay_request_space]:
-    application = random.choice(state["Applications"])
+    application = choice(get_rng(state, "relays"), state["Applications"])
     number_of_relays = 10
 
     return ({"application_address": application, "number_of_relays": number_of_relays},)
@@ -139,9 +145,10 @@ def submit_relay_requests_ba_gamma(
     state: StateType,
     params: ParamType,
 ) -> Tuple[submit_relay_request_space]:
-    application = random.choice(state["Applications"])
+    rng = get_rng(state, "relays")
+    application = choice(rng, state["Applications"])
     number_of_relays = int(
-        np.random.gamma(
+        rng.gamma(
             params["relays_per_session_gamma_distribution_shape"],
             params["relays_per_session_gamma_distribution_scale"],
         )
@@ -150,6 +157,82 @@ def submit_relay_requests_ba_gamma(
     return ({"application_address": application, "number_of_relays": number_of_relays},)
 
 
+def submit_relay_requests_batch_ba(
+    state: StateType, params: ParamType, n_sessions: int
+) -> Tuple[session_batch_space]:
+    if params["submit_relay_requests_function"] == "test":
+        return submit_relay_requests_batch_ba_test(state, params, n_sessions)
+    if params["submit_relay_requests_function"] == "basic_gamma":
+        return submit_relay_requests_batch_ba_gamma(state, params, n_sessions)
+    else:
+        assert False, "Invalid submit_relay_requests_function"
+
+
+def submit_relay_requests_batch_ba_test(
+    state: StateType, params: ParamType, n_sessions: int
+) -> Tuple[session_batch_space]:
+    rng = get_rng(state, "relays")
+    applications = rng.integers(len(state["Applications"]), size=n_sessions)
+    number_of_relays = np.full(n_sessions, 10)
+
+    return ({"applications": applications, "number_of_relays": number_of_relays},)
+
+
+def submit_relay_requests_batch_ba_gamma(
+    state: StateType, params: ParamType, n_sessions: int
+) -> Tuple[session_batch_space]:
+    rng = get_rng(state, "relays")
+    applications = rng.integers(len(state["Applications"]), size=n_sessions)
+    number_of_relays = rng.gamma(
+        params["relays_per_session_gamma_distribution_shape"],
+        params["relays_per_session_gamma_distribution_scale"],
+        size=n_sessions,
+    ).astype(np.int64)
+
+    return ({"applications": applications, "number_of_relays": number_of_relays},)
+
+
+def submit_relay_requests_aggregate_ba(
+    state: StateType, params: ParamType, n_sessions: int
+) -> Tuple[relay_aggregate_space]:
+    if params["submit_relay_requests_function"] == "basic_gamma":
+        return submit_relay_requests_aggregate_ba_gamma(state, params, n_sessions)
+    else:
+        assert False, "Invalid submit_relay_requests_function"
+
+
+def submit_relay_requests_aggregate_ba_gamma(
+    state: StateType, params: ParamType, n_sessions: int
+) -> Tuple[relay_aggregate_space]:
+    """
+    Draws how many of the day's sessions go to each (application, service)
+    and the relays of all of those sessions together. The sum of c gamma
+    distributed session relay counts with the same scale is itself gamma
+    distributed with c times the shape, so it takes one draw per pair.
+    """
+    rng = get_rng(state, "relays")
+    n_services = len(state["Services"])
+    n_pairs = len(state["Applications"]) * n_services
+    if n_sessions == 0 or n_pairs == 0:
+        sessions = np.zeros(n_pairs, dtype=np.int64)
+    else:
+        sessions = rng.multinomial(n_sessions, np.full(n_pairs, 1 / n_pairs))
+    pairs = np.flatnonzero(sessions)
+    number_of_sessions = sessions[pairs]
+    number_of_relays = rng.gamma(
+        number_of_sessions * params["relays_per_session_gamma_distribution_shape"],
+        params["relays_per_session_gamma_distribution_scale"],
+    ).astype(np.int64)
+
+    out: relay_aggregate_space = {
+        "applications": pairs // n_services,
+        "services": pairs % n_services,
+        "number_of_sessions": number_of_sessions,
+        "number_of_relays": number_of_relays,
+    }
+    return (out,)
+
+
 def application_leave_ba(
     state: StateType, params: ParamType
 ) -> Tuple[application_leave_space]:
@@ -162,6 +245,7 @@ def application_leave_ba(
 def application_leave_ba_basic(
     state: StateType, params: ParamType
 ) -> Tuple[application_leave_space]:
+    rng = get_rng(state, "leaves")
     leaves = {}
     for application in state["Applications"]:
         if (
@@ -170,9 +254,7 @@ def application_leave_ba_basic(
         ):
             leaves[application] = True
         else:
-            leaves[application] = (
-                random.random() < params["application_leave_probability"]
-            )
+            leaves[application] = rng.random() < params["application_leave_probability"]
     return ({"applications": leaves},)
 
 
@@ -188,19 +270,19 @@ def application_stake_ba(
 def application_stake_ba_basic(
     state: StateType, params: ParamType
 ) -> List[Tuple[application_stake_space]]:
+    buffer = 1.2
+    average_relays = (
+        params["relays_per_session_gamma_distribution_shape"]
+        * params["relays_per_session_gamma_distribution_scale"]
+    )
+    target_stake = (
+        buffer
+        * average_relays
+        * params["average_session_per_application"]
+        * params["relays_to_tokens_multiplier"]
+    )
     out = []
     for application in state["Applications"]:
-        buffer = 1.2
-        average_relays = (
-            params["relays_per_session_gamma_distribution_shape"]
-            * params["relays_per_session_gamma_distribution_scale"]
-        )
-        target_stake = (
-            buffer
-            * average_relays
-            * params["average_session_per_application"]
-            * params["relays_to_tokens_multiplier"]
-        )
         if application.staked_pokt < target_stake:
             amount = max(
                 min(
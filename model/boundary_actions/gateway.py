@@ -1,7 +1,7 @@
 from ..types import StateType, ParamType
 from ..spaces import gateway_join_space, gateway_leave_space, gateway_registration_space
+from ..rng import get_rng
 from typing import Union, Tuple, List
-import random
 
 
 def gateway_join_ba(
@@ -18,7 +18,7 @@ def gateway_join_ba_simple_unfiform(
 ) -> Tuple[Union[gateway_join_space, None]]:
     # Threshold is set by number of gateways divided by the max gateways
     threshold = len(state["Gateways"]) / params["gateway_max_number"]
-    if random.random() > threshold:
+    if get_rng(state, "joins").random() > threshold:
         return (
             {
                 "name": "",
@@ -42,6 +42,7 @@ def gateway_leave_ba(state: StateType, params: ParamType) -> Tuple[gateway_leave
 def gateway_leave_ba_basic(
     state: StateType, params: ParamType
 ) -> Tuple[gateway_leave_space]:
+    rng = get_rng(state, "leaves")
     leaves = {}
     for gateway in state["Gateways"]:
         if (
@@ -50,7 +51,7 @@ def gateway_leave_ba_basic(
         ):
             leaves[gateway] = True
         else:
-            leaves[gateway] = random.random() < params["gateway_leave_probability"]
+            leaves[gateway] = rng.random() < params["gateway_leave_probability"]
     return ({"gateways": leaves},)
 
 
@@ -66,16 +67,15 @@ def gateway_stake_ba(
 def gateway_stake_ba_basic(
     state: StateType, params: ParamType
 ) -> List[Tuple[gateway_registration_space]]:
+    # Basic target that says even if you had every single one on one portal there would be enough stake
+    target_stake = max(
+        params["gateway_minimum_stake"],
+        params["stake_per_app_delegation"]
+        * len(state["Applications"])
+        * params["uses_gateway_probability"],
+    )
     out = []
     for gateway in state["Gateways"]:
-        # Basic target that says even if you had every single one on one portal there would be enough stake
-        target_stake = max(
-            params["gateway_minimum_stake"],
-            params["stake_per_app_delegation"]
-            * len(state["Applications"])
-            * params["uses_gateway_probability"],
-        )
-
         if gateway.staked_pokt < target_stake:
             amount = max(
                 min(
@@ -1,7 +1,7 @@
 from ..types import StateType, ParamType
 from ..spaces import service_join_space, service_leave_space
+from ..rng import get_rng
 from typing import Union, Tuple
-import random
 
 
 def service_join_ba(
@@ -18,7 +18,7 @@ def service_join_ba_simple_unfiform(
 ) -> Tuple[Union[service_join_space, None]]:
     # Threshold is set by number of applicatons divided by the max services
     threshold = len(state["Services"]) / params["service_max_number"]
-    if random.random() > threshold:
+    if get_rng(state, "joins").random() > threshold:
         return ({"name": "ABC", "gateway_api_prefix": "ABC", "service_id": "ABC"},)
     else:
         return (None,)
@@ -34,7 +34,8 @@ def service_leave_ba(state: StateType, params: ParamType) -> Tuple[service_leave
 def service_leave_ba_basic(
     state: StateType, params: ParamType
 ) -> Tuple[service_leave_space]:
+    rng = get_rng(state, "leaves")
     leaves = {}
     for service in state["Services"]:
-        leaves[service] = random.random() < params["service_leave_probability"]
+        leaves[service] = rng.random() < params["service_leave_probability"]
     return ({"services": leaves},)
@@ -9,9 +9,9 @@ from ..spaces import (
     jail_node_space,
     unjail_node_space,
 )
+from ..rng import get_rng, choice
 from typing import Union, Tuple, List
-import random
-import numpy as np
+from itertools import compress
 
 
 def servicer_join_ba(
@@ -28,18 +28,19 @@ def servicer_join_ba_simple_unfiform(
 ) -> Tuple[Union[servicer_join_space, None]]:
     # Threshold is set by number of applicatons divided by the max servicers
     threshold = len(state["Servicers"]) / params["servicer_max_number"]
-    if random.random() > threshold:
+    rng = get_rng(state, "joins")
+    if rng.random() > threshold:
         return (
             {
                 "name": "",
                 "stake_amount": params[
                     "minimum_stake_servicer"
                 ],  # The amount of uPOKT in escrow (i.e. a security deposit)
-                "geo_zone": random.choice(
-                    state["Geozones"]
+                "geo_zone": choice(
+                    rng, state["Geozones"]
                 ),  # The physical geo-location identifier this Servicer registered in
                 "personal_holdings": max(
-                    np.random.normal(30937797160586.477, 25104455260369.2),
+                    rng.normal(30937797160586.477, 25104455260369.2),
                     30000000000000 * 0.05,
                 ),  # Unstaked POKT the servicer personally holds
                 "service_url": None,
@@ -70,12 +71,11 @@ def service_linking_test(
     else:
         out = []
         ct = params["service_max_number_link"] - len(servicer.services)
-        for service in state["Services"][::-1]:
-            if service not in servicer.services:
-                out.append(({"service": service, "servicer": servicer},))
-                ct -= 1
-                if ct == 0:
-                    break
+        for service in state["service_links"].unlinked_services(servicer)[::-1]:
+            out.append(({"service": service, "servicer": servicer},))
+            ct -= 1
+            if ct == 0:
+                break
         return out
 
 
@@ -86,19 +86,19 @@ def service_linking_basic(
     if len(servicer.services) == params["service_max_number_link"]:
         return []
     else:
+        rng = get_rng(state, "linking")
         out = []
         ct = params["service_max_number_link"] - len(servicer.services)
-        for service in state["Services"][::-1]:
-            if service not in servicer.services:
-                if service.join_height == state["height"]:
-                    threshold = params["service_linking_probability_normal"]
-                else:
-                    threshold = params["service_linking_probability_just_joined"]
-                if random.random() < threshold:
-                    out.append(({"service": service, "servicer": servicer},))
-                    ct -= 1
-                if ct == 0:
-                    break
+        for service in state["service_links"].unlinked_services(servicer)[::-1]:
+            if service.join_height == state["height"]:
+                threshold = params["service_linking_probability_normal"]
+            else:
+                threshold = params["service_linking_probability_just_joined"]
+            if rng.random() < threshold:
+                out.append(({"service": service, "servicer": servicer},))
+                ct -= 1
+            if ct == 0:
+                break
         return out
 
 
@@ -114,10 +114,12 @@ def relay_requests_ba(
 def relay_requests_ba_test(
     state: StateType, params: ParamType
 ) -> Tuple[servicer_relay_space]:
-    session = state["Sessions"][0]
+    sessions = state["Sessions"]
+    session = sessions.first()
+    slot = sessions.slot(session)
     out: servicer_relay_space = {
-        "applications": session["application"],
-        "servicers": session["servicers"],
+        "applications": sessions.application[slot],
+        "servicers": sessions.servicers[slot],
         "session": session,
     }
     return (out,)
@@ -135,6 +137,7 @@ def servicer_leave_ba(
 def servicer_leave_ba_basic(
     state: StateType, params: ParamType
 ) -> Tuple[servicer_leave_space]:
+    rng = get_rng(state, "leaves")
     leaves = {}
     for servicer in state["Servicers"]:
         if (
@@ -143,7 +146,7 @@ def servicer_leave_ba_basic(
         ):
             leaves[servicer] = True
         else:
-            leaves[servicer] = random.random() < params["servicer_leave_probability"]
+            leaves[servicer] = rng.random() < params["servicer_leave_probability"]
     return ({"servicers": leaves},)
 
 
@@ -160,18 +163,19 @@ def service_unlinking_ba_basic(
     state: StateType, params: ParamType, servicer: ServiceEntityType
 ) -> List[Tuple[service_unlinking_space]]:
     # Simple test function where if maximum services is not reached then the current options are joined in reverse order
+    rng = get_rng(state, "linking")
     out = []
     kick_bottom = False
     for service in servicer.services:
         if service.join_height == state["height"]:
             kick_bottom = True
-        if random.random() < params["service_unlinking_probability"]:
+        if rng.random() < params["service_unlinking_probability"]:
             out.append(({"service": service, "servicer": servicer},))
     if kick_bottom:
-        bottom = servicer.services_by_revenue()[0][0]
+        bottom = state["revenue_expectations"].lowest_revenue_service(state, servicer)
         add = ({"service": bottom, "servicer": servicer},)
         if add not in out:
-            if random.random() < params["kick_bottom_probability"]:
+            if rng.random() < params["kick_bottom_probability"]:
                 out.append(add)
     return out
 
@@ -217,19 +221,21 @@ def jailing_ba(state: StateType, params: ParamType) -> List[Tuple[jail_node_spac
 def jailing_ba_basic(
     state: StateType, params: ParamType
 ) -> List[Tuple[jail_node_space]]:
+    rng = get_rng(state, "jailing")
+    unpaused = [x for x in state["Servicers"] if not x.pause_height]
+    # One draw per unpaused servicer in a single call, the same stream as
+    # drawing them one by one
+    jailed = rng.random(len(unpaused)) < params["servicer_jailing_probability"]
     out = []
-    for servicer in state["Servicers"]:
-        if servicer.pause_height:
-            continue
-        if random.random() < params["servicer_jailing_probability"]:
-            space = (
-                {
-                    "block_height": state["height"],
-                    "jailer_address": None,
-                    "node_address": servicer,
-                },
-            )
-            out.append(space)
+    for servicer in compress(unpaused, jailed):
+        space = (
+            {
+                "block_height": state["height"],
+                "jailer_address": None,
+                "node_address": servicer,
+            },
+        )
+        out.append(space)
     return out
 
 
@@ -240,6 +246,8 @@ def unjailing_ba(state: StateType, params: ParamType) -> List[Tuple[unjail_node_
             # Tracking for lost wages
             lost_wages = sum(servicer.revenue_expectations.values())
             state["period_jailing_opportunity_cost"] += lost_wages
-            servicer.jail_lost_revenue_history[state["height"]] = lost_wages
+            state["servicer_history"].record(
+                "jail_lost_revenue_history", servicer, state["height"], lost_wages
+            )
             out.append(({"block_height": state["height"], "node_address": servicer},))
     return out
@@ -1,5 +1,10 @@
+import numpy as np
 from ..types import StateType, ParamType
-from ..spaces import distribute_fees_space, mint_block_rewards_space
+from ..spaces import (
+    distribute_fees_space,
+    mint_block_rewards_space,
+    block_reward_batch_space,
+)
 from typing import Tuple, List
 
 
@@ -11,16 +16,29 @@ def block_reward_ba(
     state: StateType, params: ParamType
 ) -> List[Tuple[mint_block_rewards_space]]:
     out = []
-    for key in state["relay_log"]:
+    for (service, geo_zone), relays in state["relay_log"].items():
         out.append(
             (
                 {
                     "block_producer": state["Validators"][0],
-                    "geo_zone": key[1],
-                    "service": key[0],
-                    "relays": state["relay_log"][key],
+                    "geo_zone": geo_zone,
+                    "service": service,
+                    "relays": relays,
                 },
             )
         )
 
     return out
+
+
+def block_reward_batch_ba(
+    state: StateType, params: ParamType
+) -> Tuple[block_reward_batch_space]:
+    keys = list(state["relay_log"].keys())
+    space: block_reward_batch_space = {
+        "block_producer": state["Validators"][0],
+        "services": [service for service, _ in keys],
+        "geo_zones": [geo_zone for _, geo_zone in keys],
+        "relays": np.array(list(state["relay_log"].values()), dtype=np.int64),
+    }
+    return (space,)
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+
+class LocalStorage:
+    """
+    Checkpoint storage in a directory on local disk. Writes go to a temporary
+    file that is renamed into place, so a checkpoint is either the previous
+    one or the new one but never half written.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def write(self, key: str, data: bytes) -> None:
+        path = os.path.join(self.root, key)
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def read(self, key: str) -> bytes:
+        path = os.path.join(self.root, key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+
+class S3Storage:
+    """
+    Checkpoint storage in an S3 bucket or any S3 compatible object store
+    (endpoint_url points at e.g. a MinIO server). A put replaces the object
+    atomically. The client is created lazily so the storage can be handed to
+    worker processes.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url=None, client=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.client = client
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["client"] = None
+        return state
+
+    def get_client(self):
+        if self.client is None:
+            import boto3
+
+            self.client = boto3.client("s3", endpoint_url=self.endpoint_url)
+        return self.client
+
+    def write(self, key: str, data: bytes) -> None:
+        self.get_client().put_object(
+            Bucket=self.bucket, Key=self.prefix + key, Body=data
+        )
+
+    def read(self, key: str) -> bytes:
+        client = self.get_client()
+        try:
+            response = client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except client.exceptions.NoSuchKey:
+            return None
+        return response["Body"].read()
+
+
+class Checkpointer:
+    """
+    Saves the state of a run every `every` timesteps, and at the end of the
+    run, to a storage (LocalStorage or S3Storage) and hands back the latest
+    checkpoint of a run to resume it from.
+
+    A checkpoint holds everything the run needs to carry on as if it had not
+    stopped: the state with its entities, Sessions, random number generators
+    and id allocator, and the results recorded so far. Checkpoints are kept
+    under a fingerprint of the run's params, timesteps and recording options,
+    so a run only resumes from checkpoints made by the same configuration.
+    """
+
+    def __init__(self, storage, every: int = 30):
+        assert every >= 1, "Invalid checkpoint interval"
+        self.storage = storage
+        self.every = every
+
+    @staticmethod
+    def fingerprint(params, time_seq, **options) -> str:
+        text = repr((sorted(params.items()), time_seq, sorted(options.items())))
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def key(state, fingerprint: str) -> str:
+        return "{}/{}/{}-{}-{}.pkl".format(
+            state["rng"].seed_key,
+            fingerprint,
+            state["simulation"],
+            state["subset"],
+            state["run"],
+        )
+
+    def due(self, timestep: int, final_timestep: int) -> bool:
+        return timestep % self.every == 0 or timestep == final_timestep
+
+    def save(self, state, fingerprint: str, timestep: int, results) -> None:
+        checkpoint = {
+            "timestep": timestep,
+            "state": state,
+            "results": results,
+        }
+        self.storage.write(
+            self.key(state, fingerprint),
+            pickle.dumps(checkpoint, pickle.HIGHEST_PROTOCOL),
+        )
+
+    def load(self, state, fingerprint: str):
+        """
+        Latest checkpoint for the run the state belongs to as (timestep, state,
+        results), or None if there is none.
+        """
+        data = self.storage.read(self.key(state, fingerprint))
+        if data is None:
+            return None
+        checkpoint = pickle.loads(data)
+        return checkpoint["timestep"], checkpoint["state"], checkpoint["results"]
@@ -1,6 +1,8 @@
 from .application import Application
 from .dao import DAO
+from .entity import Entity
 from .gateway import Gateway
 from .service import Service
 from .servicer import Servicer
+from .session import SessionPool
 from .validator import Validator
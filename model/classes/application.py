@@ -8,10 +8,24 @@ from ..types import (
     GatewayEntityType,
 )
 from typing import List
+from .entity import Entity
 
 
-class Application:
-    id_number = 0
+class Application(Entity):
+    __slots__ = (
+        "id_number",
+        "name",
+        "public_key",
+        "pokt_holdings",
+        "staked_pokt",
+        "services",
+        "geo_zone",
+        "number_of_services",
+        "stake_status",
+        "unstaking_height",
+        "delegate",
+        "uses_gateway",
+    )
 
     def __init__(
         self,
@@ -26,8 +40,8 @@ class Application:
         delegate: GatewayEntityType,
         uses_gateway: bool,
     ):
-        self.id_number = Application.id_number
-        Application.id_number += 1
+        # Given by state["ids"] when added to a run
+        self.id_number = None
         self.name = name
         self.public_key = self
         self.pokt_holdings = pokt_holdings
@@ -1,6 +1,9 @@
 from ..types import uPOKTType
+from .entity import Entity
 
 
-class DAO:
+class DAO(Entity):
+    __slots__ = ("pokt_holdings",)
+
     def __init__(self, pokt_holdings: uPOKTType):
         self.pokt_holdings = pokt_holdings
@@ -0,0 +1,87 @@
+import copy
+from operator import attrgetter
+from ..shared import Shared
+
+
+class Unset:
+    """
+    Stands in for the attributes of an entity that were never set when it is
+    pickled, e.g. the KPI attributes before the KPIs are computed.
+    """
+
+
+class Entity(Shared):
+    """
+    Base of the entity classes, which keep their attributes in __slots__
+    instead of a __dict__ per object.
+
+    Every attribute an entity can have is declared in the __slots__ of its
+    class. An entity pickles its state as the attribute names of its class
+    along with their values, read in one go, and deep copies straight from
+    its slots. Entities pickled by older versions of their class, also with
+    their attributes in a dict, load as well without the attributes the
+    class no longer has.
+    """
+
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fields = tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name in klass.__dict__.get("__slots__", ())
+        )
+        cls.read_fields = attrgetter(*cls.fields)
+
+    def field_values(self) -> tuple:
+        try:
+            values = self.read_fields(self)
+        except AttributeError:
+            return tuple(getattr(self, name, Unset) for name in self.fields)
+        if len(self.fields) == 1:
+            return (values,)
+        return values
+
+    def fields_set(self) -> dict:
+        """
+        The attributes that are set, by name, like vars() for an object
+        with a __dict__.
+        """
+        return {
+            name: value
+            for name, value in zip(self.fields, self.field_values())
+            if value is not Unset
+        }
+
+    def __getstate__(self):
+        return (self.fields, self.field_values())
+
+    def __deepcopy__(self, memo):
+        if Shared.active:
+            return self
+        # Straight from the slots rather than through a pickled state
+        entity = object.__new__(type(self))
+        memo[id(self)] = entity
+        for name, value in zip(self.fields, self.field_values()):
+            if value is not Unset:
+                object.__setattr__(entity, name, copy.deepcopy(value, memo))
+        return entity
+
+    def __setstate__(self, state) -> None:
+        if isinstance(state, dict):
+            # Pickled with a __dict__, attributes the class no longer has
+            # are left out
+            fields = [name for name in state if name in self.fields]
+            values = [state[name] for name in fields]
+        else:
+            fields, values = state
+            if fields != self.fields:
+                # Pickled by another version of the class
+                values = [
+                    value for name, value in zip(fields, values) if name in self.fields
+                ]
+                fields = [name for name in fields if name in self.fields]
+        for name, value in zip(fields, values):
+            if value is not Unset:
+                object.__setattr__(self, name, value)
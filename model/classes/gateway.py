@@ -1,9 +1,20 @@
 from ..types import StakeStatusType, ApplicationEntityType, uPOKTType
 from typing import List
+from ..indexed_set import IndexedSet
+from .entity import Entity
 
 
-class Gateway:
-    id_number = 0
+class Gateway(Entity):
+    __slots__ = (
+        "id_number",
+        "name",
+        "stake_status",
+        "delegators",
+        "pokt_holdings",
+        "staked_pokt",
+        "fees_paid",
+        "kpi3",
+    )
 
     def __init__(
         self,
@@ -13,11 +24,11 @@ class Gateway:
         pokt_holdings: uPOKTType,
         staked_pokt: uPOKTType,
     ):
-        self.id_number = Gateway.id_number
-        Gateway.id_number += 1
+        # Given by state["ids"] when added to a run
+        self.id_number = None
         self.name = name
         self.stake_status = stake_status
-        self.delegators = delegators
+        self.delegators = IndexedSet(delegators)
         self.pokt_holdings = pokt_holdings
         self.staked_pokt = staked_pokt
         self.fees_paid = 0
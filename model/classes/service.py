@@ -1,9 +1,19 @@
 from typing import List
 from ..types import ServicerEntityType
+from ..links import SERVICE
+from .entity import Entity
 
 
-class Service:
-    id_number = 0
+class Service(Entity):
+    __slots__ = (
+        "id_number",
+        "name",
+        "gateway_api_prefix",
+        "service_id",
+        "links",
+        "join_height",
+    )
+    link_axis = SERVICE
 
     def __init__(
         self,
@@ -13,10 +23,19 @@ class Service:
         servicers: List[ServicerEntityType],
         join_height: int,
     ):
-        self.id_number = Service.id_number
-        Service.id_number += 1
+        # Given by state["ids"] when added to a run
+        self.id_number = None
         self.name = name
         self.gateway_api_prefix = gateway_api_prefix
         self.service_id = service_id
-        self.servicers = servicers
+        # Linked by link_service_mechanism
+        assert not servicers, "Invalid servicers, link them instead"
+        self.links = None
         self.join_height = join_height
+
+    @property
+    def servicers(self):
+        # Read-only, the links live in state["service_links"]
+        if self.links is None:
+            return ()
+        return self.links.view(self)
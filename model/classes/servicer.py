@@ -9,11 +9,39 @@ from ..types import (
     BlockHeightType,
     StakeStatusType,
 )
-from typing import List
+from typing import List, Mapping
+from types import MappingProxyType
+from ..links import SERVICER
+from .entity import Entity
 
 
-class Servicer:
-    id_number = 0
+class Servicer(Entity):
+    __slots__ = (
+        "id_number",
+        "name",
+        "public_key",
+        "servicer_salary",
+        "report_card",
+        "test_scores",
+        "pokt_holdings",
+        "staked_pokt",
+        "service_url",
+        "links",
+        "geo_zone",
+        "operator_public_key",
+        "pause_height",
+        "stake_status",
+        "unkstaking_height",
+        "QoS",
+        "revenue_matrix",
+        "history",
+        "staked_pokt_total_inflow",
+        "total_revenues",
+        "kpi_1",
+        "kpi_11",
+        "kpi_14",
+    )
+    link_axis = SERVICER
 
     def __init__(
         self,
@@ -32,8 +60,8 @@ class Servicer:
         unstaking_height: BlockHeightType,
         QoS: float,
     ):
-        self.id_number = Servicer.id_number
-        Servicer.id_number += 1
+        # Given by state["ids"] when added to a run
+        self.id_number = None
         self.name = name
         self.public_key = self
         self.servicer_salary = servicer_salary
@@ -42,7 +70,9 @@ class Servicer:
         self.pokt_holdings = pokt_holdings
         self.staked_pokt = staked_pokt
         self.service_url = service_url
-        self.services = services
+        # Linked by link_service_mechanism
+        assert not services, "Invalid services, link them instead"
+        self.links = None
         self.geo_zone = geo_zone
         self.operator_public_key = operator_public_key
         self.pause_height = pause_height
@@ -50,18 +80,57 @@ class Servicer:
         self.unkstaking_height = unstaking_height
         self.QoS = QoS
 
-        self.revenue_expectations = {}
-        self.slashing_from_jailing_history = {}
-        self.slashing_history = {}
-        self.jail_lost_revenue_history = {}
+        # Set once the servicer has a row in state["revenue_expectations"]
+        self.revenue_matrix = None
+        # Set once the servicer has an event in state["servicer_history"]
+        self.history = None
         self.staked_pokt_total_inflow = staked_pokt
         self.total_revenues = 0
 
+    @property
+    def services(self):
+        # Read-only, the links live in state["service_links"]
+        if self.links is None:
+            return ()
+        return self.links.view(self)
+
+    @property
+    def revenue_expectations(self) -> Mapping:
+        # Read-only, the expectations live in state["revenue_expectations"]
+        if self.revenue_matrix is None:
+            return MappingProxyType({})
+        return self.revenue_matrix.view(self)
+
+    def history_view(self, name: str) -> Mapping:
+        if self.history is None:
+            return MappingProxyType({})
+        return self.history.view(name, self)
+
+    def history_total(self, name: str) -> float:
+        if self.history is None:
+            return 0
+        return self.history.total(name, self)
+
+    def history_count(self, name: str) -> int:
+        if self.history is None:
+            return 0
+        return self.history.count(name, self)
+
+    # Read-only, the histories live in state["servicer_history"]
+    @property
+    def slashing_from_jailing_history(self) -> Mapping:
+        return self.history_view("slashing_from_jailing_history")
+
+    @property
+    def slashing_history(self) -> Mapping:
+        return self.history_view("slashing_history")
+
+    @property
+    def jail_lost_revenue_history(self) -> Mapping:
+        return self.history_view("jail_lost_revenue_history")
+
     def services_by_revenue(self):
-        out = [
-            (service, self.revenue_expectations[service])
-            for service in self.revenue_expectations
-        ]
+        out = list(self.revenue_expectations.items())
         out = sorted(out, key=lambda x: x[1])
         return out
 
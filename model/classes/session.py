@@ -0,0 +1,92 @@
+from typing import List
+from ..types import ApplicationEntityType, ServiceEntityType, ServicerEntityType
+from ..shared import Shared
+
+
+class SessionPool(Shared):
+    """
+    Store of the open sessions.
+
+    Sessions are kept in preallocated slots of a ring buffer with one list
+    per field rather than a dict each. A session is referred to by its
+    session number, which increases by one for every session opened, and
+    lives in slot session_number % capacity. Opening and closing a session
+    is O(1), the oldest open session is always at the head of the ring.
+
+    The ring doubles in size when a session is opened while the span from
+    the oldest open session to the newest one fills all the slots.
+    """
+
+    fields = ("application", "service", "servicers", "number_of_relays")
+
+    def __init__(self, capacity: int = 16):
+        self.capacity = capacity
+        self.head = 0
+        self.tail = 0
+        self.n_open = 0
+        self.open = [False] * capacity
+        self.application: List[ApplicationEntityType] = [None] * capacity
+        self.service: List[ServiceEntityType] = [None] * capacity
+        self.servicers: List[List[ServicerEntityType]] = [None] * capacity
+        self.number_of_relays: List[int] = [None] * capacity
+
+    def __len__(self) -> int:
+        return self.n_open
+
+    def __iter__(self):
+        for session in range(self.head, self.tail):
+            if self.open[session % self.capacity]:
+                yield session
+
+    def slot(self, session: int) -> int:
+        return session % self.capacity
+
+    def acquire(
+        self,
+        application: ApplicationEntityType,
+        service: ServiceEntityType,
+        servicers: List[ServicerEntityType],
+        number_of_relays: int,
+    ) -> int:
+        if self.tail - self.head == self.capacity:
+            self.grow()
+        session = self.tail
+        i = session % self.capacity
+        self.open[i] = True
+        self.application[i] = application
+        self.service[i] = service
+        self.servicers[i] = servicers
+        self.number_of_relays[i] = number_of_relays
+        self.tail += 1
+        self.n_open += 1
+        return session
+
+    def release(self, session: int) -> None:
+        i = session % self.capacity
+        assert self.head <= session < self.tail and self.open[i], "Invalid session"
+        self.open[i] = False
+        # Do not keep the entities of closed sessions alive
+        self.application[i] = None
+        self.service[i] = None
+        self.servicers[i] = None
+        self.n_open -= 1
+        while self.head < self.tail and not self.open[self.head % self.capacity]:
+            self.head += 1
+
+    def first(self) -> int:
+        if self.n_open == 0:
+            raise IndexError("No open sessions")
+        return self.head
+
+    def grow(self) -> None:
+        capacity = 2 * self.capacity
+        columns = {field: [None] * capacity for field in SessionPool.fields}
+        columns["open"] = [False] * capacity
+        for session in range(self.head, self.tail):
+            for field, column in columns.items():
+                column[session % capacity] = getattr(self, field)[
+                    session % self.capacity
+                ]
+        for field, column in columns.items():
+            setattr(self, field, column)
+        self.capacity = capacity
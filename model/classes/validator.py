@@ -1,8 +1,18 @@
 from ..types import PublicKeyType, uPOKTType, ServiceURLType, StakeStatusType
+from .entity import Entity
 
 
-class Validator:
-    id_number = 0
+class Validator(Entity):
+    __slots__ = (
+        "id_number",
+        "name",
+        "public_key",
+        "pokt_holdings",
+        "staked_pokt",
+        "service_url",
+        "operator_public_key",
+        "stake_status",
+    )
 
     def __init__(
         self,
@@ -13,8 +23,8 @@ class Validator:
         operator_public_key: PublicKeyType,
         stake_status: StakeStatusType,
     ):
-        self.id_number = Validator.id_number
-        Validator.id_number += 1
+        # Given by state["ids"] when added to a run
+        self.id_number = None
         self.name = name
         self.public_key = self
         self.pokt_holdings = pokt_holdings
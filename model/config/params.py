@@ -190,6 +190,9 @@ functional_param_config: Dict[str, FunctionalParamsType] = {
         "relay_requests_function": ["test"],
         "submit_relay_requests_function": ["basic_gamma"],
         "submit_relay_requests_policy_function": ["V1"],
+        "session_generation_function": ["sequential"],
+        "servicer_selection_function": ["uniform"],
+        "block_reward_function": ["sequential"],
         "application_leave_function": ["basic"],
         "service_leave_function": ["basic"],
         "servicer_leave_function": ["basic"],
@@ -211,6 +214,9 @@ functional_param_config: Dict[str, FunctionalParamsType] = {
         "relay_requests_function": ["test"],
         "submit_relay_requests_function": ["basic_gamma"],
         "submit_relay_requests_policy_function": ["V1"],
+        "session_generation_function": ["sequential"],
+        "servicer_selection_function": ["uniform"],
+        "block_reward_function": ["sequential"],
         "application_leave_function": ["basic"],
         "service_leave_function": ["basic"],
         "servicer_leave_function": ["basic"],
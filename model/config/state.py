@@ -1,10 +1,26 @@
 from copy import deepcopy
-from model.classes import Application, DAO, Gateway, Service, Servicer, Validator
+from model.classes import (
+    Application,
+    DAO,
+    Gateway,
+    Service,
+    Servicer,
+    Validator,
+    SessionPool,
+)
 from ..types import StateType
 from model.policy import service_linking_policy
 from model.mechanisms import link_service_mechanism
+from model.rng import RNGContext, get_rng
+from model.sampling import ServicerSampler
+from model.servicer_index import ServicerIndex
+from model.revenue import RevenueExpectations
+from model.indexed_set import IndexedSet
+from model.ids import IdAllocator
+from model.history import ServicerHistory
+from model.links import LinkMatrix
+from model.invariants import Invariants
 from itertools import product
-import random
 
 config_option_map = {
     "Test": {
@@ -28,20 +44,28 @@ config_option_map = {
 }
 
 
-def build_state(config_option) -> StateType:
+def build_state(config_option, seed_key=None) -> StateType:
+    # Random draws are seeded from the seed key, the config option by default
+    if seed_key is None:
+        seed_key = config_option
     config_option = config_option_map[config_option]
     state = {}
 
     state["Geozones"] = geo_zones_config[config_option["Geozones"]]
-    state["Applications"] = application_config[config_option["Applications"]]
+    state["Applications"] = IndexedSet(
+        application_config[config_option["Applications"]]
+    )
     state["DAO"] = dao_config[config_option["DAO"]]
-    state["Gateways"] = gateways_config[config_option["Gateways"]]
-    state["Services"] = service_config[config_option["Services"]]
-    state["Servicers"] = servicers_config[config_option["Servicers"]]
+    state["Gateways"] = IndexedSet(gateways_config[config_option["Gateways"]])
+    state["Services"] = IndexedSet(service_config[config_option["Services"]])
+    state["Servicers"] = IndexedSet(servicers_config[config_option["Servicers"]])
     state["Validators"] = validators_config[config_option["Validators"]]
     state["height"] = 0
     state["day"] = 0
-    state["Sessions"] = []
+    state["Sessions"] = SessionPool()
+    state["servicer_sampler"] = ServicerSampler()
+    state["servicer_index"] = ServicerIndex()
+    state["revenue_expectations"] = RevenueExpectations()
     state["total_relays"] = None
     state["processed_relays"] = None
     state["pokt_price_true"] = 0.06 / 1e6
@@ -50,15 +74,27 @@ def build_state(config_option) -> StateType:
     state["relay_log"] = None
     state["servicer_relay_log"] = None
     state["floating_supply"] = 1521517215 * 10e6
-    state["understaked_servicers"] = []
-    state["understaked_gateways"] = []
-    state["understaked_applications"] = []
+    state["understaked_servicers"] = IndexedSet()
+    state["understaked_gateways"] = IndexedSet()
+    state["understaked_applications"] = IndexedSet()
     state["POKT_burned"] = 0
     state["POKT_minted"] = 0
     state["period_slashing_costs"] = 0
     state["period_jailing_opportunity_cost"] = 0
+    state["rng"] = RNGContext(seed_key)
+    state["invariants"] = Invariants()
+    state["ids"] = IdAllocator()
+    state["servicer_history"] = ServicerHistory()
+    state["service_links"] = LinkMatrix()
 
     state = deepcopy(state)
+    for key in ("Applications", "Gateways", "Services", "Servicers", "Validators"):
+        for entity in state[key]:
+            state["ids"].assign(entity)
+    for service in state["Services"]:
+        state["service_links"].add_service(service)
+    for servicer in state["Servicers"]:
+        state["service_links"].add_servicer(servicer)
     return state
 
 
@@ -271,7 +307,7 @@ def find_service_density(state):
 
 def enforce_density_service_servicers(state, params_density):
     pairs = list(product(state["Servicers"], state["Services"]))
-    random.shuffle(pairs)
+    get_rng(state, "linking").shuffle(pairs)
     while (
         len(pairs) > 0
         and find_service_density(state) < params_density["target_density"]
@@ -0,0 +1,280 @@
+import pickle
+import pandas as pd
+from functools import reduce
+from typing import Callable, Dict, List
+from .checkpoint import Checkpointer
+from .psub import psub_blocks
+from .recorder import MetricsRecorder, count_records, entity_capacities
+from .shared import recording_blocks, share_state
+from .types import ParamType, StateType
+
+
+def default_policy_ops() -> List[Callable]:
+    # cadCAD's default, signals with the same key are summed
+    return [lambda a, b: a + b]
+
+
+def snapshot(state: StateType) -> StateType:
+    """
+    Independent copy of the state for the history.
+
+    A pickle round trip keeps the object graph intact like deepcopy does
+    but runs in C, so it is several times faster on the entity lists.
+    """
+    return pickle.loads(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+
+def aggregate_signals(signals: List[dict], policy_ops: List[Callable]) -> dict:
+    grouped = {}
+    for signal in signals:
+        for key in signal:
+            grouped.setdefault(key, []).append(signal[key])
+
+    ops_head, *ops_tail = policy_ops
+    out = {}
+    for key, values in grouped.items():
+        value = reduce(ops_head, values)
+        for op in ops_tail:
+            value = op(value)
+        out[key] = value
+    return out
+
+
+def apply_block(
+    params: ParamType,
+    substep: int,
+    state_history: List[List[StateType]],
+    state: StateType,
+    block: Dict[str, Dict[str, Callable]],
+    policy_ops: List[Callable],
+) -> None:
+    """
+    Apply one partial state update block to the state in place.
+
+    Policies and state update functions keep cadCAD's signatures. All of the
+    state update functions see the post-policy state and their results are
+    applied together once they have all been computed.
+    """
+    signals = [
+        policy(params, substep, state_history, state)
+        for policy in block["policies"].values()
+    ]
+    _input = aggregate_signals(signals, policy_ops)
+    updates = [
+        f(params, substep, state_history, state, _input)
+        for f in block["variables"].values()
+    ]
+    for key, value in updates:
+        state[key] = value
+
+
+def simulate_run(
+    params: ParamType,
+    initial_state: StateType,
+    time_seq: range,
+    simulation: int = 0,
+    subset: int = 0,
+    run: int = 1,
+    partial_state_update_blocks: List[dict] = psub_blocks,
+    policy_ops: List[Callable] = None,
+    recording: str = "substep",
+    record_interval: int = 1,
+    recorder: MetricsRecorder = None,
+    checkpointer: Checkpointer = None,
+) -> List[StateType]:
+    """
+    Run one monte carlo run without the cadCAD executor.
+
+    The records returned follow the raw_system_events schema from cadCAD: a
+    genesis record at timestep 0 followed by one record per substep.
+
+    recording="timestep" only records the state after the final block of each
+    timestep and record_interval=k only records every k-th timestep (the final
+    timestep is always kept). Only recorded states are in the state_history
+    handed to policies.
+
+    If a recorder is passed the recorded states are written to it instead and
+    neither returned nor kept in the state_history.
+
+    With a checkpointer the run is saved every checkpointer.every timesteps
+    and picks up from its latest checkpoint if there is one.
+    """
+    if policy_ops is None:
+        policy_ops = default_policy_ops()
+    assert recording in ("substep", "timestep"), "Invalid recording"
+    assert record_interval >= 1, "Invalid record_interval"
+    n_blocks = len(partial_state_update_blocks)
+    final_timestep = time_seq[-1] + 1
+
+    state = snapshot(initial_state)
+    state["simulation"] = simulation
+    state["subset"] = subset
+    state["run"] = run
+    state["substep"] = 0
+    state["timestep"] = 0
+
+    if recorder is None:
+        state_history = [[snapshot(state)]]
+    else:
+        recorder.record(state)
+        state_history = []
+
+    resumed_from = 0
+    checkpoint = None
+    if checkpointer is not None:
+        fingerprint = checkpointer.fingerprint(
+            params,
+            time_seq,
+            recording=recording,
+            record_interval=record_interval,
+            metrics=recorder is not None,
+            record_entities=recorder is not None and recorder.record_entities,
+        )
+        checkpoint = checkpointer.load(state, fingerprint)
+    if checkpoint is not None:
+        resumed_from, state, results = checkpoint
+        if recorder is None:
+            state_history = results
+        else:
+            recorder.__dict__.update(results.__dict__)
+
+    for x in time_seq:
+        timestep = x + 1
+        if timestep <= resumed_from:
+            continue
+        record = timestep % record_interval == 0 or timestep == final_timestep
+        records = []
+        for substep, block in enumerate(partial_state_update_blocks, start=1):
+            apply_block(params, substep, state_history, state, block, policy_ops)
+            state["substep"] = substep
+            state["timestep"] = timestep
+            if record and (recording == "substep" or substep == n_blocks):
+                if recorder is None:
+                    records.append(snapshot(state))
+                else:
+                    recorder.record(state, end_of_timestep=substep == n_blocks)
+        if records:
+            state_history.append(records)
+        if checkpointer is not None and checkpointer.due(timestep, final_timestep):
+            checkpointer.save(
+                state,
+                fingerprint,
+                timestep,
+                state_history if recorder is None else recorder,
+            )
+
+    return [record for records in state_history for record in records]
+
+
+def execute(
+    configs,
+    recording="substep",
+    record_interval=1,
+    metrics=False,
+    record_entities=False,
+    checkpointer=None,
+    sink=None,
+) -> pd.DataFrame:
+    """
+    Lean replacement for cadCAD's Executor.execute on an experiment's configs.
+
+    With metrics=True each run is written to a MetricsRecorder rather than
+    kept as full state copies, record_entities additionally keeps copies of
+    the entity columns.
+
+    With a sink each run is handed to sink.write_run under its experiment
+    name (the model_id of its config) as soon as it is done and nothing is
+    returned.
+    """
+    raw_system_events = []
+    frames = []
+    for config in configs:
+        params = config.sim_config["M"]
+        time_seq = config.sim_config["T"]
+        if metrics:
+            recorder = MetricsRecorder(
+                count_records(
+                    time_seq,
+                    len(config.partial_state_update_blocks),
+                    recording,
+                    record_interval,
+                ),
+                entity_capacities(params, config.initial_state),
+                record_entities=record_entities,
+            )
+        else:
+            recorder = None
+        records = simulate_run(
+            params,
+            config.initial_state,
+            time_seq,
+            simulation=config.simulation_id,
+            subset=config.subset_id,
+            run=config.run_id + 1,
+            partial_state_update_blocks=config.partial_state_update_blocks,
+            policy_ops=config.policy_ops,
+            recording=recording,
+            record_interval=record_interval,
+            recorder=recorder,
+            checkpointer=checkpointer,
+        )
+        if sink is not None:
+            df = recorder.to_frame() if metrics else pd.DataFrame(records)
+            sink.write_run(config.model_id, df)
+        elif metrics:
+            frames.append(recorder.to_frame())
+        else:
+            raw_system_events.extend(records)
+    if sink is not None:
+        return None
+    if metrics:
+        return pd.concat(frames, ignore_index=True)
+    return pd.DataFrame(raw_system_events)
+
+
+def p_record(_params, substep, state_history, state) -> dict:
+    """
+    Recording policy run first in every block under the cadCAD executor, it
+    records the state the previous block left.
+
+    The runs are executed with sharing on (see run()), so cadCAD's copy of
+    the state at every substep hands back the entities and their collections
+    as they are. On the genesis state the run first gets its own copy of the
+    state, as cadCAD's history then only holds references to the live
+    entities the recorder is the record of the run.
+    """
+    if state["timestep"] == 0:
+        state.update(snapshot(state))
+        share_state(state)
+    state["recorder"].record(state, end_of_timestep=substep == 1)
+    return {}
+
+
+def attach_recorders(configs, record_entities=False) -> None:
+    """
+    Set cadCAD configs up to write their runs to a MetricsRecorder.
+    """
+    for config in configs:
+        blocks = config.partial_state_update_blocks
+        config.partial_state_update_blocks = recording_blocks(blocks, p_record)
+        config.initial_state["recorder"] = MetricsRecorder(
+            count_records(config.sim_config["T"], len(blocks), "substep", 1),
+            entity_capacities(config.sim_config["M"], config.initial_state),
+            record_entities=record_entities,
+        )
+
+
+def collect_recorders(raw_system_events: List[StateType]) -> pd.DataFrame:
+    """
+    Record the final state of every run from cadCAD's results and stitch the
+    recorders of the runs together.
+    """
+    final_records = {}
+    for record in raw_system_events:
+        final_records[(record["simulation"], record["subset"], record["run"])] = record
+    frames = []
+    for record in final_records.values():
+        recorder = record["recorder"]
+        recorder.record(record)
+        frames.append(recorder.to_frame())
+    return pd.concat(frames, ignore_index=True)
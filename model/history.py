@@ -0,0 +1,190 @@
+import numpy as np
+from types import MappingProxyType
+from typing import Dict, List, Mapping
+from .shared import Shared
+from .types import ServicerEntityType
+
+# Histories kept per servicer, by the name of the servicer attribute
+HISTORIES = (
+    "slashing_from_jailing_history",
+    "slashing_history",
+    "jail_lost_revenue_history",
+)
+
+
+class EventLog:
+    """
+    Append-only (servicer id, height, amount) events in NumPy buffers that
+    double when full, along with the running total and number of events of
+    each servicer, indexed by id_number.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.n = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.heights = np.zeros(capacity, dtype=np.int64)
+        self.amounts = np.zeros(capacity)
+        self.totals = np.zeros(16)
+        self.counts = np.zeros(16, dtype=np.int64)
+
+    def reserve(self, n_events: int, n_servicers: int) -> None:
+        # Doubles the buffers until they fit
+        capacity = len(self.ids)
+        while capacity < n_events:
+            capacity *= 2
+        if capacity > len(self.ids):
+            for name in ("ids", "heights", "amounts"):
+                buffer = getattr(self, name)
+                grown = np.zeros(capacity, dtype=buffer.dtype)
+                grown[: self.n] = buffer[: self.n]
+                setattr(self, name, grown)
+        if n_servicers > len(self.totals):
+            size = max(2 * len(self.totals), n_servicers)
+            for name in ("totals", "counts"):
+                column = getattr(self, name)
+                grown = np.zeros(size, dtype=column.dtype)
+                grown[: len(column)] = column
+                setattr(self, name, grown)
+
+    def append(self, id_number: int, height: int, amount: float) -> None:
+        if self.n == len(self.ids) or id_number >= len(self.totals):
+            self.reserve(self.n + 1, id_number + 1)
+        self.ids[self.n] = id_number
+        self.heights[self.n] = height
+        self.amounts[self.n] = amount
+        self.n += 1
+        self.totals[id_number] += amount
+        self.counts[id_number] += 1
+
+    def extend(self, ids: np.ndarray, heights: np.ndarray, amounts: np.ndarray):
+        """
+        Appends the events in order, the same as appending them one by one.
+        """
+        n = self.n + len(ids)
+        self.reserve(n, int(ids.max()) + 1 if len(ids) else 0)
+        self.ids[self.n : n] = ids
+        self.heights[self.n : n] = heights
+        self.amounts[self.n : n] = amounts
+        self.n = n
+        # Unbuffered, so a servicer's amounts are added in order
+        np.add.at(self.totals, ids, amounts)
+        np.add.at(self.counts, ids, 1)
+
+    def total(self, id_number: int) -> float:
+        if id_number >= len(self.totals):
+            return 0.0
+        return float(self.totals[id_number])
+
+    def count(self, id_number: int) -> int:
+        if id_number >= len(self.counts):
+            return 0
+        return int(self.counts[id_number])
+
+    def events(self, id_number: int, n: int = None) -> Dict[int, float]:
+        """
+        Amounts by height of the events of a servicer, out of the first n
+        events (all of them by default).
+        """
+        n = self.n if n is None else n
+        at = np.flatnonzero(self.ids[:n] == id_number)
+        return dict(zip(self.heights[at].tolist(), self.amounts[at].tolist()))
+
+    def __getstate__(self):
+        # The buffers are several times faster to pickle as bytes
+        state = dict(self.__dict__)
+        for name in ("ids", "heights", "amounts"):
+            state[name] = getattr(self, name)[: self.n].tobytes()
+        state["totals"] = self.totals.tobytes()
+        state["counts"] = self.counts.tobytes()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        capacity = max(2 * self.n, 64)
+        for name, dtype in (
+            ("ids", np.int64),
+            ("heights", np.int64),
+            ("amounts", float),
+        ):
+            buffer = np.zeros(capacity, dtype=dtype)
+            buffer[: self.n] = np.frombuffer(state[name], dtype=dtype)
+            setattr(self, name, buffer)
+        self.totals = np.frombuffer(bytearray(self.totals), dtype=float)
+        self.counts = np.frombuffer(bytearray(self.counts), dtype=np.int64)
+
+
+class ServicerHistory(Shared):
+    """
+    The slashing, slashing from jailing and revenue lost to jailing of the
+    servicers of a run, one EventLog per history.
+
+    A servicer refers to the history once it has an event in it, and its
+    history attributes (servicer.jail_lost_revenue_history, ...) are
+    read-only views of its events, by height like the dicts the servicers
+    used to hold. servicer.history_total and servicer.history_count are
+    O(1) reads of the running totals, which is what the KPIs use.
+    """
+
+    def __init__(self):
+        self.logs = {name: EventLog() for name in HISTORIES}
+
+    def record(
+        self, name: str, servicer: ServicerEntityType, height: int, amount: float
+    ) -> None:
+        self.logs[name].append(servicer.id_number, height, amount)
+        servicer.history = self
+
+    def extend(
+        self,
+        name: str,
+        servicers: List[ServicerEntityType],
+        heights: np.ndarray,
+        amounts: np.ndarray,
+    ) -> None:
+        ids = np.array([servicer.id_number for servicer in servicers], dtype=np.int64)
+        self.logs[name].extend(ids, heights, amounts)
+        for servicer in servicers:
+            servicer.history = self
+
+    def total(self, name: str, servicer: ServicerEntityType) -> float:
+        return self.logs[name].total(servicer.id_number)
+
+    def count(self, name: str, servicer: ServicerEntityType) -> int:
+        return self.logs[name].count(servicer.id_number)
+
+    def view(self, name: str, servicer: ServicerEntityType) -> Mapping:
+        return MappingProxyType(self.logs[name].events(servicer.id_number))
+
+    def snapshot(self, servicer: ServicerEntityType) -> "HistorySnapshot":
+        return HistorySnapshot(self, servicer)
+
+    def stamp(self, servicer: ServicerEntityType) -> tuple:
+        # The logs are append-only
+        return tuple(self.count(name, servicer) for name in HISTORIES)
+
+
+class HistorySnapshot:
+    """
+    History of one servicer as of when it was taken, stands in for the
+    history on recorded servicers. The logs are append-only, so the events
+    up to then are the first ones of each log.
+    """
+
+    def __init__(self, history: ServicerHistory, servicer: ServicerEntityType):
+        self.history = history
+        self.n = {name: log.n for name, log in history.logs.items()}
+        self.totals = {name: history.total(name, servicer) for name in HISTORIES}
+        self.counts = {name: history.count(name, servicer) for name in HISTORIES}
+
+    def total(self, name: str, servicer: ServicerEntityType) -> float:
+        return self.totals[name]
+
+    def count(self, name: str, servicer: ServicerEntityType) -> int:
+        return self.counts[name]
+
+    def view(self, name: str, servicer: ServicerEntityType) -> Mapping:
+        log = self.history.logs[name]
+        return MappingProxyType(log.events(servicer.id_number, self.n[name]))
+
+    def snapshot(self, servicer: ServicerEntityType) -> "HistorySnapshot":
+        return self
@@ -0,0 +1,28 @@
+from typing import Dict
+from .shared import Shared
+
+
+class IdAllocator(Shared):
+    """
+    Hands out the id numbers of the entities of one run, counting up from 0
+    per entity class in the order the entities are added to the state.
+
+    The ids of a class are dense, so they can index arrays over everyone of
+    that class seen in the run, and they only depend on the run itself, not
+    on what ran before it in the same process.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+
+    def assign(self, entity) -> int:
+        kind = type(entity).__name__
+        entity.id_number = self.counts.get(kind, 0)
+        self.counts[kind] = entity.id_number + 1
+        return entity.id_number
+
+    def count(self, kind: str) -> int:
+        """
+        Number of ids handed out for the class named kind.
+        """
+        return self.counts.get(kind, 0)
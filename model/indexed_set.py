@@ -0,0 +1,91 @@
+from typing import Iterable
+from .shared import Shared
+
+
+class Hole:
+    """
+    Takes the place of a discarded item until the items are compacted.
+    """
+
+
+class IndexedSet(Shared):
+    """
+    Insertion ordered set of entities with O(1) add, discard and membership
+    that can also be indexed by position, like the lists it replaces.
+
+    The items are kept in a list along with the position of each in a dict.
+    Discarding an item leaves a hole in the list, the holes are closed up in
+    one pass by the next positional access or iteration, so a batch of
+    discards costs O(n) once instead of O(n) each. Iteration is over the
+    items as of when it started, in the order they were added, which keeps
+    the draws made over the items those made over a list.
+    """
+
+    def __init__(self, items: Iterable = ()):
+        self.items = list(dict.fromkeys(items))
+        self.holes = 0
+        self._positions = None
+
+    @property
+    def positions(self) -> dict:
+        # Built on first use, most of the unpickled copies are never looked up
+        if self._positions is None:
+            self._positions = {x: i for i, x in enumerate(self.items) if x is not Hole}
+        return self._positions
+
+    def add(self, item) -> None:
+        positions = self.positions
+        if item not in positions:
+            positions[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item) -> None:
+        position = self.positions.pop(item, None)
+        if position is not None:
+            self.items[position] = Hole
+            self.holes += 1
+
+    def compact(self) -> None:
+        if self.holes:
+            self.items = [x for x in self.items if x is not Hole]
+            self._positions = None
+            self.holes = 0
+
+    def index(self, item) -> int:
+        self.compact()
+        try:
+            return self.positions[item]
+        except KeyError:
+            raise ValueError("{} is not in the set".format(item))
+
+    def __getitem__(self, i):
+        # Slices give lists
+        self.compact()
+        return self.items[i]
+
+    def __iter__(self):
+        self.compact()
+        return iter(self.items.copy())
+
+    def __len__(self) -> int:
+        return len(self.items) - self.holes
+
+    def __contains__(self, item) -> bool:
+        return item in self.positions
+
+    def __copy__(self) -> "IndexedSet":
+        return IndexedSet(self)
+
+    def __repr__(self) -> str:
+        return "IndexedSet({})".format(list(self))
+
+    def __getstate__(self):
+        # In a tuple, an empty state would not be set
+        self.compact()
+        return (self.items,)
+
+    def __setstate__(self, state: tuple) -> None:
+        # The items were unique when pickled
+        self.items = state[0]
+        self.holes = 0
+        self._positions = None
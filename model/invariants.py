@@ -0,0 +1,60 @@
+from math import isclose
+from .types import StateType
+
+LEVELS = ("off", "sampled", "strict")
+
+
+class Invariants:
+    """
+    How thoroughly the invariants of a run are checked, kept in
+    state["invariants"] and picked per run with run(..., invariants=level).
+
+    "sampled" (the default) checks them only at every sample_every-th
+    timestep, "off" never, which takes the checks out of the hot path of
+    production sweeps, and "strict" at every timestep, for debugging. A
+    failed check raises an AssertionError like the plain asserts it
+    replaces.
+
+    Besides the relay log totals and the fee split, the run checks that the
+    floating supply only moves by what was minted minus what was burned over
+    each timestep. Both are reset at the start of the timestep, so this only
+    needs the floating supply the timestep started from.
+    """
+
+    def __init__(self, level: str = "sampled", sample_every: int = 7):
+        assert level in LEVELS, "Invalid invariant level"
+        assert sample_every >= 1, "Invalid sample_every"
+        self.level = level
+        self.sample_every = sample_every
+        self.supply_at_start = None
+
+    def due(self, state: StateType) -> bool:
+        if self.level == "strict":
+            return True
+        if self.level == "sampled":
+            return state["timestep"] % self.sample_every == 0
+        return False
+
+
+def check_invariants(state: StateType) -> bool:
+    return state["invariants"].due(state)
+
+
+def start_supply_check(state: StateType) -> None:
+    invariants = state["invariants"]
+    if invariants.level != "off":
+        invariants.supply_at_start = state["floating_supply"]
+
+
+def check_supply_conservation(state: StateType) -> None:
+    invariants = state["invariants"]
+    if invariants.supply_at_start is None or not invariants.due(state):
+        return
+    delta = state["floating_supply"] - invariants.supply_at_start
+    net_mint = state["POKT_minted"] - state["POKT_burned"]
+    # The supply is a float far beyond 2**53, allow for its rounding
+    assert isclose(
+        delta, net_mint, abs_tol=1e-12 * abs(state["floating_supply"])
+    ), "Floating supply is not conserved: moved by {} but net mint is {}".format(
+        delta, net_mint
+    )
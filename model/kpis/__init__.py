@@ -1 +1,2 @@
 from .simulation_kpis import create_simulation_kpis
+from .gini import calculate_gini_from_list, calculate_gini_from_dict
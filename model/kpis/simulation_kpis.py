@@ -10,6 +10,10 @@ def get_unique_servicers(df):
         # Assign as the last of timestep with one
         unique_servicers[key] = {}
         df_mini = df[df["key"] == key]
+        # The metrics recorder keeps a registry of every one seen in the run
+        if "Servicers" not in df_mini.columns:
+            unique_servicers[key] = df_mini["servicer_registry"].iloc[-1]
+            continue
         for x in df_mini["Servicers"]:
             for y in x:
                 unique_servicers[key][y.id_number] = y
@@ -23,6 +27,10 @@ def get_unique_gateways(df):
         # Assign as the last of timestep with one
         unique_gateways[key] = {}
         df_mini = df[df["key"] == key]
+        # The metrics recorder keeps a registry of every one seen in the run
+        if "Gateways" not in df_mini.columns:
+            unique_gateways[key] = df_mini["gateway_registry"].iloc[-1]
+            continue
         for x in df_mini["Gateways"]:
             for y in x:
                 unique_gateways[key][y.id_number] = y
@@ -35,9 +43,9 @@ def compute_kpi8(unique_servicers):
     for key in unique_servicers:
         servicers = unique_servicers[key]
         slashes = [
-            sum(x.slashing_history.values())
+            x.history_total("slashing_history")
             for x in servicers.values()
-            if len(x.slashing_history) > 0
+            if x.history_count("slashing_history") > 0
         ]
         n = len(slashes)
         total_slashed = -sum(slashes)
@@ -55,12 +63,12 @@ def compute_kpi_e(unique_servicers):
     for key in unique_servicers:
         servicers = unique_servicers[key]
         slashing_cost = sum(
-            [sum(x.slashing_history.values()) for x in servicers.values()]
+            [x.history_total("slashing_history") for x in servicers.values()]
         )
         jailing_cost = -sum(
             [
-                sum(x.jail_lost_revenue_history.values())
-                + sum(x.slashing_history.values())
+                x.history_total("jail_lost_revenue_history")
+                + x.history_total("slashing_history")
                 for x in servicers.values()
             ]
         )
@@ -101,7 +109,7 @@ def compute_kpi_11(unique_servicers):
         for servicer in servicers.values():
             if servicer.total_revenues > 0:
                 servicer.kpi_11 = (
-                    sum(servicer.jail_lost_revenue_history.values())
+                    servicer.history_total("jail_lost_revenue_history")
                     / servicer.total_revenues
                 )
             else:
@@ -136,7 +144,7 @@ def compute_kpi_1(
                     1
                     / (1 + r)
                     * (1 - p_j)
-                    * sum(servicer.jail_lost_revenue_history.values())
+                    * servicer.history_total("jail_lost_revenue_history")
                 )
             )
             servicer.kpi_1 = npv
@@ -0,0 +1,288 @@
+import numpy as np
+from typing import List
+from .shared import Shared
+from .types import ServiceEntityType, ServicerEntityType
+
+# Axes of the matrix, servicers are rows and services columns
+SERVICER = 0
+SERVICE = 1
+
+
+class LinkMatrix(Shared):
+    """
+    Which servicers are linked to which services, the one place the links
+    are kept. It is a servicer x service bitset, one bit per pair packed
+    eight to a byte, along with when each pair was linked.
+
+    Servicers and services get a row and a column when they are added and
+    give them back when they are removed, so the bitset grows with the
+    number of entities in the run at once rather than with every one ever
+    added; it doubles along an axis when it runs out. Linking, unlinking and
+    checking for a link are O(1) on the bitset. servicer.services and
+    service.servicers are read-only views of the links of a row and of a
+    column, in the order they were made like the sets they replace.
+
+    state["servicer_index"] and state["revenue_expectations"] read the links
+    from here. Each column counts the changes to its links, which is how
+    the servicer index knows its lists of a service are stale.
+
+    The matrix is copied at every substep of a cadCAD run, so it copies and
+    pickles as the bitset, when the pairs that are set were linked and the
+    entity of each row and column. The row and column of each entity and
+    the links of each row and column, in order, are built again on first
+    use.
+    """
+
+    def __init__(self):
+        self.bits = np.zeros((16, 2), dtype=np.uint8)
+        # When each pair was linked, counting the links made
+        self.order = np.zeros((16, 16), dtype=np.int64)
+        self.n_links_made = 0
+        self.servicers = [None] * 16
+        self.services = [None] * 16
+        # When the service of each column was added, counting the services
+        self.added = [0] * 16
+        self.n_services_added = 0
+        self.free_rows = list(range(15, -1, -1))
+        self.free_cols = list(range(15, -1, -1))
+        self.versions = [0] * 16
+        self.clear_index()
+
+    def clear_index(self) -> None:
+        self._rows = None
+        self._cols = None
+        self._row_links = None
+        self._col_links = None
+
+    @property
+    def rows(self) -> dict:
+        if self._rows is None:
+            self._rows = {x: i for i, x in enumerate(self.servicers) if x is not None}
+        return self._rows
+
+    @property
+    def cols(self) -> dict:
+        if self._cols is None:
+            self._cols = {x: i for i, x in enumerate(self.services) if x is not None}
+        return self._cols
+
+    @property
+    def row_links(self) -> list:
+        # The services of each row as the keys of a dict, in the order they
+        # were linked
+        if self._row_links is None:
+            self.build_links()
+        return self._row_links
+
+    @property
+    def col_links(self) -> list:
+        if self._col_links is None:
+            self.build_links()
+        return self._col_links
+
+    def build_links(self) -> None:
+        row_links = [None if x is None else {} for x in self.servicers]
+        col_links = [None if x is None else {} for x in self.services]
+        rows, cols = np.nonzero(self.linked())
+        by_order = np.argsort(self.order[rows, cols])
+        for row, col in zip(rows[by_order].tolist(), cols[by_order].tolist()):
+            row_links[row][self.services[col]] = None
+            col_links[col][self.servicers[row]] = None
+        self._row_links = row_links
+        self._col_links = col_links
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self.servicers), len(self.services))
+
+    def grow(self, n_rows: int, n_cols: int) -> None:
+        rows, cols = self.shape
+        bits = np.zeros((n_rows, (n_cols + 7) // 8), dtype=np.uint8)
+        bits[: self.bits.shape[0], : self.bits.shape[1]] = self.bits
+        self.bits = bits
+        order = np.zeros((n_rows, n_cols), dtype=np.int64)
+        order[:rows, :cols] = self.order
+        self.order = order
+        self.free_rows[:0] = range(n_rows - 1, rows - 1, -1)
+        self.free_cols[:0] = range(n_cols - 1, cols - 1, -1)
+        self.servicers.extend([None] * (n_rows - rows))
+        self.services.extend([None] * (n_cols - cols))
+        self.added.extend([0] * (n_cols - cols))
+        self.versions.extend([0] * (n_cols - cols))
+        self.clear_index()
+
+    def add_servicer(self, servicer: ServicerEntityType) -> None:
+        if not self.free_rows:
+            rows, cols = self.shape
+            self.grow(2 * rows, cols)
+        row = self.free_rows.pop()
+        self.servicers[row] = servicer
+        self.rows[servicer] = row
+        self.row_links[row] = {}
+        servicer.links = self
+
+    def remove_servicer(self, servicer: ServicerEntityType) -> None:
+        # The servicer keeps the links it had, its row goes to the next one
+        servicer.links = self.snapshot(servicer)
+        for service in list(self.row_links[self.rows[servicer]]):
+            self.unlink(service, servicer)
+        row = self.rows.pop(servicer)
+        self.row_links[row] = None
+        self.servicers[row] = None
+        self.free_rows.append(row)
+
+    def add_service(self, service: ServiceEntityType) -> None:
+        if not self.free_cols:
+            rows, cols = self.shape
+            self.grow(rows, 2 * cols)
+        col = self.free_cols.pop()
+        self.services[col] = service
+        self.n_services_added += 1
+        self.added[col] = self.n_services_added
+        self.cols[service] = col
+        self.col_links[col] = {}
+        service.links = self
+
+    def remove_service(self, service: ServiceEntityType) -> None:
+        service.links = self.snapshot(service)
+        for servicer in list(self.col_links[self.cols[service]]):
+            self.unlink(service, servicer)
+        col = self.cols.pop(service)
+        self.col_links[col] = None
+        self.services[col] = None
+        self.added[col] = 0
+        self.versions[col] += 1
+        self.free_cols.append(col)
+
+    def has_link(self, row: int, col: int) -> bool:
+        return bool(int(self.bits[row, col >> 3]) >> (col & 7) & 1)
+
+    def link(self, service: ServiceEntityType, servicer: ServicerEntityType) -> None:
+        row, col = self.rows[servicer], self.cols[service]
+        if self.has_link(row, col):
+            return
+        row_links, col_links = self.row_links, self.col_links
+        self.bits[row, col >> 3] |= 1 << (col & 7)
+        self.n_links_made += 1
+        self.order[row, col] = self.n_links_made
+        row_links[row][service] = None
+        col_links[col][servicer] = None
+        self.versions[col] += 1
+
+    def unlink(self, service: ServiceEntityType, servicer: ServicerEntityType) -> None:
+        row, col = self.rows[servicer], self.cols[service]
+        if not self.has_link(row, col):
+            return
+        row_links, col_links = self.row_links, self.col_links
+        self.bits[row, col >> 3] &= ~np.uint8(1 << (col & 7))
+        self.order[row, col] = 0
+        del row_links[row][service]
+        del col_links[col][servicer]
+        self.versions[col] += 1
+
+    def linked(self) -> np.ndarray:
+        """
+        The bitset unpacked to a boolean matrix, rows by columns.
+        """
+        return np.unpackbits(
+            self.bits, axis=1, count=len(self.services), bitorder="little"
+        ).view(bool)
+
+    def linked_to(self, entity) -> dict:
+        """
+        The services of a servicer or the servicers of a service, as the
+        keys of a dict in the order they were linked.
+        """
+        if entity.link_axis == SERVICER:
+            return self.row_links[self.rows[entity]]
+        return self.col_links[self.cols[entity]]
+
+    def unlinked_services(self, servicer: ServicerEntityType) -> List:
+        """
+        The services in state["Services"] the servicer is not linked to, in
+        the same order.
+        """
+        linked = np.unpackbits(
+            self.bits[self.rows[servicer]], count=len(self.services), bitorder="little"
+        ).view(bool)
+        added = np.array(self.added)
+        cols = np.flatnonzero((added > 0) & ~linked)
+        # Services are in state["Services"] in the order they were added
+        cols = cols[np.argsort(added[cols])]
+        return [self.services[x] for x in cols.tolist()]
+
+    def view(self, entity) -> "LinkView":
+        return LinkView(self, entity)
+
+    def snapshot(self, entity) -> "LinkSnapshot":
+        return LinkSnapshot(self.linked_to(entity))
+
+    def stamp(self, entity) -> tuple:
+        return tuple(self.linked_to(entity))
+
+    def __getstate__(self):
+        # The bitset and the order of the pairs that are set are several
+        # times faster to pickle as bytes
+        state = {
+            name: value
+            for name, value in self.__dict__.items()
+            if not name.startswith("_")
+        }
+        state["shape"] = self.bits.shape
+        state["bits"] = self.bits.tobytes()
+        state["order"] = self.order[self.linked()].tobytes()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        shape = state.pop("shape")
+        order = state.pop("order")
+        self.__dict__.update(state)
+        self.bits = np.frombuffer(bytearray(self.bits), dtype=np.uint8).reshape(shape)
+        self.order = np.zeros(self.shape, dtype=np.int64)
+        self.order[self.linked()] = np.frombuffer(order, dtype=np.int64)
+        self.clear_index()
+
+
+class LinkView:
+    """
+    Read-only view of the services of a servicer or the servicers of a
+    service, in the order they were linked. Iterating goes over the links
+    as of when it started.
+    """
+
+    __slots__ = ("links", "entity")
+
+    def __init__(self, links: LinkMatrix, entity):
+        self.links = links
+        self.entity = entity
+
+    def __iter__(self):
+        return iter(tuple(self.links.linked_to(self.entity)))
+
+    def __len__(self) -> int:
+        return len(self.links.linked_to(self.entity))
+
+    def __contains__(self, other) -> bool:
+        return other in self.links.linked_to(self.entity)
+
+    def __getitem__(self, i):
+        return tuple(self.links.linked_to(self.entity))[i]
+
+    def __repr__(self) -> str:
+        return "LinkView({})".format(list(self))
+
+
+class LinkSnapshot:
+    """
+    Links of one entity as of when it was taken, stands in for the matrix on
+    removed and recorded entities.
+    """
+
+    def __init__(self, linked):
+        self.linked = tuple(linked)
+
+    def view(self, entity) -> tuple:
+        return self.linked
+
+    def snapshot(self, entity) -> "LinkSnapshot":
+        return self
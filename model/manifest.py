@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+
+STATUSES = ("pending", "running", "done", "failed")
+
+
+def atomic_write(path: str, write) -> None:
+    """
+    Call write(f) on a temporary file next to path and rename it into place
+    once it is complete, so path never holds a partial file.
+    """
+    folder = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class JobManifest:
+    """
+    Status of each experiment key of a set of runs, kept as a JSON file that
+    is rewritten atomically on every change.
+
+    Only keys marked done are trusted to have output. A key still marked
+    running when the manifest is loaded was interrupted by a crash, it goes
+    back to pending along with the failed ones.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.exists(path):
+            with open(path) as f:
+                self.jobs = json.load(f)
+        else:
+            self.jobs = {}
+
+    def status(self, key: str) -> str:
+        return self.jobs.get(key, {"status": "pending"})["status"]
+
+    def set_status(self, keys, status: str, error: str = None) -> None:
+        assert status in STATUSES, "Invalid status"
+        for key in keys:
+            self.jobs[key] = {
+                "status": status,
+                "updated": datetime.now().isoformat(),
+                "error": error,
+            }
+        self.save()
+
+    def save(self) -> None:
+        atomic_write(self.path, lambda f: json.dump(self.jobs, f, indent=4))
+
+    def pending(self, experiment_keys) -> list:
+        """
+        Keys still to run, resetting the ones interrupted or failed before.
+        """
+        reset = [
+            key for key in experiment_keys if self.status(key) in ("running", "failed")
+        ]
+        if reset:
+            self.set_status(reset, "pending")
+        return [key for key in experiment_keys if self.status(key) != "done"]
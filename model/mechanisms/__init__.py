@@ -22,6 +22,7 @@ from .servicer import (
     remove_servicer,
     modify_servicer_stake,
     servicer_update_pause_height,
+    pay_servicers_mechanism,
 )
 from .service import (
     add_service,
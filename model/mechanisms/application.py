@@ -1,8 +1,8 @@
-from ..types import StateType, ParamType, SessionType
+from ..types import StateType, ParamType
 from ..spaces import (
     application_entity_space,
     application_delegate_to_gateway_space,
-    submit_relay_request_space,
+    new_session_space,
     modify_application_pokt_space,
     servicer_relay_space,
     application_undelegation_space,
@@ -14,7 +14,8 @@ def add_application(
     state: StateType, params: ParamType, domain: Tuple[application_entity_space]
 ) -> None:
     space: application_entity_space = domain[0]
-    state["Applications"].append(space["application"])
+    state["ids"].assign(space["application"])
+    state["Applications"].add(space["application"])
 
 
 def update_application_delegate(
@@ -27,9 +28,15 @@ def update_application_delegate(
 
 
 def create_new_session(
-    state: StateType, params: ParamType, domain: Tuple[submit_relay_request_space]
+    state: StateType, params: ParamType, domain: Tuple[new_session_space]
 ) -> None:
-    state["Sessions"].append(domain[0]["session"])
+    space = domain[0]
+    state["Sessions"].acquire(
+        space["application"],
+        space["service"],
+        space["servicers"],
+        space["number_of_relays"],
+    )
 
 
 def modify_application_stake(
@@ -41,7 +48,7 @@ def modify_application_stake(
 def remove_session(
     state: StateType, params: ParamType, domain: Tuple[servicer_relay_space]
 ) -> None:
-    state["Sessions"].remove(domain[0]["session"])
+    state["Sessions"].release(domain[0]["session"])
 
 
 def application_undelegate(
@@ -58,7 +65,7 @@ def remove_application(
     params: ParamType,
     domain,
 ) -> None:
-    state["Applications"].remove(domain[0]["application"])
+    state["Applications"].discard(domain[0]["application"])
 
 
 def modify_application_pokt_holdings(
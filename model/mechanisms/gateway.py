@@ -12,7 +12,8 @@ def add_gateway(
     state: StateType, params: ParamType, domain: Tuple[gateway_entity_space]
 ) -> None:
     space: gateway_entity_space = domain[0]
-    state["Gateways"].append(space["gateway"])
+    state["ids"].assign(space["gateway"])
+    state["Gateways"].add(space["gateway"])
 
 
 def add_gateway_delegator(
@@ -21,7 +22,7 @@ def add_gateway_delegator(
     domain: Tuple[application_delegate_to_gateway_space],
 ) -> None:
     space: application_delegate_to_gateway_space = domain[0]
-    space["gateway_public_key"].delegators.append(space["application_public_key"])
+    space["gateway_public_key"].delegators.add(space["application_public_key"])
 
 
 def modify_gateway_stake(
@@ -42,7 +43,7 @@ def remove_gateway_delegator(
     domain: Tuple[application_undelegation_space],
 ) -> None:
     space: application_undelegation_space = domain[0]
-    space["gateway_public_key"].delegators.remove(space["application_public_key"])
+    space["gateway_public_key"].delegators.discard(space["application_public_key"])
 
 
 def remove_gateway(
@@ -51,4 +52,4 @@ def remove_gateway(
     domain,
 ) -> None:
     space = domain[0]
-    state["Gateways"].remove(space["gateway"])
+    state["Gateways"].discard(space["gateway"])
@@ -7,7 +7,9 @@ def add_service(
     state: StateType, params: ParamType, domain: Tuple[service_entity_space]
 ) -> None:
     space: service_entity_space = domain[0]
-    state["Services"].append(space["service"])
+    state["ids"].assign(space["service"])
+    state["Services"].add(space["service"])
+    state["service_links"].add_service(space["service"])
 
 
 def link_service_mechanism(
@@ -15,15 +17,15 @@ def link_service_mechanism(
 ) -> None:
     service = domain[0]["service"]
     servicer = domain[0]["servicer"]
-    service.servicers.append(servicer)
-    servicer.services.append(service)
+    state["service_links"].link(service, servicer)
 
 
 def remove_service(
     state: StateType, params: ParamType, domain: Tuple[service_entity_space]
 ) -> None:
     space: service_entity_space = domain[0]
-    state["Services"].remove(space["service"])
+    state["Services"].discard(space["service"])
+    state["service_links"].remove_service(space["service"])
 
 
 def unlink_service_mechanism(
@@ -31,5 +33,4 @@ def unlink_service_mechanism(
 ) -> None:
     service = domain[0]["service"]
     servicer = domain[0]["servicer"]
-    service.servicers.remove(servicer)
-    servicer.services.remove(service)
+    state["service_links"].unlink(service, servicer)
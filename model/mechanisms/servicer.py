@@ -3,6 +3,7 @@ from ..spaces import (
     servicer_entity_space,
     modify_servicer_pokt_space,
     servicer_pause_space2,
+    servicer_salary_batch_space,
 )
 from typing import Tuple
 
@@ -11,7 +12,12 @@ def add_servicer(
     state: StateType, params: ParamType, domain: Tuple[servicer_entity_space]
 ) -> None:
     space: servicer_entity_space = domain[0]
-    state["Servicers"].append(space["servicer"])
+    state["ids"].assign(space["servicer"])
+    state["Servicers"].add(space["servicer"])
+    state["service_links"].add_servicer(space["servicer"])
+    state["servicer_sampler"].invalidate()
+    state["servicer_index"].add(space["servicer"])
+    state["revenue_expectations"].add_servicer(space["servicer"])
 
 
 def modify_servicer_pokt_holdings(
@@ -20,11 +26,24 @@ def modify_servicer_pokt_holdings(
     domain[0]["public_key"].pokt_holdings += domain[0]["amount"]
 
 
+def pay_servicers_mechanism(
+    state: StateType, params: ParamType, domain: Tuple[servicer_salary_batch_space]
+) -> None:
+    space = domain[0]
+    for servicer, amount in zip(space["servicers"], space["amounts"]):
+        servicer.pokt_holdings += amount
+        servicer.total_revenues += amount
+
+
 def remove_servicer(
     state: StateType, params: ParamType, domain: Tuple[servicer_entity_space]
 ) -> None:
     space: servicer_entity_space = domain[0]
-    state["Servicers"].remove(space["servicer"])
+    state["Servicers"].discard(space["servicer"])
+    state["servicer_sampler"].invalidate()
+    state["servicer_index"].remove(space["servicer"])
+    state["revenue_expectations"].remove_servicer(space["servicer"])
+    state["service_links"].remove_servicer(space["servicer"])
 
 
 def modify_servicer_stake(
@@ -38,3 +57,5 @@ def servicer_update_pause_height(
     state: StateType, params: ParamType, domain: Tuple[servicer_pause_space2]
 ) -> None:
     domain[0]["address"].pause_height = domain[0]["height"]
+    state["servicer_sampler"].invalidate()
+    state["servicer_index"].pause(domain[0]["address"])
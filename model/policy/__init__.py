@@ -2,6 +2,9 @@ from .application import (
     application_join_policy,
     gateway_delegation_policy,
     submit_relay_requests_policy,
+    submit_relay_requests_batch_policy,
+    submit_relay_requests_aggregate_policy,
+    cap_session_relays,
     application_leave_policy,
     gateway_undelegation_policy,
     application_stake_policy,
@@ -16,6 +19,8 @@ from .service import (
 from .servicer import (
     servicer_join_policy,
     servicer_relay_policy,
+    servicer_relay_batch_policy,
+    servicer_relay_aggregate_policy,
     servicer_leave_policy,
     servicer_stake_policy,
     jail_node_policy,
@@ -25,6 +30,7 @@ from .system import (
     fee_reward_policy,
     block_reward_policy_aggregate,
     assign_servicer_salary_policy,
+    block_reward_batch_policy,
     validator_block_reward_policy,
     dao_block_reward_policy,
 )
@@ -1,4 +1,5 @@
-from ..types import StateType, ParamType, SessionType, ApplicationEntityType
+import numpy as np
+from ..types import StateType, ParamType, ApplicationEntityType, ServicerEntityType
 from ..spaces import (
     application_join_space,
     application_entity_space,
@@ -9,10 +10,13 @@ from ..spaces import (
     application_undelegation_space,
     application_stake_space,
     modify_application_pokt_space,
+    session_batch_space,
+    relay_aggregate_space,
 )
-from typing import Tuple, Union, Dict
+from typing import Tuple, Union, Dict, List
 from ..classes import Application
-import random
+from ..rng import get_rng, choice, sample
+from ..sampling import ServicerSampler
 
 
 def application_join_policy(
@@ -23,7 +27,7 @@ def application_join_policy(
     if space["stake_amount"] < params["minimum_application_stake"]:
         return (None,)
 
-    uses_gateway = random.random() < params["uses_gateway_probability"]
+    uses_gateway = get_rng(state, "joins").random() < params["uses_gateway_probability"]
 
     # Create entity
     application = Application(
@@ -57,7 +61,7 @@ def gateway_delegation_policy(
 
 def submit_relay_requests_policy(
     state: StateType, params: ParamType, domain: Tuple[submit_relay_request_space]
-) -> Tuple[new_session_space, new_session_space]:
+) -> Tuple[new_session_space]:
     if params["submit_relay_requests_policy_function"] == "test":
         return submit_relay_requests_policy_test(state, params, domain)
     elif params["submit_relay_requests_policy_function"] == "V1":
@@ -68,30 +72,25 @@ def submit_relay_requests_policy(
 
 def submit_relay_requests_policy_test(
     state: StateType, params: ParamType, domain: Tuple[submit_relay_request_space]
-) -> Tuple[new_session_space, new_session_space]:
+) -> Tuple[new_session_space]:
+    rng = get_rng(state, "relays")
     num_servicers = domain[0]["application_address"].number_of_services
-    servicers = random.sample(
-        [x for x in state["Servicers"] if not x.pause_height], num_servicers
+    servicers = sample(
+        rng, [x for x in state["Servicers"] if not x.pause_height], num_servicers
     )
-    service = random.choice(state["Services"])
-    session: SessionType = {
+    service = choice(rng, state["Services"])
+    session: new_session_space = {
         "application": domain[0]["application_address"],
-        "fishermen": None,
-        "geo_zone": domain[0]["application_address"].geo_zone,
-        "id": None,
-        "num_session_blocks": None,
         "service": service,
         "servicers": servicers,
-        "session_height": None,
-        "session_number": None,
         "number_of_relays": 10,
     }
-    return ({"session": session}, {"session": session})
+    return (session,)
 
 
 def submit_relay_requests_policy_v1(
     state: StateType, params: ParamType, domain: Tuple[submit_relay_request_space]
-) -> Tuple[new_session_space, new_session_space]:
+) -> Tuple[new_session_space]:
     """During each Session, the amount of POKT an Application has staked is mapped to "Service Tokens" that represent the amount of work a Servicer can provide using the SessionTokenBucketCoefficient governance parameter.
 
     The Token Bucket rate limiting algorithm is used to determine the maximum number of requests a Servicer can relay, and be rewarded for, thereby disincentivizing it to process relays for the Application once the cap is reached.
@@ -100,45 +99,306 @@ def submit_relay_requests_policy_v1(
 
     When one of the Servicers in the session is out of session tokens, the Application can continue to use other Servicers until every they are all exhausted.
 
-    The mechanism described above enables future iterations of the protocol where different types of request may vary the required number of AppSessionTokens per request. The selection of servicers is random but assigns higher probability for higher QoS servicers.
+    The mechanism described above enables future iterations of the protocol where different types of request may vary the required number of AppSessionTokens per request. The selection of servicers is random, with servicer_selection_function "qos" it assigns higher probability for higher QoS servicers.
     """
+    rng = get_rng(state, "relays")
     num_servicers = domain[0]["application_address"].number_of_services
-    servicers = random.sample(state["Servicers"], num_servicers)
-    service = random.choice(state["Services"])
+    servicers = select_servicers(state, params, rng, num_servicers)
+    service = choice(rng, state["Services"])
 
-    number_of_relays = domain[0]["number_of_relays"]
+    number_of_relays = cap_session_relays(
+        params, domain[0]["application_address"], domain[0]["number_of_relays"]
+    )
+
+    session: new_session_space = {
+        "application": domain[0]["application_address"],
+        "service": service,
+        "servicers": servicers,
+        "number_of_relays": number_of_relays,
+    }
+    return (session,)
+
+
+def cap_session_relays(
+    params: ParamType, application: ApplicationEntityType, number_of_relays: int
+) -> int:
+    """
+    Relays of a session capped by the application's session tokens and by
+    what the application, or its gateway, has staked to pay for them.
+    """
     max_relays_allowed = int(
-        domain[0]["application_address"].staked_pokt
-        * params["session_token_bucket_coefficient"]
+        application.staked_pokt * params["session_token_bucket_coefficient"]
     )
     number_of_relays = max(min(number_of_relays, max_relays_allowed), 0)
 
     # Check there is going to be enough money to pay!
-    if domain[0]["application_address"].delegate:
+    if application.delegate:
         max_relays_allowed = (
-            domain[0]["application_address"].delegate.staked_pokt
-            // params["gateway_fee_per_relay"]
+            application.delegate.staked_pokt // params["gateway_fee_per_relay"]
         )
     else:
         max_relays_allowed = (
-            domain[0]["application_address"].staked_pokt
-            // params["application_fee_per_relay"]
+            application.staked_pokt // params["application_fee_per_relay"]
         )
-    number_of_relays = max(min(number_of_relays, max_relays_allowed), 0)
+    return max(min(number_of_relays, max_relays_allowed), 0)
 
-    session: SessionType = {
-        "application": domain[0]["application_address"],
-        "fishermen": None,
-        "geo_zone": domain[0]["application_address"].geo_zone,
-        "id": None,
-        "num_session_blocks": None,
-        "service": service,
+
+def select_servicers(
+    state: StateType, params: ParamType, rng: np.random.Generator, k: int
+) -> List[ServicerEntityType]:
+    if params["servicer_selection_function"] == "uniform":
+        return sample(rng, state["Servicers"], k)
+    elif params["servicer_selection_function"] == "qos":
+        return state["servicer_sampler"].sample(rng, state["Servicers"], k)
+    else:
+        assert False, "Invalid servicer_selection_function"
+
+
+def servicer_sampler(state: StateType, params: ParamType) -> ServicerSampler:
+    """
+    Sampler drawing the servicers of batches of sessions by QoS, None when
+    they are drawn uniformly.
+    """
+    if params["servicer_selection_function"] == "uniform":
+        return None
+    elif params["servicer_selection_function"] == "qos":
+        sampler = state["servicer_sampler"]
+        sampler.update(state["Servicers"])
+        return sampler
+    else:
+        assert False, "Invalid servicer_selection_function"
+
+
+def sample_servicers(
+    rng: np.random.Generator,
+    n_servicers: int,
+    number_of_services: np.ndarray,
+    sampler: ServicerSampler = None,
+) -> np.ndarray:
+    """
+    Positions of the servicers of a batch of sessions, one row per session
+    of which the first number_of_services are used.
+
+    The servicers are drawn one after the other for all of the sessions at
+    once, O(k) draws per session. Uniformly, the j-th one is drawn from the
+    n - j not drawn yet by shifting the draw past the ones drawn before, a
+    uniform sample without replacement like sample() in the V1 policy. With
+    a sampler they come from its alias table in proportion to their QoS,
+    the sessions that drew a servicer twice drawing again, like the
+    ServicerSampler does.
+    """
+    n_sessions = len(number_of_services)
+    k = int(number_of_services.max(initial=0))
+    if sampler is None:
+        n_eligible = n_servicers
+    else:
+        n_eligible = np.count_nonzero(sampler.weights)
+    if k > n_eligible:
+        raise ValueError(
+            "Cannot take a larger sample than population when 'replace=False'"
+        )
+    drawn = np.zeros((n_sessions, k), dtype=np.int64)
+    if sampler is None:
+        for j in range(k):
+            x = rng.integers(n_servicers - j, size=n_sessions)
+            for before in np.sort(drawn[:, :j], axis=1).T:
+                x += x >= before
+            drawn[:, j] = x
+        return drawn
+    weights = sampler.weights[sampler.positions]
+    if 2 * k > n_eligible:
+        # Drawing again gets slow, rank exponential arrival times
+        with np.errstate(divide="ignore"):
+            keys = rng.standard_exponential((n_sessions, len(weights))) / weights
+        return sampler.positions[np.argsort(keys, axis=1)[:, :k]]
+    for j in range(k):
+        rows = np.arange(n_sessions)
+        while len(rows):
+            x = rng.integers(len(weights), size=len(rows))
+            x = np.where(rng.random(len(rows)) < sampler.prob[x], x, sampler.alias[x])
+            repeat = (drawn[rows, :j] == x[:, None]).any(axis=1)
+            drawn[rows[~repeat], j] = x[~repeat]
+            rows = rows[repeat]
+    return sampler.positions[drawn]
+
+
+def submit_relay_requests_batch_policy(
+    state: StateType, params: ParamType, domain: Tuple[session_batch_space]
+) -> Tuple[session_batch_space]:
+    if params["submit_relay_requests_policy_function"] == "V1":
+        return submit_relay_requests_batch_policy_v1(state, params, domain)
+    else:
+        assert False, "Invalid submit_relay_requests_policy_function"
+
+
+def submit_relay_requests_batch_policy_v1(
+    state: StateType, params: ParamType, domain: Tuple[session_batch_space]
+) -> Tuple[session_batch_space]:
+    """
+    Draws the service and the servicers of every session of a batch at once.
+
+    The relay caps depend on the stakes left by the sessions before, so they
+    are applied when the sessions are played out (see cap_session_relays).
+    """
+    rng = get_rng(state, "relays")
+    space = domain[0]
+    n_sessions = len(space["applications"])
+    number_of_services = np.array(
+        [x.number_of_services for x in state["Applications"]], dtype=np.int64
+    )[space["applications"]]
+
+    services = rng.integers(len(state["Services"]), size=n_sessions)
+    servicers = sample_servicers(
+        rng,
+        len(state["Servicers"]),
+        number_of_services,
+        servicer_sampler(state, params),
+    )
+
+    out: session_batch_space = {
+        "applications": space["applications"],
+        "number_of_relays": space["number_of_relays"],
+        "services": services,
         "servicers": servicers,
-        "session_height": None,
-        "session_number": None,
+        "number_of_services": number_of_services,
+    }
+    return (out,)
+
+
+def submit_relay_requests_aggregate_policy(
+    state: StateType, params: ParamType, domain: Tuple[relay_aggregate_space]
+) -> Tuple[relay_aggregate_space, session_batch_space]:
+    if params["submit_relay_requests_policy_function"] == "V1":
+        return submit_relay_requests_aggregate_policy_v1(state, params, domain)
+    else:
+        assert False, "Invalid submit_relay_requests_policy_function"
+
+
+def submit_relay_requests_aggregate_policy_v1(
+    state: StateType, params: ParamType, domain: Tuple[relay_aggregate_space]
+) -> Tuple[relay_aggregate_space, session_batch_space]:
+    """
+    Splits a day of aggregated relays into the pairs that can be accounted
+    for as a whole and the sessions of the applications whose caps might
+    bind, which are played out one by one.
+
+    The fee cap of V1 cannot bind on any session of an application if all
+    of its relays of the day can be paid for with what it, or its gateway,
+    has staked. The session token cap holds per session, so a pair is taken
+    to stay under it when its relays fit under the cap times its number of
+    sessions, with the stake that is left once every relay of the day has
+    been paid for. Otherwise the relays of the pair are split back into
+    sessions, with the proportions of independent gamma draws (a dirichlet
+    split, which has the distribution of the sessions given their sum), and
+    shuffled with the other sessions played out. The relays lost rounding
+    the split down go to the pair's first session, so the sessions add up
+    to the pair's relays.
+
+    For the pairs accounted as a whole each servicer is drawn into each of
+    the pair's sessions with probability number_of_services / servicers (or
+    its share of the QoS weights times number_of_services), which gives the
+    number of the pair's sessions it is in and its share of the relays.
+    """
+    rng = get_rng(state, "relays")
+    space = domain[0]
+    applications = state["Applications"]
+    n_servicers = len(state["Servicers"])
+    daily_relays = np.zeros(len(applications), dtype=np.int64)
+    np.add.at(daily_relays, space["applications"], space["number_of_relays"])
+    daily_relays = daily_relays.tolist()
+
+    # What each application or gateway pays for the day
+    charges = {}
+    for application, relays in zip(applications, daily_relays):
+        if application.delegate:
+            payer, fee = application.delegate, params["gateway_fee_per_relay"]
+        else:
+            payer, fee = application, params["application_fee_per_relay"]
+        charges[payer] = charges.get(payer, 0) + relays * fee
+
+    # Session token cap of each application and whether its fees might run
+    # past what it, or its gateway, has staked
+    token_caps = np.zeros(len(applications), dtype=np.int64)
+    fees_may_bind = np.zeros(len(applications), dtype=bool)
+    for i, (application, relays) in enumerate(zip(applications, daily_relays)):
+        if relays == 0:
+            continue
+        staked_pokt = application.staked_pokt - charges.get(application, 0)
+        if application.delegate:
+            payer, fee = application.delegate, params["gateway_fee_per_relay"]
+        else:
+            payer, fee = application, params["application_fee_per_relay"]
+        token_caps[i] = int(staked_pokt * params["session_token_bucket_coefficient"])
+        fees_may_bind[i] = relays > (payer.staked_pokt - charges[payer]) // fee
+
+    number_of_services = np.array(
+        [x.number_of_services for x in applications], dtype=np.int64
+    )
+    sampler = servicer_sampler(state, params)
+    weights = None if sampler is None else sampler.weights
+    n_eligible = n_servicers if weights is None else np.count_nonzero(weights)
+    if number_of_services[space["applications"]].max(initial=0) > n_eligible:
+        raise ValueError(
+            "Cannot take a larger sample than population when 'replace=False'"
+        )
+    split = fees_may_bind[space["applications"]] | (
+        space["number_of_relays"]
+        > space["number_of_sessions"] * token_caps[space["applications"]]
+    )
+
+    # Pairs accounted for as a whole
+    whole = {key: value[~split] for key, value in space.items()}
+    k = number_of_services[whole["applications"]]
+    if weights is None:
+        p_in_session = k[:, None] / max(n_servicers, 1)
+    else:
+        # Approximated by the inclusion probabilities of a weighted sample
+        # with replacement, capped at one
+        p_in_session = np.minimum(k[:, None] * weights / weights.sum(), 1)
+    seats = rng.binomial(
+        whole["number_of_sessions"][:, None],
+        p_in_session,
+        size=(len(k), n_servicers),
+    )
+    # A pair nobody was drawn into gets the servicers of a single session
+    empty = np.flatnonzero(seats.sum(axis=1) == 0)
+    servicers = sample_servicers(rng, n_servicers, k[empty], sampler)
+    in_session = np.arange(servicers.shape[1]) < k[empty][:, None]
+    seats[np.repeat(empty, k[empty]), servicers[in_session]] = 1
+    whole["servicer_seats"] = seats
+
+    # Sessions of the applications whose caps might bind
+    pairs = np.flatnonzero(split)
+    sessions = np.repeat(pairs, space["number_of_sessions"][pairs])
+    sessions = sessions[rng.permutation(len(sessions))]
+    shares = rng.gamma(
+        params["relays_per_session_gamma_distribution_shape"], size=len(sessions)
+    )
+    pair_shares = np.zeros(len(split))
+    np.add.at(pair_shares, sessions, shares)
+    number_of_relays = (
+        shares / pair_shares[sessions] * space["number_of_relays"][sessions]
+    ).astype(np.int64)
+    # What rounding down leaves of a pair's relays goes to its first session
+    pair_relays = np.zeros(len(split), dtype=np.int64)
+    np.add.at(pair_relays, sessions, number_of_relays)
+    pairs_in_order, first = np.unique(sessions, return_index=True)
+    number_of_relays[first] += (
+        space["number_of_relays"][pairs_in_order] - pair_relays[pairs_in_order]
+    )
+    session_applications = space["applications"][sessions]
+    session_number_of_services = number_of_services[session_applications]
+
+    out: session_batch_space = {
+        "applications": session_applications,
         "number_of_relays": number_of_relays,
+        "services": space["services"][sessions],
+        "servicers": sample_servicers(
+            rng, n_servicers, session_number_of_services, sampler
+        ),
+        "number_of_services": session_number_of_services,
     }
-    return ({"session": session}, {"session": session})
+    return (whole, out)
 
 
 def application_leave_policy(
@@ -148,9 +408,9 @@ def application_leave_policy(
     application_leave_space,
 ]:
     applications = domain[0]["applications"]
-    space1: Dict[
-        ApplicationEntityType, Union[application_undelegation_space, None]
-    ] = {}
+    space1: Dict[ApplicationEntityType, Union[application_undelegation_space, None]] = (
+        {}
+    )
     space2 = domain[0]
     for application in applications:
         if applications[application]:
@@ -1,3 +1,4 @@
+import numpy as np
 from ..types import StateType, ParamType, ServiceEntityType
 from ..spaces import (
     servicer_join_space,
@@ -13,10 +14,12 @@ from ..spaces import (
     burn_pokt_mechanism_space,
     jail_node_space,
     unjail_node_space,
+    session_batch_space,
+    relay_aggregate_space,
 )
 from typing import Tuple, Union, List
 from ..classes import Servicer
-import random
+from ..rng import get_rng
 
 
 def servicer_join_policy(
@@ -41,7 +44,7 @@ def servicer_join_policy(
             pause_height=None,
             stake_status="Staked",
             unstaking_height=None,
-            QoS=random.uniform(0.7, 1),
+            QoS=get_rng(state, "joins").uniform(0.7, 1),
         )
         return ({"servicer": servicer},)
 
@@ -58,49 +61,38 @@ def servicer_relay_policy(
     Union[servicer_relay_space, None],
 ]:
     application = domain[0]["applications"]
+    servicers = domain[0]["servicers"]
 
     # Log relays
-    session = domain[0]["session"]
-    n_relays = session["number_of_relays"]
-    geo_zone = session["application"].geo_zone
-    service = session["service"]
-    key = (service, geo_zone)
-    if key in relay_log:
-        relay_log[key] += n_relays
-    else:
-        relay_log[key] = n_relays
+    sessions = state["Sessions"]
+    slot = sessions.slot(domain[0]["session"])
+    n_relays = sessions.number_of_relays[slot]
+    geo_zone = application.geo_zone
+    service = sessions.service[slot]
+    relay_log.add((service, geo_zone), n_relays)
 
     # Payment from the requestor
     if application.delegate:
-        relay_charge = (
-            domain[0]["session"]["number_of_relays"] * params["gateway_fee_per_relay"]
-        )
+        relay_charge = n_relays * params["gateway_fee_per_relay"]
         space1: modify_gateway_pokt_space = {
             "public_key": application.delegate,
             "amount": -relay_charge,
         }
     else:
-        relay_charge = (
-            domain[0]["session"]["number_of_relays"]
-            * params["application_fee_per_relay"]
-        )
+        relay_charge = n_relays * params["application_fee_per_relay"]
         space1: modify_application_pokt_space = {
             "public_key": application,
             "amount": -relay_charge,
         }
 
     # Log which servicers did which work, modulo added to the first
-    split_relays = n_relays // len(session["servicers"])
-    modulo_relays = n_relays % len(session["servicers"])
-    for i in range(len(session["servicers"])):
+    split_relays = n_relays // len(servicers)
+    modulo_relays = n_relays % len(servicers)
+    for i in range(len(servicers)):
         amt = split_relays
         if i == 0:
             amt += modulo_relays
-        s = session["servicers"][i]
-        if s in servicer_relay_log:
-            servicer_relay_log[s] += amt
-        else:
-            servicer_relay_log[s] = amt
+        servicer_relay_log.add(servicers[i], amt)
 
     # Burn per relay policy
     space2: servicer_relay_space = domain[0]
@@ -111,6 +103,78 @@ def servicer_relay_policy(
     return (space1, space2, space3)
 
 
+def servicer_relay_batch_policy(
+    state: StateType,
+    params: ParamType,
+    domain: Tuple[session_batch_space],
+    relay_log,
+    servicer_relay_log,
+) -> None:
+    """
+    Logs the relays of a batch of sessions, number_of_relays being the relays
+    processed after the caps. As in servicer_relay_policy, the relays of a
+    session are split evenly over its servicers with the modulo added to the
+    first and sessions without relays are left out.
+
+    The logs are the ones p_relay_requests sets up over the current Services
+    and Servicers, so the indices of the batch are positions on their axes.
+    """
+    space = domain[0]
+    used = space["number_of_relays"] > 0
+    if not used.any():
+        return
+    n_relays = space["number_of_relays"][used]
+    k = space["number_of_services"][used]
+    servicers = space["servicers"][used]
+
+    geo_index = relay_log.index[1]
+    geo_zones = np.array(
+        [geo_index[x.geo_zone] for x in state["Applications"]], dtype=np.int64
+    )
+    relay_log.add_at(
+        (space["services"][used], geo_zones[space["applications"][used]]), n_relays
+    )
+
+    in_session = np.arange(servicers.shape[1]) < k[:, None]
+    amounts = np.where(in_session, (n_relays // k)[:, None], 0)
+    amounts[:, 0] += n_relays % k
+    servicer_relay_log.add_at(servicers[in_session], amounts[in_session])
+
+
+def servicer_relay_aggregate_policy(
+    state: StateType,
+    params: ParamType,
+    domain: Tuple[relay_aggregate_space],
+    relay_log,
+    servicer_relay_log,
+) -> None:
+    """
+    Logs the relays of (application, service) pairs accounted for as a
+    whole. The relays of a pair are split over the servicers in proportion
+    to the number of the pair's sessions they are in, what is left from
+    rounding down goes to the servicer in the most sessions.
+    """
+    space = domain[0]
+    used = space["number_of_relays"] > 0
+    n_relays = space["number_of_relays"][used]
+    seats = space["servicer_seats"][used]
+
+    geo_index = relay_log.index[1]
+    geo_zones = np.array(
+        [geo_index[x.geo_zone] for x in state["Applications"]], dtype=np.int64
+    )
+    relay_log.add_at(
+        (space["services"][used], geo_zones[space["applications"][used]]), n_relays
+    )
+
+    amounts = n_relays[:, None] * seats // seats.sum(axis=1)[:, None]
+    amounts[np.arange(len(seats)), seats.argmax(axis=1)] += n_relays - amounts.sum(
+        axis=1
+    )
+    rows, servicers = np.nonzero(seats)
+    servicer_relay_log.add_at(servicers, amounts[rows, servicers])
+
+
 def servicer_leave_policy(
     state: StateType, params: ParamType, domain: Tuple[servicer_leave_space]
 ) -> Tuple[servicer_leave_space]:
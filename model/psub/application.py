@@ -5,6 +5,7 @@ from ..action_chains import (
     gateway_undelegation_ac,
     application_stake_ac,
 )
+from ..indexed_set import IndexedSet
 
 
 def p_application_join(_params, substep, state_history, state) -> tuple:
@@ -31,11 +32,11 @@ def p_gateway_undelegation(_params, substep, state_history, state) -> tuple:
 
 def p_application_leave(_params, substep, state_history, state) -> tuple:
     application_leave_ac(state, _params)
-    understaked_applications = [
+    understaked_applications = IndexedSet(
         x
         for x in state["Applications"]
         if x.staked_pokt < _params["minimum_application_stake"]
-    ]
+    )
     return {"understaked_applications": understaked_applications}
 
 
@@ -1,4 +1,5 @@
 from ..action_chains import gateway_join_ac, gateway_leave_ac, gateway_stake_ac
+from ..indexed_set import IndexedSet
 
 
 def p_gateway_join(_params, substep, state_history, state) -> tuple:
@@ -13,9 +14,9 @@ def s_update_gateways(_params, substep, state_history, state, _input) -> tuple:
 
 def p_gateway_leave(_params, substep, state_history, state) -> tuple:
     gateway_leave_ac(state, _params)
-    understaked_gateways = [
+    understaked_gateways = IndexedSet(
         x for x in state["Gateways"] if x.staked_pokt < _params["gateway_minimum_stake"]
-    ]
+    )
     return {"understaked_gateways": understaked_gateways}
 
 
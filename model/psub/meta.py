@@ -1,5 +1,6 @@
-import numpy as np
 from datetime import datetime
+from ..rng import get_rng
+from ..invariants import start_supply_check, check_supply_conservation
 
 
 def p_update_time(_params, substep, state_history, state) -> dict:
@@ -20,7 +21,7 @@ def s_update_day(_params, substep, state_history, state, _input) -> tuple:
 
 
 def p_transactions(_params, substep, state_history, state) -> dict:
-    return {"n_transactions": np.random.normal(300000, 15000)}
+    return {"n_transactions": get_rng(state, "transactions").normal(300000, 15000)}
 
 
 def s_update_n_transactions(_params, substep, state_history, state, _input) -> tuple:
@@ -53,3 +54,14 @@ def s_set_to_zero_slashing_cost(
 
 def s_set_to_zero_jail_cost(_params, substep, state_history, state, _input) -> tuple:
     return ("period_jailing_opportunity_cost", 0)
+
+
+def p_start_invariants(_params, substep, state_history, state) -> dict:
+    start_supply_check(state)
+    return {}
+
+
+def p_check_invariants(_params, substep, state_history, state) -> dict:
+    # Last policy of the last block, it sees everything the timestep did
+    check_supply_conservation(state)
+    return {}
@@ -1,5 +1,7 @@
 from .meta import (
     p_update_time,
+    p_start_invariants,
+    p_check_invariants,
     s_update_height,
     s_update_day,
     p_transactions,
@@ -58,6 +60,7 @@ from .validator import s_update_validators
 # Block for recording things like time
 meta_update_block = {
     "policies": {
+        "invariants": p_start_invariants,
         "t": p_update_time,
         "price": p_update_price,
         "transactions": p_transactions,
@@ -175,6 +178,7 @@ leave_block = {
         "service": p_service_leave,
         "gateway": p_gateway_leave,
         "application": p_application_leave,
+        "invariants": p_check_invariants,
     },
     "variables": {
         "Servicers": s_update_servicers,
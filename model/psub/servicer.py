@@ -1,10 +1,15 @@
 from ..action_chains import (
     servicer_join_ac,
     relay_requests_ac,
+    relay_requests_batch_ac,
+    relay_requests_aggregate_ac,
     servicer_leave_ac,
     servicers_stake_ac,
     jailing_slashing_ac,
 )
+from ..indexed_set import IndexedSet
+from ..relay_log import RelayLog
+from ..invariants import check_invariants
 
 
 def s_update_servicers(_params, substep, state_history, state, _input) -> tuple:
@@ -23,14 +28,32 @@ def p_relay_requests(_params, substep, state_history, state) -> dict:
     )
     total_relays = 0
     processed_relays = 0
-    relay_log = {}
-    servicer_relay_log = {}
-    for _ in range(number_relays):
-        out = relay_requests_ac(state, _params, relay_log, servicer_relay_log)
+    # The Applications, Services and Servicers do not change over the block
+    geo_zones = dict.fromkeys(x.geo_zone for x in state["Applications"])
+    relay_log = RelayLog(state["Services"], geo_zones)
+    servicer_relay_log = RelayLog(state["Servicers"])
+    if _params["session_generation_function"] == "sequential":
+        for _ in range(number_relays):
+            out = relay_requests_ac(state, _params, relay_log, servicer_relay_log)
+            total_relays += out["total_relays"]
+            processed_relays += out["processed_relays"]
+    elif _params["session_generation_function"] == "batched":
+        out = relay_requests_batch_ac(
+            state, _params, number_relays, relay_log, servicer_relay_log
+        )
         total_relays += out["total_relays"]
         processed_relays += out["processed_relays"]
-    assert sum(relay_log.values()) == processed_relays
-    assert sum(servicer_relay_log.values()) == processed_relays
+    elif _params["session_generation_function"] == "aggregate":
+        out = relay_requests_aggregate_ac(
+            state, _params, number_relays, relay_log, servicer_relay_log
+        )
+        total_relays += out["total_relays"]
+        processed_relays += out["processed_relays"]
+    else:
+        assert False, "Invalid session_generation_function"
+    if check_invariants(state):
+        assert relay_log.total() == processed_relays
+        assert servicer_relay_log.total() == processed_relays
     return {
         "total_relays": total_relays,
         "processed_relays": processed_relays,
@@ -46,11 +69,11 @@ def p_jailing_slashing(_params, substep, state_history, state) -> dict:
 
 def p_servicers_leave(_params, substep, state_history, state) -> dict:
     servicer_leave_ac(state, _params)
-    understaked_servicers = [
+    understaked_servicers = IndexedSet(
         x
         for x in state["Servicers"]
         if x.staked_pokt < _params["minimum_stake_servicer"]
-    ]
+    )
     return {"understaked_servicers": understaked_servicers}
 
 
@@ -1,5 +1,5 @@
 from ..action_chains import fee_reward_ac, block_reward_ac
-import numpy as np
+from ..rng import get_rng
 
 
 def p_block_reward(_params, substep, state_history, state) -> tuple:
@@ -23,12 +23,13 @@ def s_update_processed_relays(_params, substep, state_history, state, _input) ->
 
 
 def p_update_price(_params, substep, state_history, state) -> tuple:
+    rng = get_rng(state, "price")
     pokt_price_true = (
-        np.random.normal(0.00332054298962304, 0.06562764398482432) + 1
+        rng.normal(0.00332054298962304, 0.06562764398482432) + 1
     ) * state["pokt_price_true"]
     pokt_price_oracle = (
         0.95 * state["pokt_price_oracle"]
-        + (pokt_price_true + np.random.normal(0, 0.03) * pokt_price_true) * 0.05
+        + (pokt_price_true + rng.normal(0, 0.03) * pokt_price_true) * 0.05
     )
     return {"pokt_price_true": pokt_price_true, "pokt_price_oracle": pokt_price_oracle}
 
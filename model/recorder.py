@@ -0,0 +1,296 @@
+import copy
+import pickle
+import numpy as np
+import pandas as pd
+from typing import Dict
+from .kpis import calculate_gini_from_dict
+from .classes.entity import Unset
+from .indexed_set import IndexedSet
+from .shared import Shared
+from .types import ParamType, StateType
+
+ID_COLUMNS = ("simulation", "subset", "run", "substep", "timestep")
+
+SCALAR_COLUMNS = (
+    "height",
+    "day",
+    "total_relays",
+    "processed_relays",
+    "pokt_price_true",
+    "pokt_price_oracle",
+    "n_transactions",
+    "floating_supply",
+    "POKT_burned",
+    "POKT_minted",
+    "period_slashing_costs",
+    "period_jailing_opportunity_cost",
+)
+
+AGGREGATE_COLUMNS = (
+    "total_application_stake",
+    "total_servicer_stake",
+    "total_gateway_stake",
+    "n_servicers",
+    "n_applications",
+    "n_gateways",
+    "n_services",
+    "n_understaked_servicers",
+    "n_understaked_gateways",
+    "n_understaked_applications",
+    "dao_pokt_holdings",
+    "kpi_c",
+)
+
+# Columns holding live objects, only kept when entities are recorded
+ENTITY_COLUMNS = (
+    "Geozones",
+    "Applications",
+    "DAO",
+    "Gateways",
+    "Services",
+    "Servicers",
+    "Validators",
+    "Sessions",
+    "relay_log",
+    "servicer_relay_log",
+    "understaked_servicers",
+    "understaked_gateways",
+    "understaked_applications",
+)
+
+# Actor types with a per entity stake vector
+STAKED_ENTITIES = {
+    "Servicers": "servicer_max_number",
+    "Applications": "application_max_number",
+    "Gateways": "gateway_max_number",
+}
+
+
+def freeze(entity):
+    """
+    Copy of an entity as of now that later mutations of the live object do
+    not reach, sharing everything but the entity's own containers.
+    """
+    frozen = copy.copy(entity)
+    for key, value in frozen.fields_set().items():
+        if isinstance(value, (dict, list, IndexedSet)):
+            setattr(frozen, key, copy.copy(value))
+    if getattr(frozen, "revenue_matrix", None) is not None:
+        frozen.revenue_matrix = frozen.revenue_matrix.snapshot(entity)
+    if getattr(frozen, "history", None) is not None:
+        frozen.history = frozen.history.snapshot(entity)
+    if getattr(frozen, "links", None) is not None:
+        frozen.links = frozen.links.snapshot(entity)
+    return frozen
+
+
+def refreeze(frozen, entity, values: tuple, last: tuple, stamps: dict) -> None:
+    """
+    Brings the frozen copy of an entity up to date, copying only what
+    changed since: attributes set to another value, containers with other
+    items and the attributes held in a store (links, histories, revenue
+    expectations) whose stamp moved. values are the attribute values now,
+    last those as of the last freeze and stamps the stamps of the stores
+    then.
+    """
+    for name, value, old in zip(entity.fields, values, last):
+        if hasattr(value, "stamp"):
+            stamp = value.stamp(entity)
+            if value is not old or stamps.get(name) != stamp:
+                setattr(frozen, name, value.snapshot(entity))
+                stamps[name] = stamp
+        elif isinstance(value, (dict, list, IndexedSet)):
+            copied = getattr(frozen, name)
+            if isinstance(value, dict):
+                changed = value != copied
+            else:
+                changed = list(value) != list(copied)
+            if value is not old or changed:
+                setattr(frozen, name, copy.copy(value))
+        elif value is not old and value is not Unset:
+            setattr(frozen, name, value)
+
+
+def count_records(
+    time_seq: range, n_blocks: int, recording: str, record_interval: int
+) -> int:
+    final_timestep = time_seq[-1] + 1
+    recorded = [
+        x + 1
+        for x in time_seq
+        if (x + 1) % record_interval == 0 or x + 1 == final_timestep
+    ]
+    per_timestep = n_blocks if recording == "substep" else 1
+    # Plus one for the genesis record
+    return len(recorded) * per_timestep + 1
+
+
+def entity_capacities(params: ParamType, state: StateType) -> Dict[str, int]:
+    # Joins stop once the max number is reached so this bounds the population,
+    # the recorder grows to it as the population does
+    return {
+        entities: max(params[max_number], len(state[entities]))
+        for entities, max_number in STAKED_ENTITIES.items()
+    }
+
+
+class MetricsRecorder(Shared):
+    """
+    Columnar recorder for the lean engine.
+
+    Instead of keeping a copy of the full state per record, the scalar state
+    variables and the per timestep aggregates compute_KPIs needs are written
+    into numpy arrays preallocated for the n_records of a run. Per entity
+    stakes go into (n_records, width) arrays positioned by the order of the
+    entity list, with the matching id_number alongside (-1 for empty slots).
+    The width doubles when the population outgrows it, up to the entity
+    capacity, so memory is bounded by the capacities but sized by the
+    largest population recorded.
+
+    The entity-list columns are only snapshotted when record_entities is set.
+    The KPIs built from every servicer and gateway seen in the run use a
+    registry holding each one as it was at the last record it was part of.
+    It is kept at the end of every timestep, refreezing only what changed
+    on each entity since it was last frozen; the ones that left keep their
+    last copy. kpi_c is also only computed at the end of a timestep, the
+    rows of the other substeps hold NaN.
+    """
+
+    def __init__(
+        self,
+        n_records: int,
+        capacities: Dict[str, int],
+        record_entities: bool = False,
+    ):
+        self.n_records = n_records
+        # Scalar columns are allocated on their first value so they keep the
+        # int or float type the state uses
+        self.columns = {}
+        self.capacities = dict(capacities)
+        self.stakes = {
+            entities: np.full((n_records, min(capacity, 16)), np.nan)
+            for entities, capacity in capacities.items()
+        }
+        self.stake_ids = {
+            entities: np.full((n_records, min(capacity, 16)), -1, dtype=np.int64)
+            for entities, capacity in capacities.items()
+        }
+        self.record_entities = record_entities
+        self.entities = []
+        self.servicer_registry = {}
+        self.gateway_registry = {}
+        # Attribute values and store stamps of the entities in the
+        # registries as of their last freeze, by id_number
+        self.frozen_as_of = ({}, {})
+        self.n = 0
+
+    def record(self, state: StateType, end_of_timestep: bool = True) -> None:
+        i = self.n
+        self.n += 1
+
+        for column in ID_COLUMNS + SCALAR_COLUMNS:
+            self.write(column, i, state[column])
+
+        aggregates = {
+            "total_application_stake": sum(
+                [x.staked_pokt for x in state["Applications"]]
+            ),
+            "total_servicer_stake": sum([x.staked_pokt for x in state["Servicers"]]),
+            "total_gateway_stake": sum([x.staked_pokt for x in state["Gateways"]]),
+            "n_servicers": len(state["Servicers"]),
+            "n_applications": len(state["Applications"]),
+            "n_gateways": len(state["Gateways"]),
+            "n_services": len(state["Services"]),
+            "n_understaked_servicers": len(state["understaked_servicers"]),
+            "n_understaked_gateways": len(state["understaked_gateways"]),
+            "n_understaked_applications": len(state["understaked_applications"]),
+            "dao_pokt_holdings": state["DAO"].pokt_holdings,
+            # Postprocessing only keeps the end of each timestep
+            "kpi_c": (
+                calculate_gini_from_dict(state["servicer_relay_log"])
+                if end_of_timestep
+                else np.nan
+            ),
+        }
+        for column, value in aggregates.items():
+            self.write(column, i, value)
+
+        for entities in self.stakes:
+            population = state[entities]
+            assert (
+                len(population) <= self.capacities[entities]
+            ), "{} exceed the recorder capacity".format(entities)
+            if len(population) > self.stakes[entities].shape[1]:
+                self.widen(entities, len(population))
+            for j, entity in enumerate(population):
+                self.stakes[entities][i, j] = entity.staked_pokt
+                self.stake_ids[entities][i, j] = entity.id_number
+
+        # Like postprocessing, the registries only see the end of each timestep
+        if end_of_timestep:
+            self.update_registries(state)
+
+        if self.record_entities:
+            entities = {column: state[column] for column in ENTITY_COLUMNS}
+            self.entities.append(
+                pickle.loads(pickle.dumps(entities, pickle.HIGHEST_PROTOCOL))
+            )
+
+    def widen(self, entities: str, n: int) -> None:
+        width = self.stakes[entities].shape[1]
+        while width < n:
+            width *= 2
+        width = min(width, self.capacities[entities])
+        for arrays, fill in ((self.stakes, np.nan), (self.stake_ids, -1)):
+            old = arrays[entities]
+            grown = np.full((self.n_records, width), fill, dtype=old.dtype)
+            grown[:, : old.shape[1]] = old
+            arrays[entities] = grown
+
+    def update_registries(self, state: StateType) -> None:
+        registries = (self.servicer_registry, self.gateway_registry)
+        for key, registry, as_of in zip(
+            ("Servicers", "Gateways"), registries, self.frozen_as_of
+        ):
+            for entity in state[key]:
+                values = entity.field_values()
+                if entity.id_number in registry:
+                    last, stamps = as_of[entity.id_number]
+                    refreeze(registry[entity.id_number], entity, values, last, stamps)
+                else:
+                    registry[entity.id_number] = freeze(entity)
+                    stamps = {
+                        name: value.stamp(entity)
+                        for name, value in zip(entity.fields, values)
+                        if hasattr(value, "stamp")
+                    }
+                as_of[entity.id_number] = (values, stamps)
+
+    def write(self, column: str, i: int, value) -> None:
+        integer = isinstance(value, (int, np.integer))
+        if column not in self.columns:
+            if integer:
+                self.columns[column] = np.zeros(self.n_records, dtype=np.int64)
+            else:
+                self.columns[column] = np.full(self.n_records, np.nan)
+        values = self.columns[column]
+        if values.dtype == np.int64 and not integer:
+            values = values.astype(float)
+            self.columns[column] = values
+        values[i] = np.nan if value is None else value
+
+    def to_frame(self) -> pd.DataFrame:
+        n = self.n
+        columns = {}
+        for column in ID_COLUMNS + SCALAR_COLUMNS + AGGREGATE_COLUMNS:
+            columns[column] = self.columns[column][:n]
+        for entities in self.stakes:
+            prefix = entities.lower()[:-1]
+            columns[prefix + "_stakes"] = list(self.stakes[entities][:n])
+            columns[prefix + "_stake_ids"] = list(self.stake_ids[entities][:n])
+        columns["servicer_registry"] = [self.servicer_registry] * n
+        columns["gateway_registry"] = [self.gateway_registry] * n
+        df = pd.DataFrame(columns)
+        if self.record_entities:
+            df = pd.concat([df, pd.DataFrame(self.entities)], axis=1)
+        return df
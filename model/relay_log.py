@@ -0,0 +1,109 @@
+import numpy as np
+from collections.abc import Mapping
+from typing import Sequence
+
+UNSEEN = np.iinfo(np.int64).max
+
+
+class RelayLog(Mapping):
+    """
+    Relay counts of a day in a dense array with one axis per key component,
+    e.g. RelayLog(services, geo_zones) for the relays per (service, geo zone)
+    or RelayLog(servicers) for the relays per servicer. Keys are interned to
+    their position on the axes when the log is created.
+
+    Counts are added one key at a time with add, which queues them up to be
+    added together, or for a whole batch of sessions at once with add_at.
+    The log reads as a dict from key (the object itself for a single axis)
+    to count, built on demand, holding the keys that were logged in the order
+    they were first logged.
+    """
+
+    def __init__(self, *axes: Sequence):
+        self.axes = [list(axis) for axis in axes]
+        self._index = None
+        shape = tuple(len(axis) for axis in self.axes)
+        self.counts = np.zeros(shape, dtype=np.int64)
+        self.first_logged = np.full(shape, UNSEEN, dtype=np.int64)
+        self.n_logged = 0
+        self.pending = ([[] for _ in self.axes], [])
+        self.view = None
+
+    @property
+    def index(self) -> list:
+        # Built on first use, the copies of the log are only ever read
+        if self._index is None:
+            self._index = [{key: i for i, key in enumerate(axis)} for axis in self.axes]
+        return self._index
+
+    def add(self, key, amount: int) -> None:
+        indices, amounts = self.pending
+        if len(self.axes) == 1:
+            indices[0].append(self.index[0][key])
+        else:
+            for index, positions, x in zip(self.index, indices, key):
+                positions.append(index[x])
+        amounts.append(amount)
+        self.view = None
+
+    def flush(self) -> None:
+        indices, amounts = self.pending
+        if amounts:
+            self.pending = ([[] for _ in self.axes], [])
+            self.add_at(
+                tuple(np.array(x, dtype=np.int64) for x in indices),
+                np.array(amounts, dtype=np.int64),
+            )
+
+    def add_at(self, indices, amounts: np.ndarray) -> None:
+        """
+        Add a batch of counts, indices holds one array of positions per axis
+        (or a single array for a single axis).
+        """
+        self.flush()
+        if len(self.axes) == 1:
+            indices = (indices,)
+        indices = tuple(indices)
+        np.add.at(self.counts, indices, amounts)
+        order = self.n_logged + np.arange(len(amounts), dtype=np.int64)
+        np.minimum.at(self.first_logged, indices, order)
+        self.n_logged += len(amounts)
+        self.view = None
+
+    def total(self) -> int:
+        self.flush()
+        return int(self.counts.sum())
+
+    def as_dict(self) -> dict:
+        if self.view is None:
+            self.flush()
+            logged = np.flatnonzero(self.first_logged != UNSEEN)
+            logged = logged[np.argsort(self.first_logged.ravel()[logged])]
+            positions = np.unravel_index(logged, self.counts.shape)
+            counts = self.counts.ravel()[logged].tolist()
+            keys = zip(
+                *[
+                    [axis[i] for i in position.tolist()]
+                    for axis, position in zip(self.axes, positions)
+                ]
+            )
+            if len(self.axes) == 1:
+                keys = (key for key, in keys)
+            self.view = dict(zip(keys, counts))
+        return self.view
+
+    def __getitem__(self, key):
+        return self.as_dict()[key]
+
+    def __iter__(self):
+        return iter(self.as_dict())
+
+    def __len__(self) -> int:
+        return len(self.as_dict())
+
+    def __getstate__(self):
+        self.flush()
+        state = self.__dict__.copy()
+        state["view"] = None
+        state["_index"] = None
+        return state
@@ -0,0 +1,226 @@
+import numpy as np
+from types import MappingProxyType
+from typing import Mapping
+from .shared import Shared
+from .spaces import servicer_earnings_batch_space
+from .types import ServiceEntityType, ServicerEntityType, StateType
+
+
+class RevenueSnapshot:
+    """
+    Revenue expectations of one servicer as of when it was taken, stands in
+    for the matrix on servicers that were removed or recorded.
+    """
+
+    def __init__(self, expectations: dict):
+        self.expectations = expectations
+
+    def view(self, servicer: ServicerEntityType) -> Mapping:
+        return MappingProxyType(self.expectations)
+
+    def snapshot(self, servicer: ServicerEntityType) -> "RevenueSnapshot":
+        return self
+
+
+class RevenueExpectations(Shared):
+    """
+    Revenue expectations of every servicer for every service in a dense
+    servicer x service matrix, updated for all of the servicers at once by
+    one EWM over the day's earnings.
+
+    The rows and columns are those of state["service_links"], which is also
+    where the links are read from, and the matrix grows along with it. An
+    update sets the expectations of the linked pairs, starting a pair from
+    its earnings the first time, and drops the rest. A column given to
+    another service since the last update starts over. The matrix is built
+    from the state on first use.
+
+    servicer.revenue_expectations is a read-only view of the servicer's row,
+    holding the services linked at the last update in the order they were
+    linked, like the dict the servicers used to hold.
+
+    The matrix is copied at every substep of a cadCAD run, so it copies and
+    pickles as just the known pairs, in the order the services of each row
+    were linked, along with their expectations. The services known to each
+    row are rebuilt from them on first use.
+    """
+
+    def __init__(self):
+        self.valid = False
+
+    def update(self, state: StateType) -> None:
+        if self.valid:
+            return
+        self.links = state["service_links"]
+        self.expectations = np.zeros(self.links.shape)
+        self.known = np.zeros(self.links.shape, dtype=bool)
+        self._known_services = {}
+        self.services = list(self.links.services)
+        self.n_updates = 0
+        self.valid = True
+        for servicer in state["Servicers"]:
+            self.add_servicer(servicer)
+
+    @property
+    def known_services(self) -> dict:
+        # The services of each row in the order they were linked, with their
+        # columns as of the last update
+        if self._known_services is None:
+            known = {}
+            for row, col in zip(*self.pairs()):
+                known.setdefault(row, []).append(col)
+            self._known_services = {
+                row: (tuple(self.services[x] for x in cols), cols)
+                for row, cols in known.items()
+            }
+        return self._known_services
+
+    def pairs(self) -> tuple:
+        """
+        Rows and columns of the known pairs, row by row in the order the
+        services of each row were linked.
+        """
+        if self._known_services is None:
+            return self.known_pairs
+        rows, cols = [], []
+        for row, (_, row_cols) in sorted(self._known_services.items()):
+            rows.extend([row] * len(row_cols))
+            cols.extend(row_cols)
+        return rows, cols
+
+    def fit(self) -> None:
+        # Grows with the link matrix
+        shape = self.links.shape
+        if shape == self.expectations.shape:
+            return
+        for name in ("expectations", "known"):
+            matrix = getattr(self, name)
+            grown = np.zeros(shape, dtype=matrix.dtype)
+            grown[: matrix.shape[0], : matrix.shape[1]] = matrix
+            setattr(self, name, grown)
+        self.services.extend([None] * (shape[1] - len(self.services)))
+
+    def add_servicer(self, servicer: ServicerEntityType) -> None:
+        if self.valid:
+            servicer.revenue_matrix = self
+
+    def remove_servicer(self, servicer: ServicerEntityType) -> None:
+        if not self.valid:
+            return
+        # The servicer keeps what it last expected, before its row is reused
+        servicer.revenue_matrix = self.snapshot(servicer)
+        row = self.links.rows[servicer]
+        if row < len(self.expectations):
+            self.expectations[row] = 0
+            self.known[row] = False
+        self.known_services.pop(row, None)
+
+    def earnings(self, state: StateType, servicer_earnings: dict) -> np.ndarray:
+        """
+        Matrix of earnings from a dict of the earnings per service of each
+        servicer.
+        """
+        self.update(state)
+        rows, cols, amounts = [], [], []
+        for servicer, by_service in servicer_earnings.items():
+            rows.extend([self.links.rows[servicer]] * len(by_service))
+            cols.extend([self.links.cols[service] for service in by_service])
+            amounts.extend(by_service.values())
+        earnings = np.zeros(self.links.shape)
+        earnings[rows, cols] = amounts
+        return earnings
+
+    def earnings_at(
+        self, state: StateType, space: servicer_earnings_batch_space
+    ) -> np.ndarray:
+        """
+        Matrix of earnings from arrays of (servicer, service) earnings.
+        """
+        self.update(state)
+        rows = np.array(
+            [self.links.rows[x] for x in space["servicers"]], dtype=np.int64
+        )
+        cols = np.array([self.links.cols[x] for x in space["services"]], dtype=np.int64)
+        earnings = np.zeros(self.links.shape)
+        earnings[rows[space["servicer_index"]], cols[space["service_index"]]] = space[
+            "amounts"
+        ]
+        return earnings
+
+    def ewm_update(
+        self, state: StateType, earnings: np.ndarray, lambda_ewm: float
+    ) -> None:
+        """
+        New expectations from the matrix of the day's earnings, EWM with
+        lambda_ewm over the expectations of the last update.
+        """
+        self.update(state)
+        self.fit()
+        links = self.links
+        same = [x is not None and x is y for x, y in zip(self.services, links.services)]
+        known = self.known & np.array(same)
+        linked = links.linked()
+        ewm = lambda_ewm * self.expectations + (1 - lambda_ewm) * earnings
+        self.expectations = np.where(linked, np.where(known, ewm, earnings), 0.0)
+        self.known = linked
+        self.services = list(links.services)
+        self.n_updates += 1
+        # The services of each row in the order they were linked, with their
+        # columns as of now
+        self._known_services = {}
+        for servicer, row in links.rows.items():
+            services = tuple(links.row_links[row])
+            if services:
+                cols = [links.cols[x] for x in services]
+                self._known_services[row] = (services, cols)
+
+    def view(self, servicer: ServicerEntityType) -> Mapping:
+        row = self.links.rows[servicer]
+        services, cols = self.known_services.get(row, ((), []))
+        return MappingProxyType(
+            dict(zip(services, self.expectations[row, cols].tolist()))
+        )
+
+    def lowest_revenue_service(
+        self, state: StateType, servicer: ServicerEntityType
+    ) -> ServiceEntityType:
+        """
+        The service the servicer expects the least revenue from, the one
+        linked first among ties.
+        """
+        self.update(state)
+        row = self.links.rows[servicer]
+        if row not in self.known_services:
+            raise IndexError("No revenue expectations")
+        services, cols = self.known_services[row]
+        return services[int(np.argmin(self.expectations[row, cols]))]
+
+    def snapshot(self, servicer: ServicerEntityType) -> RevenueSnapshot:
+        return RevenueSnapshot(dict(self.view(servicer)))
+
+    def stamp(self, servicer: ServicerEntityType) -> int:
+        # The expectations only change with an update
+        return self.n_updates
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if self.valid:
+            # Outside the known pairs the matrices are empty
+            rows, cols = (np.array(x, dtype=np.int64) for x in self.pairs())
+            state["shape"] = self.expectations.shape
+            state["expectations"] = self.expectations[rows, cols].tobytes()
+            state["known_pairs"] = (rows.tobytes(), cols.tobytes())
+            state["_known_services"] = None
+            del state["known"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.valid:
+            shape = self.__dict__.pop("shape")
+            rows, cols = (np.frombuffer(x, dtype=np.int64) for x in self.known_pairs)
+            self.expectations = np.zeros(shape)
+            self.expectations[rows, cols] = np.frombuffer(state["expectations"])
+            self.known = np.zeros(shape, dtype=bool)
+            self.known[rows, cols] = True
+            self.known_pairs = (rows.tolist(), cols.tolist())
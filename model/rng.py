@@ -0,0 +1,88 @@
+import zlib
+import numpy as np
+from typing import List, Sequence, TypeVar
+from .shared import Shared
+
+T = TypeVar("T")
+
+# One independent stream per subsystem. Streams are spawned by position, so
+# new subsystems must be appended to keep existing streams unchanged.
+STREAMS = (
+    "price",
+    "transactions",
+    "relays",
+    "joins",
+    "leaves",
+    "jailing",
+    "linking",
+    "delegation",
+)
+
+
+class RNGContext(Shared):
+    """
+    Random number generators for one simulation run.
+
+    The context is keyed on a seed key (the experiment key) and is bound
+    lazily to the (subset, run) it is used in, which spawns one numpy
+    Generator per subsystem from a SeedSequence over (seed key, subset, run).
+    The same experiment, subset and run therefore always see the same draws
+    no matter which engine, process or order it is executed in.
+    """
+
+    def __init__(self, seed_key: str):
+        self.seed_key = seed_key
+        self.bound_to = None
+        self.streams = None
+
+    def bind(self, subset: int, run: int) -> None:
+        entropy = [zlib.crc32(self.seed_key.encode()), subset, run]
+        children = np.random.SeedSequence(entropy).spawn(len(STREAMS))
+        self.streams = {
+            name: np.random.default_rng(child) for name, child in zip(STREAMS, children)
+        }
+        self.bound_to = (subset, run)
+
+    def stream(self, name: str, subset: int, run: int) -> np.random.Generator:
+        if self.bound_to != (subset, run):
+            self.bind(subset, run)
+        rng = self.streams[name]
+        if isinstance(rng, dict):
+            # Copied as its state, rebuilt on first use
+            bit_generator = getattr(np.random, rng["bit_generator"])()
+            bit_generator.state = rng
+            rng = self.streams[name] = np.random.Generator(bit_generator)
+        return rng
+
+    def __getstate__(self):
+        # cadCAD copies the state at every substep, copying the state of each
+        # generator is an order of magnitude cheaper than the generator
+        state = dict(self.__dict__)
+        if self.streams is not None:
+            state["streams"] = {
+                name: rng if isinstance(rng, dict) else rng.bit_generator.state
+                for name, rng in self.streams.items()
+            }
+        return state
+
+    def __deepcopy__(self, memo):
+        if Shared.active:
+            return self
+        # The states are new dicts that are never modified, they need no
+        # copying of their own
+        copied = object.__new__(type(self))
+        copied.__dict__.update(self.__getstate__())
+        memo[id(self)] = copied
+        return copied
+
+
+def get_rng(state, stream: str) -> np.random.Generator:
+    return state["rng"].stream(stream, state.get("subset", 0), state.get("run", 1))
+
+
+def choice(rng: np.random.Generator, population: Sequence[T]) -> T:
+    return population[rng.integers(len(population))]
+
+
+def sample(rng: np.random.Generator, population: Sequence[T], k: int) -> List[T]:
+    return [population[i] for i in rng.choice(len(population), k, replace=False)]
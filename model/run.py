@@ -6,12 +6,24 @@ from cadCAD import configs
 from cadCAD.configuration.utils import config_sim
 from cadCAD.configuration import Experiment
 from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 from model.config import build_state, build_params, experimental_setups
 import os
-from .kpis import create_simulation_kpis
-
-
-def load_config(monte_carlo_runs: int, t: int, params, initial_state):
+from .kpis import (
+    create_simulation_kpis,
+    calculate_gini_from_list,
+    calculate_gini_from_dict,
+)
+from .engine import execute, attach_recorders, collect_recorders
+from .manifest import JobManifest, atomic_write
+from .shared import sharing
+from .invariants import Invariants
+
+
+def load_config(
+    monte_carlo_runs: int, t: int, params, initial_state, experiment_name=None
+):
     sim_config = config_sim(
         {
             "N": monte_carlo_runs,  # number of monte carlo runs
@@ -25,11 +37,20 @@ def load_config(monte_carlo_runs: int, t: int, params, initial_state):
         sim_configs=sim_config,
         initial_state=initial_state,
         partial_state_update_blocks=psub_blocks,
+        # The experiment the configs are filed under by a sink
+        model_id=experiment_name,
     )
     return exp
 
 
-def add_config(exp: Experiment, monte_carlo_runs: int, t: int, params, initial_state):
+def add_config(
+    exp: Experiment,
+    monte_carlo_runs: int,
+    t: int,
+    params,
+    initial_state,
+    experiment_name=None,
+):
     sim_config = config_sim(
         {
             "N": monte_carlo_runs,  # number of monte carlo runs
@@ -42,104 +63,130 @@ def add_config(exp: Experiment, monte_carlo_runs: int, t: int, params, initial_s
         sim_configs=sim_config,
         initial_state=initial_state,
         partial_state_update_blocks=psub_blocks,
+        # The experiment the configs are filed under by a sink
+        model_id=experiment_name,
     )
 
 
-def run(exp) -> pd.DataFrame:
+def execute_cadcad(configs) -> list:
     """
-    Run simulation
+    Run the configs with cadCAD's executor in local mode.
+
+    cadCAD only runs the configs of different simulations side by side, the
+    runs of one simulation are handed to a process pool one at a time and
+    every record is pickled back from it. Those runs are executed here in
+    this process instead, one config at a time.
     """
     # execute in local mode
     exec_mode = ExecutionMode()
     local_mode_ctx = ExecutionContext(context=exec_mode.local_mode)
 
-    sim = Executor(exec_context=local_mode_ctx, configs=exp.configs)
-    raw_system_events, _, _ = sim.execute()
-    df = pd.DataFrame(raw_system_events)
-    return df
-
-
-def calculate_gini_from_list(values: list[float] == None) -> float:
-    """
-    Calculate the Gini coefficient from a list of values.
-
-    Parameters:
-    -----------
-    values : list
-        A list of floats representing the data points for which
-        the Gini coefficient is to be calculated.
-
-    Returns:
-    --------
-    float
-        The Gini coefficient calculated from the data.
+    if len({config.simulation_id for config in configs}) > 1:
+        sim = Executor(exec_context=local_mode_ctx, configs=configs)
+        raw_system_events, _, _ = sim.execute()
+        return raw_system_events
+    raw_system_events = []
+    for config in configs:
+        sim = Executor(exec_context=local_mode_ctx, configs=[config])
+        records, _, _ = sim.execute()
+        raw_system_events.extend(records)
+    return raw_system_events
+
+
+def run(
+    exp,
+    engine: str = "cadCAD",
+    recording: str = "substep",
+    record_interval: int = 1,
+    metrics: bool = False,
+    record_entities: bool = False,
+    checkpointer=None,
+    sink=None,
+    invariants: str = None,
+) -> pd.DataFrame:
     """
+    Run simulation
 
-    if values is None:
-        return None
-
-    else:
-        n = len(values)
-
-    # Handle case where values list is empty or all values are zero
-    if n == 0:
-        return None
-
-    x_bar = sum(values) / n
+    engine selects between the cadCAD executor ("cadCAD") and the in-house
+    step engine ("lean") which walks the same PSUBs without cadCAD's per
+    substep overhead.
 
-    # Calculating the sum of absolute differences
-    sum_of_differences = sum(abs(j - k) for j in values for k in values)
+    The lean engine can also record only the end of each timestep
+    (recording="timestep") and only every record_interval-th timestep, the
+    cadCAD executor always records every substep.
 
-    # Calculating the Gini coefficient
-    gini = sum_of_differences / (2 * n**2 * x_bar)
+    metrics=True writes the scalar state variables and the per timestep
+    aggregates into a columnar recorder instead of copying the full state per
+    record, record_entities=True also keeps the entity columns. Under the
+    cadCAD executor it also stops cadCAD from deep copying the entities at
+    every substep, see model/shared.py.
 
-    return gini
+    A Checkpointer from model/checkpoint.py has the lean engine save each run
+    periodically and resume runs from their latest checkpoint.
 
+    A ParquetSink from model/sink.py has the lean engine stream the scalar
+    columns of each run to disk as it finishes, nothing is returned then. The
+    runs are filed under the experiment_name given to load_config/add_config.
 
-def calculate_gini_from_dict(dict_to_use: dict = None) -> float:
+    invariants sets how thoroughly the runs check their invariants ("off",
+    "sampled" or "strict"), see model/invariants.py. The runs keep the level
+    their initial state was built with (sampled) by default.
     """
-    Calculate the Gini coefficient from a list of values.
-
-    Parameters:
-    -----------
-    values : list
-        A list of floats representing the data points for which
-        the Gini coefficient is to be calculated.
-
-    Returns:
-    --------
-    float
-        The Gini coefficient calculated from the data.
-    """
-
-    if dict_to_use is None:
-        return None
-
-    values = dict_to_use.values()
-    gini = calculate_gini_from_list(values)
-    return gini
+    if invariants is not None:
+        for config in exp.configs:
+            config.initial_state["invariants"] = Invariants(invariants)
+    if engine == "cadCAD":
+        assert (
+            recording == "substep" and record_interval == 1
+        ), "Recording modes require the lean engine"
+        assert checkpointer is None, "Checkpoints require the lean engine"
+        assert sink is None, "Streaming results requires the lean engine"
+        if metrics:
+            attach_recorders(exp.configs, record_entities=record_entities)
+        # The recorder is the record of the run, cadCAD's copies of the
+        # state can share the entities
+        with sharing(metrics):
+            raw_system_events = execute_cadcad(exp.configs)
+        if metrics:
+            return collect_recorders(raw_system_events)
+    elif engine == "lean":
+        return execute(
+            exp.configs,
+            recording=recording,
+            record_interval=record_interval,
+            metrics=metrics,
+            record_entities=record_entities,
+            checkpointer=checkpointer,
+            sink=sink,
+        )
+    else:
+        assert False, "Invalid engine"
+    df = pd.DataFrame(raw_system_events)
+    return df
 
 
 def compute_KPIs(df: pd.DataFrame):
     df["POKT_net_mint"] = df["POKT_minted"] - df["POKT_burned"]
-    df["total_application_stake"] = df["Applications"].apply(
-        lambda x: sum([y.staked_pokt for y in x])
-    )
-    df["total_servicer_stake"] = df["Servicers"].apply(
-        lambda x: sum([y.staked_pokt for y in x])
-    )
-    df["total_gateway_stake"] = df["Gateways"].apply(
-        lambda x: sum([y.staked_pokt for y in x])
-    )
+    # Columns the metrics recorder already aggregated are not recomputed
+    if "total_application_stake" not in df.columns:
+        df["total_application_stake"] = df["Applications"].apply(
+            lambda x: sum([y.staked_pokt for y in x])
+        )
+        df["total_servicer_stake"] = df["Servicers"].apply(
+            lambda x: sum([y.staked_pokt for y in x])
+        )
+        df["total_gateway_stake"] = df["Gateways"].apply(
+            lambda x: sum([y.staked_pokt for y in x])
+        )
     df["total_stake"] = (
         df["total_application_stake"]
         + df["total_servicer_stake"]
         + df["total_gateway_stake"]
     )
     df["circulating_supply"] = df["floating_supply"] - df["total_stake"]
-    df["dao_value_capture"] = (
-        df["DAO"].apply(lambda x: x.pokt_holdings) / df["floating_supply"]
-    )
+    if "dao_pokt_holdings" not in df.columns:
+        df["dao_pokt_holdings"] = df["DAO"].apply(lambda x: x.pokt_holdings)
+    df["dao_value_capture"] = df["dao_pokt_holdings"] / df["floating_supply"]
 
     df["POKT_burned_cummulative"] = (
         df.groupby("key")["POKT_burned"].expanding().sum().reset_index(drop=True)
@@ -172,20 +219,38 @@ def compute_KPIs(df: pd.DataFrame):
         .reset_index(drop=True)
     )
 
-    df["kpi_c"] = df["servicer_relay_log"].apply(calculate_gini_from_dict)
-
-    df["n_servicers"] = df["Servicers"].apply(len)
-    df["n_applications"] = df["Applications"].apply(len)
-    df["n_gateways"] = df["Gateways"].apply(len)
-    df["n_services"] = df["Services"].apply(len)
-    df["n_understaked_servicers"] = df["understaked_servicers"].apply(len)
-    df["n_understaked_gateways"] = df["understaked_gateways"].apply(len)
-    df["n_understaked_applications"] = df["understaked_applications"].apply(len)
+    if "kpi_c" not in df.columns:
+        df["kpi_c"] = df["servicer_relay_log"].apply(calculate_gini_from_dict)
+
+    if "n_servicers" not in df.columns:
+        df["n_servicers"] = df["Servicers"].apply(len)
+        df["n_applications"] = df["Applications"].apply(len)
+        df["n_gateways"] = df["Gateways"].apply(len)
+        df["n_services"] = df["Services"].apply(len)
+        df["n_understaked_servicers"] = df["understaked_servicers"].apply(len)
+        df["n_understaked_gateways"] = df["understaked_gateways"].apply(len)
+        df["n_understaked_applications"] = df["understaked_applications"].apply(len)
+
+
+# State variables that support the run rather than record it, dropped from
+# the results
+RUN_SUPPORT = (
+    "rng",
+    "servicer_sampler",
+    "invariants",
+    "servicer_index",
+    "revenue_expectations",
+    "ids",
+    "servicer_history",
+    "service_links",
+)
 
 
 def postprocessing(df: pd.DataFrame, meta_data, compute_kpis=True) -> pd.DataFrame:
     # Get only the last timestep
     df = df.groupby(["simulation", "subset", "run", "timestep"]).last().reset_index()
+    # The objects supporting the run are not results
+    df = df.drop(columns=list(RUN_SUPPORT), errors="ignore")
     df = pd.concat([df, df["simulation"].apply(lambda x: meta_data.loc[x])], axis=1)
 
     df["key"] = df.apply(
@@ -201,34 +266,62 @@ def postprocessing(df: pd.DataFrame, meta_data, compute_kpis=True) -> pd.DataFra
     return df, simulation_kpis
 
 
-def run_experiments(experiment_keys):
-    meta_data = []
-
-    experimental_setup = experimental_setups[experiment_keys[0]]
-    state = build_state(experimental_setup["config_option_state"])
+def run_experiment_unit(
+    experiment_key, simulation, run_number, **run_options
+) -> pd.DataFrame:
+    """
+    Run a single monte carlo run of one experiment, the unit of work handed to
+    the process pool in run_parallel.
+    """
+    experimental_setup = experimental_setups[experiment_key]
+    state = build_state(experimental_setup["config_option_state"], experiment_key)
     params = build_params(experimental_setup["config_option_params"])
-    exp = load_config(
-        experimental_setup["monte_carlo_n"], experimental_setup["T"], params, state
-    )
-    meta_data.append(
-        [
-            experiment_keys[0],
-            experimental_setup["config_option_state"],
-            experimental_setup["config_option_params"],
-        ]
-    )
+    exp = load_config(1, experimental_setup["T"], params, state, experiment_key)
 
-    for key in experiment_keys[1:]:
-        experimental_setup = experimental_setups[key]
-        state = build_state(experimental_setup["config_option_state"])
-        params = build_params(experimental_setup["config_option_params"])
-        add_config(
-            exp,
-            experimental_setup["monte_carlo_n"],
-            experimental_setup["T"],
-            params,
-            state,
+    # Give the configs, one per subset of a params sweep, the ids they would
+    # have had in the full experiment
+    for config in exp.configs:
+        config.simulation_id = simulation
+        config.run_id = run_number - 1
+    return run(exp, **run_options)
+
+
+def run_parallel(experiment_keys, n_workers=None, **run_options) -> pd.DataFrame:
+    """
+    Shard every (experiment key, monte carlo run) pair across a process pool
+    and stitch the results back into the frame run() would have produced.
+    n_workers defaults to the number of cores, run_options are passed to run.
+    """
+    units = []
+    for simulation, key in enumerate(experiment_keys):
+        for run_number in range(1, experimental_setups[key]["monte_carlo_n"] + 1):
+            units.append((key, simulation, run_number))
+
+    keys, simulations, run_numbers = zip(*units)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        raws = list(
+            executor.map(
+                partial(run_experiment_unit, **run_options),
+                keys,
+                simulations,
+                run_numbers,
+            )
         )
+    if run_options.get("sink") is not None:
+        return None
+    return pd.concat(raws, ignore_index=True)
+
+
+def run_experiments(experiment_keys, parallel=False, n_workers=None, **run_options):
+    """
+    Run the experiments and post process them. run_options (engine, recording,
+    record_interval, metrics, record_entities, checkpointer, sink, invariants)
+    are passed through to run. With a sink the results are streamed to it and
+    there is nothing to post process.
+    """
+    meta_data = []
+    for key in experiment_keys:
+        experimental_setup = experimental_setups[key]
         meta_data.append(
             [
                 key,
@@ -237,7 +330,40 @@ def run_experiments(experiment_keys):
             ]
         )
 
-    raw = run(exp)
+    if parallel:
+        raw = run_parallel(experiment_keys, n_workers=n_workers, **run_options)
+    else:
+        experimental_setup = experimental_setups[experiment_keys[0]]
+        state = build_state(
+            experimental_setup["config_option_state"], experiment_keys[0]
+        )
+        params = build_params(experimental_setup["config_option_params"])
+        exp = load_config(
+            experimental_setup["monte_carlo_n"],
+            experimental_setup["T"],
+            params,
+            state,
+            experiment_keys[0],
+        )
+
+        for key in experiment_keys[1:]:
+            experimental_setup = experimental_setups[key]
+            state = build_state(experimental_setup["config_option_state"], key)
+            params = build_params(experimental_setup["config_option_params"])
+            add_config(
+                exp,
+                experimental_setup["monte_carlo_n"],
+                experimental_setup["T"],
+                params,
+                state,
+                key,
+            )
+
+        raw = run(exp, **run_options)
+
+    if run_options.get("sink") is not None:
+        return None
+
     meta_data = pd.DataFrame(
         meta_data, columns=["Experiment Name", "State Set", "Params Set"]
     )
@@ -248,45 +374,75 @@ def run_experiments(experiment_keys):
 
 def write_to_csv(df, data_folder, over_write=False):
     for key in df["Experiment Name"].unique():
+        path = "experiment_data/{}/{}.csv".format(data_folder, key)
         if not over_write:
-            assert "{}.csv".format(key) not in os.listdir(
-                "experiment_data/{}".format(data_folder)
-            ), "File already present"
-        df[df["Experiment Name"] == key].to_csv(
-            "experiment_data/{}/{}.csv".format(data_folder, key)
-        )
+            assert not os.path.exists(path), "File already present"
+        atomic_write(path, df[df["Experiment Name"] == key].to_csv)
+
+
+def run_chunk(experiment_keys, data_folder, run_options):
+    """
+    Run a chunk of auto_run_sets and write out its results.
+    """
+    df, _ = run_experiments(experiment_keys, **run_options)
+    # A file left by an interrupted attempt is complete but was never marked
+    # done, so it is replaced
+    write_to_csv(df, data_folder, over_write=True)
+    return experiment_keys
 
 
-def auto_run_sets(experiment_keys, data_folder, chunk_size):
-    current_runs = [
-        x.replace(".csv", "")
-        for x in os.listdir("experiment_data/{}".format(data_folder))
+def auto_run_sets(experiment_keys, data_folder, chunk_size, n_workers=1, **run_options):
+    """
+    Run the experiments in chunks of chunk_size, writing each experiment to
+    experiment_data/<data_folder>/<key>.csv and tracking the status of every
+    key in a manifest.json next to them. With n_workers > 1 the chunks run
+    concurrently across processes. Picks up where it left off after a crash,
+    only keys marked done with their csv present are not run again.
+    run_options are passed to run_experiments.
+    """
+    folder = "experiment_data/{}".format(data_folder)
+    os.makedirs(folder, exist_ok=True)
+    manifest = JobManifest(os.path.join(folder, "manifest.json"))
+
+    lost = [
+        x
+        for x in experiment_keys
+        if manifest.status(x) == "done"
+        and not os.path.exists(os.path.join(folder, "{}.csv".format(x)))
     ]
-    already_run = []
-    new_runs = []
-    for x in experiment_keys:
-        if x in current_runs:
-            already_run.append(x)
-        else:
-            new_runs.append(x)
+    if len(lost) > 0:
+        manifest.set_status(lost, "pending")
+    new_runs = manifest.pending(experiment_keys)
+    already_run = [x for x in experiment_keys if x not in new_runs]
     if len(already_run) > 0:
         print("The following have already been run:")
         for x in already_run:
             print(x)
         print()
 
-    while len(new_runs) > 0:
-        if chunk_size > len(new_runs):
-            next_runs = new_runs
-            new_runs = []
-        else:
-            next_runs = new_runs[-chunk_size:]
-            new_runs = new_runs[:-chunk_size]
-
-        print("Running the following:")
-        for x in next_runs:
+    chunks = [new_runs[i : i + chunk_size] for i in range(0, len(new_runs), chunk_size)]
+    failed = []
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = {}
+        for chunk in chunks:
+            print("Running the following:")
+            for x in chunk:
+                print(x)
+            print()
+            futures[executor.submit(run_chunk, chunk, data_folder, run_options)] = chunk
+            manifest.set_status(chunk, "running")
+
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                manifest.set_status(chunk, "failed", error=repr(e))
+                failed.extend(chunk)
+            else:
+                manifest.set_status(chunk, "done")
+
+    if len(failed) > 0:
+        print("The following failed:")
+        for x in failed:
             print(x)
-        print()
-
-        df = run_experiments(next_runs)
-        write_to_csv(df, data_folder)
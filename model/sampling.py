@@ -0,0 +1,83 @@
+import numpy as np
+from typing import List
+from .shared import Cache
+
+
+def build_alias_table(weights: np.ndarray):
+    """
+    Vose's alias table for drawing index i with probability proportional to
+    weights[i] in O(1): draw i uniformly and keep it with probability
+    prob[i], otherwise take alias[i].
+    """
+    n = len(weights)
+    scaled = weights * n / weights.sum()
+    prob = np.ones(n)
+    alias = np.arange(n)
+    small = [i for i in range(n) if scaled[i] < 1]
+    large = [i for i in range(n) if scaled[i] >= 1]
+    while small and large:
+        i = small.pop()
+        j = large.pop()
+        prob[i] = scaled[i]
+        alias[i] = j
+        scaled[j] -= 1 - scaled[i]
+        if scaled[j] < 1:
+            small.append(j)
+        else:
+            large.append(j)
+    return prob, alias
+
+
+class ServicerSampler(Cache):
+    """
+    QoS weighted sampling of servicers without replacement, paused servicers
+    are never drawn.
+
+    Servicers are drawn one after the other with probability proportional to
+    their QoS among the ones not drawn yet. The alias table is built from
+    state["Servicers"] on first use and kept until invalidate is called,
+    which the mechanisms adding, removing and (un)jailing servicers do.
+    """
+
+    def update(self, servicers: List) -> None:
+        if self.valid:
+            return
+        self.positions = np.array(
+            [i for i, x in enumerate(servicers) if not x.pause_height],
+            dtype=np.int64,
+        )
+        self.weights = np.zeros(len(servicers))
+        self.weights[self.positions] = [servicers[i].QoS for i in self.positions]
+        if len(self.positions):
+            self.prob, self.alias = build_alias_table(self.weights[self.positions])
+        self.valid = True
+
+    def sample(self, rng: np.random.Generator, servicers: List, k: int) -> List:
+        """
+        k servicers in the order they were drawn, O(k) draws on average as
+        long as k is small next to the number of active servicers.
+        """
+        self.update(servicers)
+        n = len(self.positions)
+        # Servicers without QoS are never drawn
+        n_eligible = np.count_nonzero(self.weights)
+        if k > n_eligible:
+            raise ValueError(
+                "Cannot take a larger sample than population when 'replace=False'"
+            )
+        if 2 * k > n_eligible:
+            # Rejecting repeats gets slow, rank exponential arrival times
+            with np.errstate(divide="ignore"):
+                keys = rng.standard_exponential(n) / self.weights[self.positions]
+            drawn = np.argsort(keys)[:k].tolist()
+        else:
+            drawn = []
+            while len(drawn) < k:
+                i = rng.integers(n, size=k - len(drawn))
+                i = np.where(rng.random(len(i)) < self.prob[i], i, self.alias[i])
+                for x in i.tolist():
+                    # Drawing again when a servicer repeats is drawing from
+                    # the servicers not drawn yet
+                    if x not in drawn and len(drawn) < k:
+                        drawn.append(x)
+        return [servicers[self.positions[x]] for x in drawn]
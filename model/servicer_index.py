@@ -0,0 +1,60 @@
+from typing import List
+from .shared import Cache
+from .types import ServiceEntityType, ServicerEntityType, StateType
+
+
+class ServicerIndex(Cache):
+    """
+    Unpaused servicers linked to each (service, geo zone), for paying out
+    the relays of a service in a zone without scanning the service's
+    servicers.
+
+    The links are read from state["service_links"]. The unpaused servicers
+    of a service are grouped by geo zone, in the order they are in
+    service.servicers, and cached until the links of the service change or
+    one of them is (un)jailed, as is the list of all unpaused servicers.
+    """
+
+    def update(self, state: StateType) -> None:
+        if self.valid:
+            return
+        self.active = {}
+        self.all_active = None
+        self.valid = True
+
+    def active_servicers(
+        self, state: StateType, service: ServiceEntityType, geo_zone
+    ) -> List[ServicerEntityType]:
+        self.update(state)
+        links = state["service_links"]
+        col = links.cols[service]
+        version, by_zone = self.active.get(service, (None, None))
+        if version != links.versions[col]:
+            by_zone = {}
+            for servicer in links.col_links[col]:
+                if not servicer.pause_height:
+                    by_zone.setdefault(servicer.geo_zone, []).append(servicer)
+            self.active[service] = (links.versions[col], by_zone)
+        return by_zone.get(geo_zone, [])
+
+    def all_active_servicers(self, state: StateType) -> List[ServicerEntityType]:
+        self.update(state)
+        if self.all_active is None:
+            self.all_active = [x for x in state["Servicers"] if not x.pause_height]
+        return self.all_active
+
+    def pause(self, servicer: ServicerEntityType) -> None:
+        # The servicer was jailed or unjailed
+        if self.valid:
+            for service in servicer.services:
+                self.active.pop(service, None)
+            self.all_active = None
+
+    def add(self, servicer: ServicerEntityType) -> None:
+        # New servicers go at the end of state["Servicers"]
+        if self.valid and self.all_active is not None and not servicer.pause_height:
+            self.all_active.append(servicer)
+
+    def remove(self, servicer: ServicerEntityType) -> None:
+        if self.valid and not servicer.pause_height:
+            self.all_active = None
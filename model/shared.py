@@ -0,0 +1,116 @@
+import copy
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+from .types import StateType
+
+# State variables holding collections of entities that are updated by
+# reference, their update functions are pass throughs
+BY_REFERENCE = (
+    "Geozones",
+    "Applications",
+    "Gateways",
+    "Services",
+    "Servicers",
+    "Validators",
+    "Sessions",
+)
+
+
+class Shared:
+    """
+    Mixin for objects that are only ever updated by reference.
+
+    While sharing is active a deepcopy hands back the object itself, so the
+    copy cadCAD makes of the state at every substep is O(1) for them instead
+    of walking the whole entity graph. Sharing is off by default and is only
+    switched on within sharing(), every other deepcopy (building the state,
+    the params) is a real copy made from what the object pickles.
+    """
+
+    __slots__ = ()
+    active = False
+
+    def __deepcopy__(self, memo):
+        if Shared.active:
+            return self
+        reduced = self.__reduce_ex__(4) + (None,) * 3
+        new, args, state, listitems, dictitems = reduced[:5]
+        copied = new(*copy.deepcopy(args, memo))
+        memo[id(self)] = copied
+        if state is not None:
+            state = copy.deepcopy(state, memo)
+            if hasattr(copied, "__setstate__"):
+                copied.__setstate__(state)
+            else:
+                # Default state of an object, its __dict__ and its slots
+                attributes, slots = state if isinstance(state, tuple) else (state, {})
+                for name, value in {**(attributes or {}), **slots}.items():
+                    setattr(copied, name, value)
+        if listitems is not None:
+            copied.extend(copy.deepcopy(list(listitems), memo))
+        if dictitems is not None:
+            for key, value in dictitems:
+                copied[copy.deepcopy(key, memo)] = copy.deepcopy(value, memo)
+        return copied
+
+
+@contextmanager
+def sharing(active: bool = True) -> Iterator[None]:
+    """
+    Switch sharing on (or off) for the duration of the block, it is put back
+    as it was when the block exits, also when it raises.
+    """
+    previous = Shared.active
+    Shared.active = active
+    try:
+        yield
+    finally:
+        Shared.active = previous
+
+
+class SharedList(Shared, list):
+    pass
+
+
+class Cache(Shared):
+    """
+    Shared object holding only what can be derived from the rest of the
+    state, built on first use (update) and dropped with invalidate.
+
+    A copy, or a pickle, is an empty cache that is built again the first
+    time it is used, so the copies of the state kept as records do not carry
+    the cache along.
+    """
+
+    def __init__(self):
+        self.valid = False
+
+    def invalidate(self) -> None:
+        self.valid = False
+
+    def __reduce__(self):
+        return (type(self), ())
+
+
+def share_state(state: StateType) -> None:
+    for key in BY_REFERENCE:
+        if not isinstance(state[key], Shared):
+            state[key] = SharedList(state[key])
+
+
+def recording_blocks(
+    partial_state_update_blocks: List[dict], policy: Callable
+) -> List[Dict[str, Dict[str, Callable]]]:
+    """
+    Copy of the blocks with the recording policy put first in every block.
+
+    The first policy of a block sees the state exactly as the previous block
+    left it, before any of this block's policies mutate the entities.
+    """
+    return [
+        {
+            "policies": {"record": policy, **block["policies"]},
+            "variables": block["variables"],
+        }
+        for block in partial_state_update_blocks
+    ]
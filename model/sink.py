@@ -0,0 +1,63 @@
+import os
+import pandas as pd
+from .recorder import ID_COLUMNS
+
+
+class ParquetSink:
+    """
+    Streams the results of each run to a Parquet dataset as soon as the run
+    is done, so only one run is ever held in memory.
+
+    The dataset is partitioned by experiment name and holds one file per run:
+
+        <root>/experiment=<name>/run-<simulation>-<subset>-<run>.parquet
+
+    Only the scalar columns are written, the entity columns hold live objects
+    that do not have a columnar representation. Apart from the id columns
+    they are written as floats.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def write_run(self, experiment_name: str, df: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = [
+            column
+            for column in df.columns
+            if pd.api.types.is_numeric_dtype(df[column])
+            or pd.api.types.is_bool_dtype(df[column])
+        ]
+        folder = os.path.join(self.root, "experiment={}".format(experiment_name))
+        os.makedirs(folder, exist_ok=True)
+        name = "run-{}-{}-{}.parquet".format(
+            df["simulation"].iloc[0], df["subset"].iloc[0], df["run"].iloc[0]
+        )
+        # Runs can differ in whether a column came out int or float, a single
+        # float type keeps the schema the same across the dataset
+        df = df[columns].astype(
+            {column: float for column in columns if column not in ID_COLUMNS}
+        )
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Write then rename so readers never see a half written run, dataset
+        # discovery skips the dot file
+        temp_path = os.path.join(folder, "." + name)
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, os.path.join(folder, name))
+
+
+def read_results(root: str, columns=None, experiments=None) -> pd.DataFrame:
+    """
+    Read a dataset written by ParquetSink, only loading the given columns and
+    experiments (all of them by default).
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    expression = None
+    if experiments is not None:
+        expression = ds.field("experiment").isin(experiments)
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas()
@@ -1,3 +1,4 @@
+import numpy as np
 from typing import TypedDict, List, Dict
 from ..types import (
     PublicKeyType,
@@ -9,7 +10,8 @@ from ..types import (
     BlockHeightType,
     StakeStatusType,
     ApplicationEntityType,
-    SessionType,
+    ServiceEntityType,
+    ServicerEntityType,
 )
 
 application_leave_space = TypedDict(
@@ -22,7 +24,10 @@ application_leave_space = TypedDict(
 new_session_space = TypedDict(
     "New Session Space",
     {
-        "session": SessionType,
+        "application": ApplicationEntityType,  # the application that is being served
+        "service": ServiceEntityType,  # the service the session is valid for
+        "servicers": List[ServicerEntityType],  # the servicers serving the application
+        "number_of_relays": int,  # relays done in the session
     },
 )
 
@@ -118,6 +123,28 @@ submit_relay_request_space = TypedDict(
     },
 )
 
+session_batch_space = TypedDict(
+    "Session Batch Space",
+    {
+        "applications": np.ndarray,  # Index into Applications of each session
+        "number_of_relays": np.ndarray,  # Relays requested in each session
+        "services": np.ndarray,  # Index into Services of each session
+        "servicers": np.ndarray,  # Indices into Servicers, first number_of_services are used
+        "number_of_services": np.ndarray,  # Servicers in each session
+    },
+)
+
+relay_aggregate_space = TypedDict(
+    "Relay Aggregate Space",
+    {
+        "applications": np.ndarray,  # Index into Applications of each (application, service)
+        "services": np.ndarray,  # Index into Services of each (application, service)
+        "number_of_sessions": np.ndarray,  # Sessions of each (application, service)
+        "number_of_relays": np.ndarray,  # Relays of all of those sessions together
+        "servicer_seats": np.ndarray,  # Sessions of the pair each servicer is in, one row per pair
+    },
+)
+
 application_stake_status_space = TypedDict(
     "Application Stake Status Space",
     {
@@ -10,11 +10,11 @@ from ..types import (
     StakeStatusType,
     ServicerEntityType,
     ApplicationEntityType,
-    SessionType,
     ServicerGroupType,
     ServiceEntityType,
 )
 from typing import TypedDict, List, Dict
+import numpy as np
 
 servicer_leave_space = TypedDict(
     "Servicer Leave Space",
@@ -56,6 +56,27 @@ modify_servicer_pokt_space = TypedDict(
 )
 
 
+servicer_salary_batch_space = TypedDict(
+    "Servicer Salary Batch Space",
+    {
+        "servicers": List[ServicerEntityType],  # Each servicer paid once
+        "amounts": List[uPOKTType],  # The total uPOKT paid to each of them
+    },
+)
+
+
+servicer_earnings_batch_space = TypedDict(
+    "Servicer Earnings Batch Space",
+    {
+        "servicers": List[ServicerEntityType],
+        "services": List[ServiceEntityType],
+        "servicer_index": np.ndarray,  # Index into servicers of each (servicer, service)
+        "service_index": np.ndarray,  # Index into services of each (servicer, service)
+        "amounts": np.ndarray,  # Earned by each (servicer, service)
+    },
+)
+
+
 servicer_param_update_space = TypedDict(
     "Servicer Param Update Space",
     {
@@ -167,7 +188,7 @@ servicer_relay_space = TypedDict(
     {
         "servicers": ServicerGroupType,  # Addresses of servicers serviving during a session
         "applications": ApplicationEntityType,
-        "session": SessionType,
+        "session": int,  # session number in state["Sessions"]
     },
 )
 
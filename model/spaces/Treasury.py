@@ -1,4 +1,5 @@
-from typing import TypedDict
+import numpy as np
+from typing import TypedDict, List
 from ..types import (
     uPOKTType,
     BlockHeightType,
@@ -25,6 +26,16 @@ mint_block_rewards_space = TypedDict(
     },
 )
 
+block_reward_batch_space = TypedDict(
+    "Block Reward Batch Space",
+    {
+        "block_producer": PublicKeyType,  # The address of the validator which created the block
+        "services": List[ServiceEntityType],  # Service of each relay_log key
+        "geo_zones": List[GeoZoneType],  # Geo zone of each relay_log key
+        "relays": np.ndarray,  # Relays of each relay_log key
+    },
+)
+
 distribute_fees_space = TypedDict(
     "Distribute Fees Space",
     {
@@ -4,6 +4,8 @@ from .Servicer import (
     servicer_unpause_space,
     assign_servicer_salary_space,
     modify_servicer_pokt_space,
+    servicer_salary_batch_space,
+    servicer_earnings_batch_space,
     servicer_param_update_space,
     servicer_unstake_space,
     servicer_unpause_space2,
@@ -35,6 +37,8 @@ from .Application import (
     application_entity_space,
     new_session_space,
     application_leave_space,
+    session_batch_space,
+    relay_aggregate_space,
 )
 from .Validator import (
     validator_stake_space,
@@ -57,6 +61,7 @@ from .Gateway import (
 )
 from .Treasury import (
     mint_block_rewards_space,
+    block_reward_batch_space,
     burn_pokt_space,
     jail_node_space,
     mint_pokt_mechanism_space,
@@ -81,6 +86,8 @@ spaces = {
     "Servicer Unpause Space": servicer_unpause_space,
     "Assign Servicer Salary Space": assign_servicer_salary_space,
     "Modify Servicer POKT Space": modify_servicer_pokt_space,
+    "Servicer Salary Batch Space": servicer_salary_batch_space,
+    "Servicer Earnings Batch Space": servicer_earnings_batch_space,
     "Servicer Param Update Space": servicer_param_update_space,
     "Servicer Unstake Space": servicer_unstake_space,
     "Application Stake Space": application_stake_space,
@@ -100,7 +107,10 @@ spaces = {
     "Validator Block Reward Space": validator_block_reward_space,
     "Submit Relay Request Space": submit_relay_request_space,
     "Servicer Relay Space": servicer_relay_space,
+    "Session Batch Space": session_batch_space,
+    "Relay Aggregate Space": relay_aggregate_space,
     "Mint Block Rewards Space": mint_block_rewards_space,
+    "Block Reward Batch Space": block_reward_batch_space,
     "Burn POKT Space": burn_pokt_space,
     "Jail Node Space": jail_node_space,
     "Unjail Node Space": unjail_node_space,
@@ -1,4 +1,4 @@
-from typing import NewType, TypedDict, List, Literal
+from typing import NewType, TypedDict, List, Literal, Mapping
 from .Primitives import POKTType, PercentType, NanoSecondsType, GeoZoneType
 from .Entity import (
     ApplicationEntityType,
@@ -22,14 +22,17 @@ StateType = NewType(
             "Validators": List[object],
             "height": int,
             "day": int,
-            "Sessions": List[SessionType],
+            "Sessions": object,
+            "servicer_sampler": object,
+            "servicer_index": object,
+            "revenue_expectations": object,
             "total_relays": int,
             "processed_relays": int,
             "pokt_price_true": float,
             "pokt_price_oracle": float,
             "n_transactions": int,
-            "relay_log": dict,
-            "servicer_relay_log": dict,
+            "relay_log": Mapping,
+            "servicer_relay_log": Mapping,
             "floating_supply": int,
             "understaked_servicers": List[ServiceEntityType],
             "understaked_gateways": List[GatewayEntityType],
@@ -38,6 +41,11 @@ StateType = NewType(
             "POKT_minted": int,
             "period_slashing_costs": int,
             "period_jailing_opportunity_cost": int,
+            "rng": object,
+            "invariants": object,
+            "ids": object,
+            "servicer_history": object,
+            "service_links": object,
         },
     ),
 )
@@ -118,6 +126,11 @@ FunctionalParamsType = NewType(
             "relay_requests_function": List[Literal["test"]],
             "submit_relay_requests_function": List[Literal["test", "basic_gamma"]],
             "submit_relay_requests_policy_function": List[Literal["test", "V1"]],
+            "session_generation_function": List[
+                Literal["sequential", "batched", "aggregate"]
+            ],
+            "servicer_selection_function": List[Literal["uniform", "qos"]],
+            "block_reward_function": List[Literal["sequential", "vectorized"]],
             "application_leave_function": List[Literal["basic"]],
             "service_leave_function": List[Literal["basic"]],
             "servicer_leave_function": List[Literal["basic"]],
@@ -191,6 +204,11 @@ ParamType = NewType(
             "relay_requests_function": List[Literal["test"]],
             "submit_relay_requests_function": List[Literal["test", "basic_gamma"]],
             "submit_relay_requests_policy_function": List[Literal["test", "V1"]],
+            "session_generation_function": List[
+                Literal["sequential", "batched", "aggregate"]
+            ],
+            "servicer_selection_function": List[Literal["uniform", "qos"]],
+            "block_reward_function": List[Literal["sequential", "vectorized"]],
             "application_leave_function": List[Literal["basic"]],
             "service_leave_function": List[Literal["basic"]],
             "servicer_leave_function": List[Literal["basic"]],
@@ -0,0 +1,61 @@
+import pytest
+from model.action_chains.system import (
+    block_reward_sequential_ac,
+    block_reward_vectorized_ac,
+)
+from model.config.params import build_params
+from model.config.state import build_state
+from model.engine import snapshot
+from model.psub.servicer import p_relay_requests
+
+# How far the vectorized payouts of a day may drift from the sequential ones
+RTOL = 1e-12
+
+
+def day_of_relays():
+    params = {key: value[0] for key, value in build_params("Base").items()}
+    state = build_state("Base")
+    state["timestep"] = 1
+    state.update(p_relay_requests(params, 1, [], state))
+    return params, state
+
+
+def balances(state) -> list:
+    out = [
+        state["floating_supply"],
+        state["POKT_minted"],
+        state["POKT_burned"],
+        state["DAO"].pokt_holdings,
+    ]
+    out.extend(x.pokt_holdings for x in state["Validators"])
+    for servicer in state["Servicers"]:
+        out.extend([servicer.pokt_holdings, servicer.total_revenues])
+        out.extend(servicer.revenue_expectations.values())
+    return out
+
+
+def test_vectorized_block_rewards_match_sequential():
+    params, state = day_of_relays()
+    vectorized = snapshot(state)
+    block_reward_sequential_ac(state, params)
+    block_reward_vectorized_ac(vectorized, params)
+
+    assert state["POKT_minted"] == vectorized["POKT_minted"]
+    for servicer, other in zip(state["Servicers"], vectorized["Servicers"]):
+        assert [x.name for x in servicer.revenue_expectations] == [
+            x.name for x in other.revenue_expectations
+        ]
+    assert balances(vectorized) == pytest.approx(balances(state), rel=RTOL)
+
+
+def test_vectorized_block_rewards_without_active_servicers_raise():
+    params, state = day_of_relays()
+    for servicer in state["Servicers"]:
+        servicer.pause_height = 1
+        state["servicer_index"].pause(servicer)
+    with pytest.raises(ZeroDivisionError):
+        block_reward_sequential_ac(snapshot(state), params)
+    minted = state["POKT_minted"]
+    with pytest.raises(ZeroDivisionError):
+        block_reward_vectorized_ac(state, params)
+    assert state["POKT_minted"] == minted
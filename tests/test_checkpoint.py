@@ -0,0 +1,91 @@
+import io
+import pandas as pd
+import pytest
+from model.checkpoint import Checkpointer, LocalStorage, S3Storage
+from model.recorder import ID_COLUMNS, SCALAR_COLUMNS
+from model.run import run
+from test_engine import experiment
+
+COLUMNS = list(ID_COLUMNS + SCALAR_COLUMNS)
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingStorage(LocalStorage):
+    """
+    Local storage that stops the run at its n-th write.
+    """
+
+    def __init__(self, root: str, n: int):
+        super().__init__(root)
+        self.n = n
+
+    def write(self, key: str, data: bytes) -> None:
+        self.n -= 1
+        if self.n == 0:
+            raise Crash()
+        super().write(key, data)
+
+
+class ObjectStore:
+    """
+    In memory stand-in for an S3 client.
+    """
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.exceptions.NoSuchKey()
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+
+@pytest.mark.parametrize("metrics", [False, True])
+def test_resumed_runs_match_uninterrupted(tmp_path, metrics):
+    expected = run(experiment(T=6), engine="lean", metrics=metrics)
+    # Crashes in the second run at timestep 4, after its checkpoint at 2
+    with pytest.raises(Crash):
+        run(
+            experiment(T=6),
+            engine="lean",
+            metrics=metrics,
+            checkpointer=Checkpointer(CrashingStorage(tmp_path, 5), every=2),
+        )
+    checkpointer = Checkpointer(LocalStorage(tmp_path), every=2)
+    df = run(experiment(T=6), engine="lean", metrics=metrics, checkpointer=checkpointer)
+    pd.testing.assert_frame_equal(df[COLUMNS], expected[COLUMNS])
+    # Both runs are complete, they are read back from their final checkpoints
+    df = run(experiment(T=6), engine="lean", metrics=metrics, checkpointer=checkpointer)
+    pd.testing.assert_frame_equal(df[COLUMNS], expected[COLUMNS])
+
+
+def test_s3_storage_round_trip():
+    storage = S3Storage("bucket", "checkpoints/", client=ObjectStore())
+    assert storage.read("missing.pkl") is None
+    storage.write("run.pkl", b"state")
+    assert storage.read("run.pkl") == b"state"
+    assert ("bucket", "checkpoints/run.pkl") in storage.client.objects
+
+
+def test_changed_configurations_do_not_resume(tmp_path):
+    checkpointer = Checkpointer(LocalStorage(tmp_path), every=2)
+    run(experiment(T=4), engine="lean", checkpointer=checkpointer)
+    for config, options in [
+        (experiment(T=6), {}),
+        (experiment(T=4, servicer_jailing_probability=0.05), {}),
+        (experiment(T=4), {"recording": "timestep"}),
+        (experiment(T=4), {"metrics": True}),
+    ]:
+        expected = run(config, engine="lean", **options)
+        df = run(config, engine="lean", checkpointer=checkpointer, **options)
+        pd.testing.assert_frame_equal(df[COLUMNS], expected[COLUMNS])
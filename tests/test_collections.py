@@ -0,0 +1,229 @@
+import copy
+import pickle
+import numpy as np
+import pytest
+from model.classes import SessionPool
+from model.config import build_state
+from model.history import EventLog, ServicerHistory
+from model.ids import IdAllocator
+from model.indexed_set import IndexedSet
+from model.links import SERVICE, SERVICER, LinkMatrix
+from model.relay_log import RelayLog
+from model.servicer_index import ServicerIndex
+from model.shared import sharing
+
+
+def test_session_pool_keeps_sessions_in_opening_order():
+    pool = SessionPool(capacity=2)
+    sessions = [pool.acquire("app", "service", [i], i) for i in range(5)]
+    assert sessions == list(range(5))
+    pool.release(1)
+    pool.release(0)
+    assert len(pool) == 3 and pool.first() == 2
+    assert list(pool) == [2, 3, 4]
+    # Released slots are reused once the head has moved past them
+    for i in range(5, 9):
+        pool.acquire("app", "service", [i], i)
+    pool.release(6)
+    assert list(pool) == [2, 3, 4, 5, 7, 8]
+    assert [pool.number_of_relays[pool.slot(x)] for x in pool] == [2, 3, 4, 5, 7, 8]
+    assert pool.servicers[pool.slot(6)] is None
+    with pytest.raises(AssertionError):
+        pool.release(6)
+    copied = pickle.loads(pickle.dumps(pool))
+    assert list(copied) == list(pool)
+    for x in list(pool):
+        pool.release(x)
+    with pytest.raises(IndexError):
+        pool.first()
+
+
+def test_relay_log_reads_as_a_dict_in_logged_order():
+    log = RelayLog(["s1", "s2"], ["z1", "z2"])
+    log.add(("s2", "z1"), 3)
+    log.add(("s1", "z2"), 4)
+    log.add_at((np.array([1, 0]), np.array([0, 0])), np.array([2, 5]))
+    assert dict(log) == {("s2", "z1"): 5, ("s1", "z2"): 4, ("s1", "z1"): 5}
+    assert list(log) == [("s2", "z1"), ("s1", "z2"), ("s1", "z1")]
+    assert log.total() == 14
+    servicers = RelayLog(["a", "b", "c"])
+    servicers.add("c", 1)
+    servicers.add_at(np.array([0, 2]), np.array([2, 2]))
+    assert dict(servicers) == {"c": 3, "a": 2}
+    copied = pickle.loads(pickle.dumps(servicers))
+    assert dict(copied) == {"c": 3, "a": 2}
+    copied.add("b", 4)
+    assert dict(copied) == {"c": 3, "a": 2, "b": 4}
+
+
+def test_caches_copy_empty_unless_shared():
+    state = build_state("Base")
+    index = state["servicer_index"]
+    service = state["Services"][0]
+    assert index.active_servicers(state, service, "Zone 1") is not None
+    assert index.valid
+    copied = copy.deepcopy(index)
+    assert isinstance(copied, ServicerIndex) and not copied.valid
+    assert not pickle.loads(pickle.dumps(index)).valid
+    assert copied.active_servicers(state, service, "Zone 1") == (
+        index.active_servicers(state, service, "Zone 1")
+    )
+    with sharing():
+        assert copy.deepcopy(index) is index
+
+
+def test_indexed_set_behaves_like_an_ordered_set():
+    items = IndexedSet(["a", "b", "a", "c"])
+    assert list(items) == ["a", "b", "c"]
+    items.add("d")
+    items.add("b")
+    items.discard("b")
+    items.discard("x")
+    assert len(items) == 3
+    assert "b" not in items and "d" in items
+    assert items[1] == "c" and items[-1] == "d" and items[:2] == ["a", "c"]
+    assert items.index("d") == 2
+    with pytest.raises(ValueError):
+        items.index("b")
+    for copied in (pickle.loads(pickle.dumps(items)), copy.deepcopy(items)):
+        assert list(copied) == ["a", "c", "d"] and "c" in copied
+
+
+def test_indexed_set_iterates_over_the_items_as_of_the_start():
+    items = IndexedSet(range(5))
+    seen = []
+    for x in items:
+        items.discard(x + 1)
+        seen.append(x)
+    assert seen == list(range(5))
+    assert list(items) == [0]
+
+
+class Node:
+    def __init__(self, name: str, link_axis: int = SERVICER):
+        self.name = name
+        self.link_axis = link_axis
+        self.links = None
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class Other(Node):
+    pass
+
+
+def test_id_allocator_counts_per_class():
+    ids = IdAllocator()
+    a, b, c = Node("a"), Node("b"), Other("c")
+    assert [ids.assign(a), ids.assign(b), ids.assign(c)] == [0, 1, 0]
+    assert a.id_number == 0 and b.id_number == 1
+    assert ids.count("Node") == 2 and ids.count("Other") == 1
+    copied = pickle.loads(pickle.dumps(ids))
+    assert copied.assign(Node("d")) == 2 and ids.count("Node") == 2
+
+
+def test_event_log_totals_match_its_events():
+    log = EventLog(capacity=2)
+    rng = np.random.default_rng(0)
+    ids = rng.integers(40, size=200)
+    heights = np.arange(200)
+    amounts = rng.random(200)
+    for i in range(100):
+        log.append(int(ids[i]), int(heights[i]), float(amounts[i]))
+    log.extend(ids[100:], heights[100:], amounts[100:])
+    for x in range(40):
+        events = log.events(x)
+        assert log.count(x) == len(events) == (ids == x).sum()
+        assert log.total(x) == pytest.approx(sum(events.values()))
+    assert log.total(1000) == 0.0
+    copied = pickle.loads(pickle.dumps(log))
+    assert copied.events(3) == log.events(3) and copied.total(3) == log.total(3)
+
+
+def test_servicer_history_snapshots_are_frozen():
+    history = ServicerHistory()
+    servicer = Node("X")
+    servicer.id_number = 0
+    history.record("slashing_history", servicer, 10, 5.0)
+    snapshot = history.snapshot(servicer)
+    history.record("slashing_history", servicer, 20, 7.0)
+    assert dict(snapshot.view("slashing_history", servicer)) == {10: 5.0}
+    assert snapshot.total("slashing_history", servicer) == 5.0
+    assert dict(history.view("slashing_history", servicer)) == {10: 5.0, 20: 7.0}
+    assert history.stamp(servicer) != (0, 0, 0)
+
+
+def test_link_matrix_keeps_the_links_in_order():
+    links = LinkMatrix()
+    servicers = [Node("X{}".format(i)) for i in range(3)]
+    services = [Node("S{}".format(i), SERVICE) for i in range(3)]
+    for x in servicers:
+        links.add_servicer(x)
+    for x in services:
+        links.add_service(x)
+    links.link(services[2], servicers[0])
+    links.link(services[0], servicers[0])
+    links.link(services[0], servicers[0])
+    links.link(services[0], servicers[1])
+    assert list(links.view(servicers[0])) == [services[2], services[0]]
+    assert list(links.view(services[0])) == [servicers[0], servicers[1]]
+    assert links.unlinked_services(servicers[0]) == [services[1]]
+    linked = links.linked()
+    assert linked.dtype == bool and linked.sum() == 3
+    assert linked[links.rows[servicers[0]], links.cols[services[2]]]
+    links.unlink(services[0], servicers[0])
+    assert services[0] not in links.view(servicers[0])
+    assert links.linked().sum() == 2
+    # Copies are in the same order, and carry on from it
+    for copied in (pickle.loads(pickle.dumps(links)), copy.deepcopy(links)):
+        assert list(copied.view(copied.servicers[1])) == [copied.services[0]]
+        assert list(copied.view(copied.services[2])) == [copied.servicers[0]]
+        copied.link(copied.services[1], copied.servicers[1])
+        copied.link(copied.services[0], copied.servicers[0])
+        assert [x.name for x in copied.view(copied.servicers[1])] == ["S0", "S1"]
+        assert [x.name for x in copied.view(copied.services[0])] == ["X1", "X0"]
+
+
+def test_link_matrix_lists_unlinked_services_in_the_order_they_were_added():
+    links = LinkMatrix()
+    servicer = Node("X")
+    links.add_servicer(servicer)
+    services = [Node("S{}".format(i), SERVICE) for i in range(3)]
+    for x in services:
+        links.add_service(x)
+    links.link(services[1], servicer)
+    # The newcomer takes the column of the removed service
+    links.remove_service(services[0])
+    newcomer = Node("T", SERVICE)
+    links.add_service(newcomer)
+    assert links.cols[newcomer] == 0
+    assert links.unlinked_services(servicer) == [services[2], newcomer]
+    links.link(newcomer, servicer)
+    assert links.unlinked_services(servicer) == [services[2]]
+
+
+def test_link_matrix_reuses_rows_and_grows():
+    links = LinkMatrix()
+    service = Node("S", SERVICE)
+    links.add_service(service)
+    servicers = [Node("X{}".format(i)) for i in range(40)]
+    for x in servicers:
+        links.add_servicer(x)
+        links.link(service, x)
+    assert links.shape[0] >= 40
+    assert list(links.view(service)) == servicers
+    row = links.rows[servicers[3]]
+    links.remove_servicer(servicers[3])
+    # The removed servicer keeps the links it had
+    assert list(servicers[3].links.view(servicers[3])) == [service]
+    assert servicers[3] not in links.view(service)
+    newcomer = Node("Y")
+    links.add_servicer(newcomer)
+    assert links.rows[newcomer] == row
+    assert not links.linked()[row].any()
+    copied = pickle.loads(pickle.dumps(links))
+    assert (copied.linked() == links.linked()).all()
+    assert [x.name for x in copied.view(copied.services[0])] == [
+        x.name for x in links.view(service)
+    ]
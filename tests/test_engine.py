@@ -0,0 +1,194 @@
+import copy
+import pandas as pd
+import importlib
+import pytest
+from model.config import build_params, build_state, experimental_setups
+from model.history import HISTORIES
+from model.recorder import ID_COLUMNS, SCALAR_COLUMNS
+from model.run import add_config, load_config, run, run_parallel
+from model.shared import Shared, share_state, sharing
+from model.sink import ParquetSink, read_results
+
+COLUMNS = list(ID_COLUMNS + SCALAR_COLUMNS)
+
+
+def experiment(T: int = 5, monte_carlo_runs: int = 2, **params):
+    """
+    The Base experiment over a few days, with params overridden.
+    """
+    base = build_params("Base")
+    for key, value in params.items():
+        base[key] = [value]
+    return load_config(monte_carlo_runs, T, base, build_state("Base", "Base"), "Base")
+
+
+def servicer_summary(servicer) -> tuple:
+    return (
+        servicer.staked_pokt,
+        servicer.pokt_holdings,
+        servicer.pause_height,
+        servicer.total_revenues,
+        [x.name for x in servicer.services],
+        {x.name: y for x, y in servicer.revenue_expectations.items()},
+        [servicer.history_total(name) for name in HISTORIES],
+        [dict(servicer.history_view(name)) for name in HISTORIES],
+    )
+
+
+@pytest.fixture(scope="module")
+def lean():
+    return run(experiment(servicer_jailing_probability=0.05), engine="lean")
+
+
+def test_lean_engine_matches_cadcad(lean):
+    df = run(experiment(servicer_jailing_probability=0.05), engine="cadCAD")
+    assert list(df.columns) == list(lean.columns)
+    pd.testing.assert_frame_equal(df[COLUMNS], lean[COLUMNS])
+    assert [[servicer_summary(y) for y in x] for x in df["Servicers"]] == [
+        [servicer_summary(y) for y in x] for x in lean["Servicers"]
+    ]
+
+
+def test_cadcad_runs_of_several_simulations_match_lean():
+    # The runs of several simulations still go to cadCAD's process pool
+    exp = experiment(monte_carlo_runs=1)
+    add_config(exp, 1, 5, build_params("Base"), build_state("Base", "Base"))
+    lean = run(exp, engine="lean")
+    df = run(exp, engine="cadCAD")
+    assert sorted(set(df["simulation"])) == [0, 1]
+    pd.testing.assert_frame_equal(df[COLUMNS], lean[COLUMNS])
+
+
+def test_parallel_runs_match_serial(monkeypatch):
+    # A sweep over two subsets, each unit of work runs both of them
+    sweep = build_params("Base")
+    sweep["servicer_jailing_probability"] = [0.0, 0.05]
+    monkeypatch.setattr(
+        importlib.import_module("model.run"), "build_params", lambda _: sweep
+    )
+    monkeypatch.setitem(
+        experimental_setups,
+        "Base",
+        dict(experimental_setups["Base"], T=5, monte_carlo_n=2),
+    )
+    df = run_parallel(["Base"], n_workers=2, engine="lean")
+    serial = run(load_config(2, 5, sweep, build_state("Base", "Base")), engine="lean")
+    order = ["subset", "run", "timestep", "substep"]
+    df = df.sort_values(order).reset_index(drop=True)
+    serial = serial.sort_values(order).reset_index(drop=True)
+    assert sorted(set(zip(df["subset"], df["run"]))) == [(0, 1), (0, 2), (1, 1), (1, 2)]
+    pd.testing.assert_frame_equal(df[COLUMNS], serial[COLUMNS])
+
+
+def test_timestep_recording_keeps_the_last_substep(lean):
+    df = run(
+        experiment(servicer_jailing_probability=0.05),
+        engine="lean",
+        recording="timestep",
+    )
+    last = lean["substep"] == lean["substep"].max()
+    expected = lean[(lean["timestep"] == 0) | last].reset_index(drop=True)
+    pd.testing.assert_frame_equal(df[COLUMNS], expected[COLUMNS])
+
+
+def test_record_interval_keeps_every_kth_and_the_final_timestep(lean):
+    df = run(
+        experiment(servicer_jailing_probability=0.05),
+        engine="lean",
+        record_interval=2,
+    )
+    timesteps = lean["timestep"]
+    expected = lean[(timesteps % 2 == 0) | (timesteps == timesteps.max())]
+    pd.testing.assert_frame_equal(df[COLUMNS], expected[COLUMNS].reset_index(drop=True))
+
+
+@pytest.mark.parametrize("engine", ["lean", "cadCAD"])
+def test_metrics_match_full_states(lean, engine):
+    df = run(experiment(servicer_jailing_probability=0.05), engine=engine, metrics=True)
+    pd.testing.assert_frame_equal(df[COLUMNS], lean[COLUMNS])
+    servicers = lean["Servicers"]
+    assert df["n_servicers"].tolist() == servicers.apply(len).tolist()
+    assert (
+        df["total_servicer_stake"].tolist()
+        == servicers.apply(lambda x: sum(y.staked_pokt for y in x)).tolist()
+    )
+    assert (
+        df["dao_pokt_holdings"].tolist()
+        == lean["DAO"].apply(lambda x: x.pokt_holdings).tolist()
+    )
+
+
+def test_registries_hold_each_servicer_as_of_the_last_timestep_it_was_in(lean):
+    df = run(experiment(servicer_jailing_probability=0.05), engine="lean", metrics=True)
+    # The registries only see the end of each timestep
+    ends = lean[lean["substep"].isin([0, lean["substep"].max()])]
+    for run_number, records in ends.groupby("run"):
+        expected = {}
+        for servicers in records["Servicers"]:
+            for servicer in servicers:
+                expected[servicer.id_number] = servicer_summary(servicer)
+        registry = df[df["run"] == run_number]["servicer_registry"].iloc[-1]
+        assert {x: servicer_summary(y) for x, y in registry.items()} == expected
+
+
+def test_record_entities_keeps_the_entity_columns(lean):
+    df = run(
+        experiment(servicer_jailing_probability=0.05),
+        engine="lean",
+        metrics=True,
+        record_entities=True,
+    )
+    assert [[servicer_summary(y) for y in x] for x in df["Servicers"]] == [
+        [servicer_summary(y) for y in x] for x in lean["Servicers"]
+    ]
+
+
+def test_sharing_only_skips_copies_within_the_block():
+    state = build_state("Base", "Base")
+    share_state(state)
+    servicers = state["Servicers"]
+    with pytest.raises(RuntimeError):
+        with sharing():
+            assert copy.deepcopy(servicers) is servicers
+            raise RuntimeError
+    assert not Shared.active
+    copied = copy.deepcopy(servicers)
+    assert copied is not servicers and copied[0] is not servicers[0]
+    assert [servicer_summary(x) for x in copied] == [
+        servicer_summary(x) for x in servicers
+    ]
+
+
+def test_sink_streams_the_metrics(tmp_path):
+    metrics = run(experiment(), engine="lean", metrics=True)
+    assert (
+        run(experiment(), engine="lean", metrics=True, sink=ParquetSink(tmp_path))
+        is None
+    )
+    df = read_results(str(tmp_path), columns=COLUMNS)
+    df = df.sort_values(["run", "timestep", "substep"]).reset_index(drop=True)
+    for column in COLUMNS:
+        pd.testing.assert_series_equal(df[column], metrics[column], check_dtype=False)
+
+
+def test_sink_files_runs_under_their_experiment_name(tmp_path):
+    # Two experiments drawing from the same random streams
+    exp = experiment(monte_carlo_runs=1)
+    state = build_state("Base", "Base")
+    add_config(exp, 1, 5, build_params("Base"), state, "Repeat")
+    run(exp, engine="lean", metrics=True, sink=ParquetSink(tmp_path))
+    for simulation, name in enumerate(["Base", "Repeat"]):
+        df = read_results(str(tmp_path), columns=COLUMNS, experiments=[name])
+        assert set(df["simulation"]) == {simulation}
+
+
+def test_invariant_levels_do_not_change_the_run(lean):
+    for level in ("off", "strict"):
+        df = run(
+            experiment(servicer_jailing_probability=0.05),
+            engine="lean",
+            invariants=level,
+        )
+        pd.testing.assert_frame_equal(df[COLUMNS], lean[COLUMNS])
+    with pytest.raises(AssertionError):
+        run(experiment(), engine="lean", invariants="always")
@@ -0,0 +1,24 @@
+import copy
+import pickle
+from model.classes import Servicer
+from model.classes.entity import Unset
+from model.config import build_state
+
+
+def test_entities_copy_and_pickle_every_attribute_that_is_set():
+    state = build_state("Base", "Base")
+    servicer = state["Servicers"][0]
+    assert servicer.fields_set().get("kpi_1", Unset) is Unset
+    for copied in (copy.deepcopy(servicer), pickle.loads(pickle.dumps(servicer))):
+        assert type(copied) is Servicer and copied is not servicer
+        assert list(copied.fields_set()) == list(servicer.fields_set())
+        assert copied.staked_pokt == servicer.staked_pokt
+        assert [x.name for x in copied.services] == [x.name for x in servicer.services]
+        assert not hasattr(copied, "kpi_1")
+
+
+def test_entities_load_from_a_dict_of_attributes():
+    servicer = build_state("Base", "Base")["Servicers"][0]
+    loaded = object.__new__(Servicer)
+    loaded.__setstate__({"name": servicer.name, "retired": True})
+    assert loaded.fields_set() == {"name": servicer.name}
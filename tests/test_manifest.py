@@ -0,0 +1,38 @@
+import json
+import os
+import pytest
+from model.manifest import JobManifest, atomic_write
+
+
+def test_manifest_persists_and_resets_interrupted_keys(tmp_path):
+    path = os.path.join(tmp_path, "manifest.json")
+    manifest = JobManifest(path)
+    assert manifest.pending(["a", "b", "c", "d"]) == ["a", "b", "c", "d"]
+    manifest.set_status(["a"], "done")
+    manifest.set_status(["b"], "running")
+    manifest.set_status(["c"], "failed", error="ValueError()")
+    with open(path) as f:
+        assert json.load(f)["c"]["error"] == "ValueError()"
+
+    # As found after a crash
+    manifest = JobManifest(path)
+    assert manifest.status("a") == "done"
+    assert manifest.pending(["a", "b", "c", "d"]) == ["b", "c", "d"]
+    assert manifest.status("b") == manifest.status("c") == "pending"
+    with pytest.raises(AssertionError):
+        manifest.set_status(["a"], "lost")
+
+
+def test_atomic_write_leaves_the_old_file_on_failure(tmp_path):
+    path = os.path.join(tmp_path, "out.csv")
+    atomic_write(path, lambda f: f.write("old"))
+
+    def fail(f):
+        f.write("partial")
+        raise RuntimeError()
+
+    with pytest.raises(RuntimeError):
+        atomic_write(path, fail)
+    with open(path) as f:
+        assert f.read() == "old"
+    assert os.listdir(tmp_path) == ["out.csv"]
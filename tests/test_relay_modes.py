@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model.config import build_params, build_state
+from model.boundary_actions.application import submit_relay_requests_aggregate_ba
+from model.policy.application import (
+    sample_servicers,
+    submit_relay_requests_aggregate_policy,
+)
+from model.psub.servicer import p_relay_requests
+from model.run import run
+from test_engine import experiment
+
+N_SEEDS = 40
+
+
+def days_of_relays(session_generation_function: str, servicer_selection_function):
+    """
+    Relays processed and each servicer's share of them, on the first day of
+    N_SEEDS runs of the Base experiment with unequal QoS.
+    """
+    params = {key: value[0] for key, value in build_params("Base").items()}
+    params["session_generation_function"] = session_generation_function
+    params["servicer_selection_function"] = servicer_selection_function
+    processed, shares = [], []
+    for seed in range(N_SEEDS):
+        state = build_state("Base", "seed-{}".format(seed))
+        state["timestep"] = 1
+        for i, servicer in enumerate(state["Servicers"]):
+            servicer.QoS = 0.2 + 0.08 * i
+        out = p_relay_requests(params, 1, [], state)
+        log = out["servicer_relay_log"]
+        processed.append(out["processed_relays"])
+        shares.append([log.get(x, 0) for x in state["Servicers"]])
+    processed = np.array(processed)
+    return processed, np.array(shares) / processed[:, None]
+
+
+def standard_scores(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    se = np.sqrt(a.var(axis=0) / len(a) + b.var(axis=0) / len(b))
+    return np.abs(a.mean(axis=0) - b.mean(axis=0)) / se
+
+
+@pytest.mark.parametrize("selection", ["uniform", "qos"])
+@pytest.mark.parametrize("mode", ["batched", "aggregate"])
+def test_relay_modes_match_sequential_in_distribution(mode, selection):
+    processed, shares = days_of_relays("sequential", selection)
+    other_processed, other_shares = days_of_relays(mode, selection)
+    assert standard_scores(processed, other_processed) < 4
+    assert standard_scores(shares, other_shares).max() < 4
+
+
+@pytest.mark.parametrize("mode", ["batched", "aggregate"])
+def test_relay_modes_run_with_strict_invariants(mode):
+    df = run(
+        experiment(session_generation_function=mode, servicer_jailing_probability=0.05),
+        engine="lean",
+        invariants="strict",
+    )
+    days = df[(df["timestep"] > 0) & (df["substep"] == df["substep"].max())]
+    assert (days["processed_relays"] > 0).all()
+    assert (days["processed_relays"] <= days["total_relays"]).all()
+    assert not pd.isna(days["floating_supply"]).any()
+
+
+def test_uniform_sample_servicers_draws_without_replacement():
+    rng = np.random.default_rng(1)
+    number_of_services = rng.integers(1, 6, size=20000)
+    drawn = sample_servicers(rng, 8, number_of_services)
+    assert drawn.shape == (20000, 5)
+    for row, k in zip(drawn, number_of_services):
+        assert len(set(row[:k].tolist())) == k
+    # Every servicer is equally likely at every position, within 5 standard
+    # errors
+    for j in range(5):
+        counts = np.bincount(drawn[:, j], minlength=8)
+        assert np.all(np.abs(counts - 20000 / 8) <= 5 * np.sqrt(20000 / 8 * 7 / 8))
+
+
+def test_split_pairs_keep_all_of_their_relays():
+    params = {key: value[0] for key, value in build_params("Base").items()}
+    # No pair fits under the session token cap, all of them are split
+    params["session_token_bucket_coefficient"] = 0
+    state = build_state("Base", "Base")
+    (space,) = submit_relay_requests_aggregate_ba(state, params, 500)
+    whole, sessions = submit_relay_requests_aggregate_policy(state, params, (space,))
+    assert len(whole["number_of_relays"]) == 0
+    pairs = space["applications"] * len(state["Services"]) + space["services"]
+    split = sessions["applications"] * len(state["Services"]) + sessions["services"]
+    relays = np.zeros(pairs.max() + 1, dtype=np.int64)
+    np.add.at(relays, split, sessions["number_of_relays"])
+    np.testing.assert_array_equal(relays[pairs], space["number_of_relays"])
@@ -0,0 +1,81 @@
+import copy
+import pickle
+import numpy as np
+import pytest
+from model.config import build_state
+
+LAMBDA_EWM = 0.7
+
+
+def names(expectations) -> dict:
+    return {x.name: y for x, y in expectations.items()}
+
+
+def test_ewm_update_matches_the_per_servicer_formula():
+    state = build_state("Base", "Base")
+    rng = np.random.default_rng(0)
+    # What each servicer expects by service name, updated like the dicts
+    # the servicers used to hold
+    expected = {x.id_number: {} for x in state["Servicers"]}
+    for day in range(8):
+        links = state["service_links"]
+        for servicer in state["Servicers"]:
+            service = state["Services"][rng.integers(len(state["Services"]))]
+            if rng.random() < 0.5:
+                links.link(service, servicer)
+            else:
+                links.unlink(service, servicer)
+        earnings = {
+            servicer: {x: float(rng.random()) for x in servicer.services}
+            for servicer in state["Servicers"]
+            if rng.random() < 0.8
+        }
+        revenue_expectations = state["revenue_expectations"]
+        matrix = revenue_expectations.earnings(state, earnings)
+        revenue_expectations.ewm_update(state, matrix, LAMBDA_EWM)
+        for servicer in state["Servicers"]:
+            last, new = expected[servicer.id_number], {}
+            for service in servicer.services:
+                value = earnings.get(servicer, {}).get(service, 0)
+                if service.name in last:
+                    new[service.name] = (
+                        LAMBDA_EWM * last[service.name] + (1 - LAMBDA_EWM) * value
+                    )
+                else:
+                    new[service.name] = value
+            expected[servicer.id_number] = new
+            assert names(servicer.revenue_expectations) == pytest.approx(new)
+            assert list(names(servicer.revenue_expectations)) == list(new)
+        # Carry on from a copy every other day, as the records do
+        if day % 2:
+            state = pickle.loads(pickle.dumps(state))
+        else:
+            state = copy.deepcopy(state)
+
+
+def test_lowest_revenue_service_takes_the_first_linked_among_ties():
+    state = build_state("Base", "Base")
+    servicer = state["Servicers"][0]
+    links = state["service_links"]
+    for service in list(servicer.services):
+        links.unlink(service, servicer)
+    first, second, third = (
+        state["Services"][2],
+        state["Services"][0],
+        state["Services"][1],
+    )
+    for service in (first, second, third):
+        links.link(service, servicer)
+    revenue_expectations = state["revenue_expectations"]
+    with pytest.raises(IndexError):
+        revenue_expectations.lowest_revenue_service(state, servicer)
+    earnings = {servicer: {first: 2.0, second: 1.0, third: 1.0}}
+    matrix = revenue_expectations.earnings(state, earnings)
+    revenue_expectations.ewm_update(state, matrix, LAMBDA_EWM)
+    assert revenue_expectations.lowest_revenue_service(state, servicer) is second
+    assert servicer.services_by_revenue()[0][0] is second
+    copied = pickle.loads(pickle.dumps(state))
+    lowest = copied["revenue_expectations"].lowest_revenue_service(
+        copied, copied["Servicers"][0]
+    )
+    assert lowest.name == second.name
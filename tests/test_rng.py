@@ -0,0 +1,44 @@
+import copy
+import pickle
+import pandas as pd
+from model.engine import snapshot
+from model.rng import RNGContext
+from model.run import postprocessing, run
+from test_engine import COLUMNS, experiment
+
+
+def draws(context: RNGContext, run: int = 1) -> list:
+    return context.stream("relays", 0, run).integers(10**9, size=5).tolist()
+
+
+def test_streams_depend_only_on_key_subset_and_run():
+    first, second = RNGContext("Base"), RNGContext("Base")
+    assert draws(first) == draws(second)
+    assert draws(first, run=2) != draws(RNGContext("Base"), run=1)
+    assert draws(RNGContext("Base")) != draws(RNGContext("test1"))
+    price = RNGContext("Base").stream("price", 0, 1).integers(10**9, size=5)
+    assert price.tolist() != draws(RNGContext("Base"))
+
+
+def test_copies_carry_on_with_the_same_draws():
+    context = RNGContext("Base")
+    draws(context)
+    copies = [copy.deepcopy(context), pickle.loads(pickle.dumps(context))]
+    # A copy of a copy whose generators were never rebuilt
+    copies.append(copy.deepcopy(copies[0]))
+    expected = draws(context)
+    assert [draws(x) for x in copies] == [expected] * 3
+
+
+def test_runs_repeat_whatever_ran_before():
+    first = run(experiment(), engine="cadCAD")
+    run(experiment(servicer_jailing_probability=0.05), engine="cadCAD")
+    again = run(experiment(), engine="cadCAD")
+    pd.testing.assert_frame_equal(first[COLUMNS], again[COLUMNS])
+
+
+def test_postprocessing_drops_the_generators():
+    df = run(experiment(), engine="lean")
+    meta_data = pd.DataFrame([["Base", "Base", "Base"]])
+    df, _ = postprocessing(snapshot(df), meta_data, compute_kpis=False)
+    assert "rng" not in df.columns
@@ -0,0 +1,96 @@
+import copy
+import pickle
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from model.policy.application import sample_servicers
+from model.sampling import ServicerSampler, build_alias_table
+
+QOS = np.array([0.5, 1.0, 2.0, 0.25, 3.0, 1.0, 0.0, 1.5])
+
+
+def servicers(paused=()):
+    return [
+        SimpleNamespace(QoS=x, pause_height=1 if i in paused else None)
+        for i, x in enumerate(QOS)
+    ]
+
+
+def assert_frequencies(drawn: np.ndarray, p: np.ndarray) -> None:
+    # Within 5 standard errors of the expected frequencies
+    counts = np.bincount(drawn, minlength=len(p))
+    n = len(drawn)
+    assert np.all(np.abs(counts - n * p) <= 5 * np.sqrt(n * p * (1 - p)) + 1e-9)
+
+
+def test_alias_table_gives_the_weights():
+    weights = QOS[QOS > 0]
+    prob, alias = build_alias_table(weights)
+    p = prob.copy()
+    np.add.at(p, alias, 1 - prob)
+    np.testing.assert_allclose(p / len(weights), weights / weights.sum())
+
+
+@pytest.mark.parametrize("k", [1, 3, 6])
+def test_servicer_sampler_draws_by_qos_without_paused(k):
+    population = servicers(paused=(1,))
+    sampler = ServicerSampler()
+    rng = np.random.default_rng(0)
+    first = []
+    for _ in range(4000):
+        drawn = sampler.sample(rng, population, k)
+        assert len(set(map(id, drawn))) == k
+        assert all(not x.pause_height and x.QoS > 0 for x in drawn)
+        first.append(population.index(drawn[0]))
+    weights = np.where([x.pause_height is None for x in population], QOS, 0)
+    assert_frequencies(np.array(first), weights / weights.sum())
+
+
+def test_servicer_sampler_needs_k_servicers_with_qos():
+    # 4 servicers with QoS and 6 without, only the 4 can be drawn
+    population = [SimpleNamespace(QoS=0.0, pause_height=None) for _ in range(10)]
+    for x in population[::3]:
+        x.QoS = 1.0
+    sampler = ServicerSampler()
+    rng = np.random.default_rng(0)
+    drawn = sampler.sample(rng, population, 3)
+    assert all(x.QoS > 0 for x in drawn)
+    with pytest.raises(ValueError):
+        sampler.sample(rng, population, 5)
+
+
+def test_servicer_sampler_is_rebuilt_after_invalidate():
+    population = servicers()
+    sampler = ServicerSampler()
+    sampler.update(population)
+    population[4].pause_height = 1
+    sampler.update(population)
+    assert 4 in sampler.positions
+    sampler.invalidate()
+    sampler.update(population)
+    assert 4 not in sampler.positions
+    # Copies are empty and built again on first use
+    for copied in (copy.deepcopy(sampler), pickle.loads(pickle.dumps(sampler))):
+        assert not copied.valid
+        copied.update(population)
+        np.testing.assert_array_equal(copied.weights, sampler.weights)
+
+
+@pytest.mark.parametrize("k", [2, 5])
+def test_qos_sample_servicers_matches_the_sampler(k):
+    # k=5 is more than half of the eligible servicers, drawn by ranking keys
+    population = servicers(paused=(1,))
+    sampler = ServicerSampler()
+    sampler.update(population)
+    rng = np.random.default_rng(2)
+    drawn = sample_servicers(rng, len(population), np.full(6000, k), sampler)
+    expected = [
+        [population.index(x) for x in sampler.sample(rng, population, k)]
+        for _ in range(6000)
+    ]
+    for row in drawn:
+        assert len(set(row.tolist())) == k
+        assert sampler.weights[row].all()
+    for j in range(k):
+        p = np.bincount(np.array(expected)[:, j], minlength=len(QOS)) / 6000
+        assert_frequencies(drawn[:, j], np.clip(p, 1e-4, None))